@@ -1,7 +1,7 @@
 import re
 import regex
 
-from LimeSoup.lime_soup import Soup, RuleIngredient
+from LimeSoup.lime_soup import Soup, RuleIngredient, DEFAULT_HTML_PARSER
 from LimeSoup.parser.paragraphs import extract_paragraphs_recursive
 from LimeSoup.parser.parser_paper import ParserPaper
 
@@ -19,9 +19,11 @@ class AIPRemoveTrash(RuleIngredient):
     etc). Also strips the items listed below.
     """
 
+    builds_html = True
+
     @staticmethod
-    def _parse(html_str):
-        parser = ParserPaper(html_str, parser_type='html.parser', debugging=False)
+    def _parse(html_str, html_parser=DEFAULT_HTML_PARSER):
+        parser = ParserPaper(html_str, parser_type=html_parser, debugging=False)
         # Tags to be removed from the HTML paper
         list_remove = [
             {'name': 'div', 'class': ['figure', 'figure-image-content']},  # Figures
@@ -118,7 +120,7 @@ class AIPCleanArticleBody(RuleIngredient):
         article_body = parser.soup.find(**{'name': 'fulltext'})
         if article_body is None:
             raise ValueError('Cannot find article body')
-        parser = ParserPaper(str(article_body), parser_type='html.parser')
+        parser = ParserPaper(str(article_body), parser_type=parser.parser_type)
 
         # 2023-01-18 ===> list items are divided by <p></p> tags, so the following is a bit of a hacky
         # way to change those tags and join everything in the same previous paragraph
@@ -6,6 +6,7 @@ from __future__ import absolute_import
 
 from LimeSoup.lime_soup import Soup, RuleIngredient
 from LimeSoup.parser.parser_paper_aps import ParserPaper
+from LimeSoup.parser.tools import is_well_formed_xml
 import re
 
 
@@ -17,7 +18,7 @@ __version__ = '0.3.0'
 
 class APSRemoveTrash(RuleIngredient):
     @staticmethod
-    def _parse(xml_str):
+    def _parse(parser):
         # Tags to be removed from the xml paper
         list_remove = [
             {'name': 'ref-list'},
@@ -25,29 +26,26 @@ class APSRemoveTrash(RuleIngredient):
             {'name': 'table-wrap'},
             {'name': 'fig'},
         ]
-        parser = ParserPaper(xml_str, parser_type='lxml', debugging=False)
         parser.remove_tags(rules=list_remove)
-        return parser.raw_xml
+        return parser.repaired()
 
 class APSCreateTags(RuleIngredient):
 
     @staticmethod
-    def _parse(xml_str):
-        parser = ParserPaper(xml_str, parser_type='lxml', debugging=False)
+    def _parse(parser):
         # try:
             # This create a standard of sections tag name
         parser.create_tag_sections()
         # except:
         #     pass
-        return parser.raw_xml
+        return parser.repaired()
 
 class APSReplaceSectionTag(RuleIngredient):
 
     @staticmethod
-    def _parse(xml_str):
-        parser = ParserPaper(xml_str, parser_type='lxml', debugging=False)
+    def _parse(parser):
         parser.change_name_tag_sections()
-        return parser.raw_xml
+        return parser.repaired()
 
 class APSReformat(RuleIngredient):
 
@@ -55,13 +53,14 @@ class APSReformat(RuleIngredient):
     def _parse(xml_str):
         new_xml = xml_str.replace('>/','>')
         parser = ParserPaper(new_xml, parser_type='lxml',debugging=False)
-        return parser.raw_xml
+        # Malformed papers are parsed again after each step, see repaired().
+        parser.repair = not is_well_formed_xml(new_xml)
+        return parser.repaired()
 
 class APSCollect(RuleIngredient):
 
     @staticmethod
-    def _parse(xml_str):
-        parser = ParserPaper(xml_str, parser_type='lxml', debugging=False)
+    def _parse(parser):
         # Collect information from the paper using ParserPaper
         journal_name = parser.get(rules=[{"name": "journal-title"}])
         parser.get_title(rules=[
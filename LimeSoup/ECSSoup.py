@@ -1,8 +1,10 @@
 import re
 
-from LimeSoup.lime_soup import Soup, RuleIngredient
-from LimeSoup.parser.paragraphs import extract_paragraphs_recursive
+from LimeSoup.lime_soup import Soup, RuleIngredient, iter_sections, DEFAULT_HTML_PARSER
+from LimeSoup.parser.paragraphs import extract_paragraphs_recursive, iter_paragraphs
 from LimeSoup.parser.parser_paper import ParserPaper
+from LimeSoup.parser.regions import extract_region, keep_only
+from LimeSoup.parser.tag_rules import TagRules
 
 __author__ = 'Tiago Botari, Haoyan Huo'
 __maintainer__ = 'Kevin Cruse'
@@ -10,46 +12,53 @@ __email__ = 'kevcruse96@gmail.com'
 __version__ = '0.3.0'
 
 
+# Tags to be removed from the HTML paper ECS, then tags to be stripped,
+# applied in one walk of the document.
+TRASH_RULES = TagRules(
+    remove=[
+        {'name': 'div', 'class_': 'section-nav'},  # Navigation buttons
+        {'name': 'div', 'class_': 'contributors'},  # Authors
+        {'name': 'span', 'class_': 'disp-formula'},  # Formulas
+        {'name': 'code'},  # Codes inside the HTML
+        {'name': 'div', 'class_': 'fig pos-float odd'},  # Figures
+        {'name': 'div', 'id': 'ref-list-1'},  # References
+        {'name': 'span', 'class_': 'disp-formula'},  # Formulas
+        {'name': 'span', 'class_': 'kwd-group-title'},  # Keyword labels
+        {'name': 'div', 'class_': 'table-caption'},  # Caption Table
+        {'name': 'div', 'class_': 'table-inline'},  # Table in line
+        {'name': 'div', 'id': 'fn-group-1'},  # Footnotes
+        {'name': 'div', 'id': 'license-1'},  # License
+        {'name': 'ul', 'class': 'history-list'},  # some historical information of the paper
+        {'name': 'ul', 'class': 'copyright-statement'},
+        {'name': 'a', 'href': re.compile(r'#ref.*?')},
+    ],
+    strip=[
+        {'name': 'span', 'class': 'highwire-journal-article-marker-start'},
+        {'name': 'ul', 'class': 'epreprint-list'}
+    ],
+)
+
+
 class ECSRemoveTrash(RuleIngredient):
+    builds_html = True
+
     @staticmethod
-    def _parse(html_str):
-        parser = ParserPaper(html_str, parser_type='html.parser', debugging=False)
-
-        # Tags to be removed from the HTML paper ECS
-        list_remove = [
-            {'name': 'div', 'class_': 'section-nav'},  # Navigation buttons
-            {'name': 'div', 'class_': 'contributors'},  # Authors
-            {'name': 'span', 'class_': 'disp-formula'},  # Formulas
-            {'name': 'code'},  # Codes inside the HTML
-            {'name': 'div', 'class_': 'fig pos-float odd'},  # Figures
-            {'name': 'div', 'id': 'ref-list-1'},  # References
-            {'name': 'span', 'class_': 'disp-formula'},  # Formulas
-            {'name': 'span', 'class_': 'kwd-group-title'},  # Keyword labels
-            {'name': 'div', 'class_': 'table-caption'},  # Caption Table
-            {'name': 'div', 'class_': 'table-inline'},  # Table in line
-            {'name': 'div', 'id': 'fn-group-1'},  # Footnotes
-            {'name': 'div', 'id': 'license-1'},  # License
-            {'name': 'ul', 'class': 'history-list'},  # some historical information of the paper
-            {'name': 'ul', 'class': 'copyright-statement'},
-            {'name': 'a', 'href': re.compile(r'#ref.*?')},
-        ]
-        parser.remove_tags(rules=list_remove)
-        rules = [
-            {'name': 'span', 'class': 'highwire-journal-article-marker-start'},
-            {'name': 'ul', 'class': 'epreprint-list'}
-        ]
-
-        parser.strip_tags(rules)
-        main_body = str(next(x for x in parser.soup.find_all('div', attrs={'class': 'fulltext-view'})))
-        return main_body
+    def _parse(html_str, html_parser=DEFAULT_HTML_PARSER):
+        # Only the main body of the page is used.
+        main_body = extract_region(html_str, 'div', attrs={'class': 'fulltext-view'})
+        if main_body is None:
+            raise ValueError('Cannot find <div class="fulltext-view"> in the document')
+        parser = ParserPaper(main_body, parser_type=html_parser, debugging=False)
+
+        parser.apply_rules(TRASH_RULES)
+        keep_only(parser.soup, parser.soup.find('div', attrs={'class': 'fulltext-view'}))
+        return parser
 
 
 class ECSCollectTitleKeywords(RuleIngredient):
 
     @staticmethod
-    def _parse(mainbody_text):
-        parser = ParserPaper(mainbody_text, parser_type='html.parser', debugging=False)
-
+    def _parse(parser):
         # Collect information from the paper using ParserPaper
         keywords = parser.get_keywords(rules=[{'name': 'li', 'class_': 'kwd'}])
         title = parser.get_first_title(rules=[
@@ -79,20 +88,31 @@ class ECSCollectAbstract(RuleIngredient):
         return obj, parser
 
 
+EXCLUDE_SECTIONS = [
+    re.compile(r'.*?acknowledge?ment.*?', re.IGNORECASE),
+    re.compile(r'.*?reference.*?', re.IGNORECASE),
+]
+
+
 class ECSCollect(RuleIngredient):
     @staticmethod
     def _parse(parser_obj):
         obj, parser = parser_obj
 
-        exclude_sections = [
-            re.compile(r'.*?acknowledge?ment.*?', re.IGNORECASE),
-            re.compile(r'.*?reference.*?', re.IGNORECASE),
-        ]
         obj['Sections'].extend(
-            extract_paragraphs_recursive(parser.soup, exclude_section_rules=exclude_sections)
+            extract_paragraphs_recursive(parser.soup, exclude_section_rules=EXCLUDE_SECTIONS)
         )
         return obj
 
+    @staticmethod
+    def _iter_paragraphs(parser_obj):
+        obj, parser = parser_obj
+
+        for paragraph in iter_sections(obj['Sections']):
+            yield paragraph
+        for paragraph in iter_paragraphs(parser.soup, exclude_section_rules=EXCLUDE_SECTIONS):
+            yield paragraph
+
 
 ECSSoup = Soup(parser_version=__version__)
 ECSSoup.add_ingredient(ECSRemoveTrash())
@@ -1,5 +1,5 @@
 from LimeSoup.ElsevierSoup_HTML import ElsevierHTMLSoup
-from LimeSoup.ElsevierSoup_XML import ElsevierXMLSoup
+from LimeSoup.ElsevierSoup_XML import ElsevierXMLSoup, ElsevierXMLLxmlSoup, ElsevierXMLStreamSoup
 from LimeSoup.lime_soup import Soup, RuleIngredient
 
 __author__ = 'Haoyan Huo'
@@ -8,7 +8,12 @@ __email__ = 'kevcruse96@gmail.com'
 
 # make sure to also update versions of HTML/XML parsers.
 __version__ = '0.3.2'
-__all__ = ['ElsevierSoup']
+__all__ = ['ElsevierSoup', 'ElsevierLxmlSoup', 'ElsevierStreamSoup']
+
+# XML papers longer than this, in characters, are parsed with
+# ElsevierXMLStreamSoup, which does not hold the whole tree in memory. See
+# _choose_parser() for how broken papers fail on each side of it.
+STREAMING_SIZE = 8 * 1024 * 1024
 
 
 def classify_code_type(raw_string):
@@ -25,16 +30,80 @@ def classify_code_type(raw_string):
     return 'HTML'
 
 
+def _choose_parser(raw_string, html_parser, xml_soup, metadata=False):
+    """
+    Parse a paper with the Soup of its format.
+
+    XML papers over STREAMING_SIZE are parsed with ElsevierXMLStreamSoup
+    instead of xml_soup. Both give the same output on valid papers, but the
+    stream extracts the body before the head is read: a paper with errors in
+    both raises the error of the body above STREAMING_SIZE, and the error of
+    the head below it.
+
+    :param raw_string: paper, HTML or XML.
+    :param html_parser: tree builder of HTML papers.
+    :param xml_soup: Soup of XML papers up to STREAMING_SIZE.
+    :param metadata: if True, only read the metadata.
+    :return: Parse JSON object
+    """
+    code_type = classify_code_type(raw_string)
+
+    if code_type == 'XML':
+        soup = ElsevierXMLStreamSoup if len(raw_string) > STREAMING_SIZE else xml_soup
+    elif code_type == 'HTML':
+        soup = ElsevierHTMLSoup
+        if html_parser != soup.html_parser:
+            soup = soup.with_html_parser(html_parser)
+    if metadata:
+        return soup.parse_metadata(raw_string)
+    return soup.parse(raw_string)
+
+
 class ElsevierChooseParser(RuleIngredient):
+    builds_html = True
+
+    @staticmethod
+    def _parse(raw_string, html_parser):
+        return _choose_parser(raw_string, html_parser, ElsevierXMLSoup)
+
+
+class ElsevierChooseParserLxml(RuleIngredient):
+    builds_html = True
+
+    @staticmethod
+    def _parse(raw_string, html_parser):
+        return _choose_parser(raw_string, html_parser, ElsevierXMLLxmlSoup)
+
+
+class ElsevierChooseParserStream(RuleIngredient):
+    builds_html = True
+
     @staticmethod
-    def _parse(raw_string):
-        code_type = classify_code_type(raw_string)
+    def _parse(raw_string, html_parser):
+        return _choose_parser(raw_string, html_parser, ElsevierXMLStreamSoup)
 
-        if code_type == 'XML':
-            return ElsevierXMLSoup.parse(raw_string)
-        elif code_type == 'HTML':
-            return ElsevierHTMLSoup.parse(raw_string)
+
+class ElsevierChooseMetadataParser(RuleIngredient):
+    builds_html = True
+
+    @staticmethod
+    def _parse(raw_string, html_parser):
+        # XML and lxml soups read the metadata the same way.
+        return _choose_parser(raw_string, html_parser, ElsevierXMLSoup, metadata=True)
 
 
 ElsevierSoup = Soup(parser_version=__version__)
 ElsevierSoup.add_ingredient(ElsevierChooseParser())
+ElsevierSoup.add_metadata_ingredient(ElsevierChooseMetadataParser())
+
+# Same output as ElsevierSoup, but XML papers are parsed on the lxml tree
+# instead of a BeautifulSoup tree.
+ElsevierLxmlSoup = Soup(parser_version=__version__)
+ElsevierLxmlSoup.add_ingredient(ElsevierChooseParserLxml())
+ElsevierLxmlSoup.add_metadata_ingredient(ElsevierChooseMetadataParser())
+
+# Same output again, XML papers of any size are parsed with
+# lxml.etree.iterparse, one section at a time.
+ElsevierStreamSoup = Soup(parser_version=__version__)
+ElsevierStreamSoup.add_ingredient(ElsevierChooseParserStream())
+ElsevierStreamSoup.add_metadata_ingredient(ElsevierChooseMetadataParser())
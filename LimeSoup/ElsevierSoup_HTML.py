@@ -2,7 +2,7 @@ import re
 
 import bs4
 
-from LimeSoup.lime_soup import Soup, RuleIngredient
+from LimeSoup.lime_soup import Soup, RuleIngredient, DEFAULT_HTML_PARSER
 from LimeSoup.parser.paragraphs import extract_paragraphs_recursive, get_tag_text
 
 __author__ = 'Haoyan Huo'
@@ -13,9 +13,11 @@ __all__ = ['ElsevierHTMLSoup']
 
 
 class ElsevierRemoveTrash(RuleIngredient):
+    builds_html = True
+
     @staticmethod
-    def _parse(html_str):
-        soup = bs4.BeautifulSoup(html_str, 'html.parser')
+    def _parse(html_str, html_parser=DEFAULT_HTML_PARSER):
+        soup = bs4.BeautifulSoup(html_str, html_parser)
 
         rules_for_remove = [
             {'class_': re.compile('.*?fig(?:ure)?.*?', re.IGNORECASE)},
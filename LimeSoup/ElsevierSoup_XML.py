@@ -2,6 +2,8 @@ import re
 import bs4
 
 from LimeSoup.lime_soup import Soup, RuleIngredient
+from LimeSoup.parser.elsevier_lxml import (
+    LxmlDocument, LxmlTag, iterparse_document, parse_lxml_document, parse_lxml_header)
 from LimeSoup.parser.elsevier_xml import (
     resolve_elsevier_entities, extract_ce_text, find_non_empty_children,
     node_named, extract_ce_para, extract_ce_section, extract_ce_abstract,
@@ -11,7 +13,11 @@ __author__ = 'Haoyan Huo, Nicolas Mingione'
 __maintainer__ = 'Kevin Cruse'
 __email__ = 'kevcruse96@gmail.com'
 __version__ = '0.3.2-xml'
-__all__ = ['ElsevierXMLSoup']
+__all__ = ['ElsevierXMLSoup', 'ElsevierXMLLxmlSoup', 'ElsevierXMLStreamSoup']
+
+# Children of these elements (floats, references, raw text) are never read,
+# ElsevierStreamXML drops each of them as soon as it ends.
+_UNUSED_CONTAINERS = ('floats', 'tail', 'rawtext')
 
 
 class ElsevierParseXML(RuleIngredient):
@@ -20,6 +26,15 @@ class ElsevierParseXML(RuleIngredient):
         xml_str = resolve_elsevier_entities(xml_str)
         return bs4.BeautifulSoup(xml_str, 'lxml-xml')
 
+
+class ElsevierParseXMLLxml(RuleIngredient):
+    @staticmethod
+    def _parse(xml_str):
+        # Same grammar as above, running on the lxml tree.
+        xml_str = resolve_elsevier_entities(xml_str)
+        return parse_lxml_document(xml_str)
+
+
 class ElsevierReadMetaData(RuleIngredient):
     @staticmethod
     def get_text_or_none(soup, name, handler=None):
@@ -72,6 +87,32 @@ class ElsevierReadMetaData(RuleIngredient):
         }
 
 
+class ElsevierReadHeader(RuleIngredient):
+    """
+    Read the metadata from the elements before the body only, for
+    ElsevierXMLSoup.parse_metadata().
+    """
+
+    @staticmethod
+    def _parse(xml_str):
+        _, obj = ElsevierReadMetaData._parse(parse_lxml_header(xml_str))
+        return obj
+
+
+def _collect_abstract(node, paragraphs):
+    abstract_paragraph = extract_ce_abstract(node)
+    normalized_name = re.sub(r'[^\w]', '', abstract_paragraph['name'])
+    if re.match(r'abstracts?', normalized_name, re.IGNORECASE):
+        paragraphs.append(abstract_paragraph)
+
+
+def _collect_section_child(node, paragraphs):
+    if node_named(node, 'ce:para'):
+        paragraphs.extend(extract_ce_para(node).split('\n'))
+    elif node_named(node, 'ce:section'):
+        paragraphs.append(extract_ce_section(node))
+
+
 class ElsevierCollect(RuleIngredient):
 
     @staticmethod
@@ -82,24 +123,87 @@ class ElsevierCollect(RuleIngredient):
 
         # find all sections
         for node in soup.find_all('ce:abstract'):
-            abstract_paragraph = extract_ce_abstract(node)
-            normalized_name = re.sub(r'[^\w]', '', abstract_paragraph['name'])
-            if re.match(r'abstracts?', normalized_name, re.IGNORECASE):
-                paragraphs.append(abstract_paragraph)
+            _collect_abstract(node, paragraphs)
 
         sections = soup.find('ce:sections')
         if sections is not None:
             for node in find_non_empty_children(sections):
-                if node_named(node, 'ce:para'):
-                    paragraphs.extend(extract_ce_para(node).split('\n'))
-                elif node_named(node, 'ce:section'):
-                    paragraphs.append(extract_ce_section(node))
+                _collect_section_child(node, paragraphs)
 
         obj['Sections'] = paragraphs
         return obj
 
 
+def _drop(element):
+    # Free an element that was read, and the elements before it, keeping the
+    # text after it. lxml < 4.4 has no clear(keep_tail=True).
+    tail = element.tail
+    element.clear()
+    element.tail = tail
+    parent = element.getparent()
+    while element.getprevious() is not None:
+        del parent[0]
+
+
+class ElsevierStreamXML(RuleIngredient):
+    """
+    Parse a paper with lxml.etree.iterparse() instead of building it whole:
+    every <ce:abstract> and every child of <ce:sections> is extracted when
+    it ends, and the children of <ce:sections> and of unused containers are
+    freed, so memory is bounded by the largest section rather than by the
+    document. Same output as ElsevierParseXMLLxml, ElsevierReadMetaData and
+    ElsevierCollect.
+    """
+
+    @staticmethod
+    def _parse(xml_str):
+        abstracts = []
+        paragraphs = []
+        root = sections = None
+        unused = set()
+
+        for event, element in iterparse_document(xml_str, events=('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = element
+                elif sections is None and element.prefix == 'ce' and element.tag.endswith('}sections'):
+                    # The first one, as soup.find('ce:sections').
+                    sections = element
+                elif element.tag.rpartition('}')[2] in _UNUSED_CONTAINERS:
+                    unused.add(element)
+                continue
+
+            parent = element.getparent()
+            if parent is None:
+                continue
+            if parent is sections:
+                _collect_section_child(LxmlTag(element), paragraphs)
+                _drop(element)
+            elif element.prefix == 'ce' and element.tag.endswith('}abstract'):
+                _collect_abstract(LxmlTag(element), abstracts)
+            elif parent in unused:
+                _drop(element)
+
+        if root is None:
+            raise ValueError('Cannot parse XML document, no root element was found')
+        _, obj = ElsevierReadMetaData._parse(LxmlDocument(root))
+        obj['Sections'] = abstracts + paragraphs
+        return obj
+
+
 ElsevierXMLSoup = Soup(parser_version=__version__)
 ElsevierXMLSoup.add_ingredient(ElsevierParseXML())
 ElsevierXMLSoup.add_ingredient(ElsevierReadMetaData())
 ElsevierXMLSoup.add_ingredient(ElsevierCollect())
+ElsevierXMLSoup.add_metadata_ingredient(ElsevierReadHeader())
+
+ElsevierXMLLxmlSoup = Soup(parser_version=__version__)
+ElsevierXMLLxmlSoup.add_ingredient(ElsevierParseXMLLxml())
+ElsevierXMLLxmlSoup.add_ingredient(ElsevierReadMetaData())
+ElsevierXMLLxmlSoup.add_ingredient(ElsevierCollect())
+ElsevierXMLLxmlSoup.add_metadata_ingredient(ElsevierReadHeader())
+
+# Same output again, for documents too large to hold as a tree.
+ElsevierXMLStreamSoup = Soup(parser_version=__version__)
+ElsevierXMLStreamSoup.add_ingredient(ElsevierStreamXML())
+ElsevierXMLStreamSoup.add_metadata_ingredient(ElsevierReadHeader())
@@ -1,6 +1,7 @@
-from LimeSoup.lime_soup import Soup, RuleIngredient
+from LimeSoup.lime_soup import Soup, RuleIngredient, DEFAULT_HTML_PARSER
 from LimeSoup.parser.parser_paper_IOP import ParserPaper
 from LimeSoup.parser.paragraphs import extract_paragraphs_recursive
+from LimeSoup.parser.tag_rules import TagRules
 
 from pprint import pprint
 
@@ -11,9 +12,48 @@ __maintainer__ = 'Kevin Cruse'
 __email__ = 'kevcruse96@gmail.com'
 __version__ = '0.2.0'
 
+TRASH_RULES = TagRules(
+    # Tags to be removed from the xml paper
+    remove=[
+        {'name': 'ref-list'},
+        {'name': 'table-wrap'},
+        {'name': 'fig'},
+        {'name': 'xref', 'ref-type': 'bibr'},
+        {'name': 'label'},
+        {'name': 'disp-formula'},
+        {'name': 'def-list', 'list-content': 'abbreviations'}
+    ],
+    # Added 202405
+    strip=[
+        {'name': 'inline-formula'},
+        {'name': 'mml:math'},
+        {'name': 'mml:msub'},
+        {'name': 'mml:mi'},
+        {'name': 'mml:mrow'},
+        {'name': 'mml:mn'},
+        {'name': 'mml:msub'},
+        {'name': 'sub'},
+        {'name': 'sup'},
+        # Uncommenting this will separate list items into separate paragraphs... we don't want this
+        # since synthesis descriptions could then be separated
+        # {'name': 'list-item'}
+    ],
+    # Added 20240521
+    rename=[
+        ({'name': 'list'}, 'p'),
+    ],
+)
+
+_XREF_PATTERN = re.compile(r'(?:(\[)?<xref ref-type="bibr".*?\/xref>(\]|\))?)')
+_SUP_NUMBER_PATTERN = re.compile(r"<sup>([\d+|[\−\d+])")
+_PROCESSING_INSTRUCTION_PATTERN = re.compile(r"<\?.*?\s?(<.*>)?\?>")
+
+
 class IOPRemoveTrash(RuleIngredient):
+    builds_html = True
+
     @staticmethod
-    def _parse(xml_str):
+    def _parse(xml_str, html_parser=DEFAULT_HTML_PARSER):
         # Tags to be removed from the xml paper
 
         # Before creating BeautifulSoup object, remove in-line citation groupings
@@ -23,7 +63,7 @@ class IOPRemoveTrash(RuleIngredient):
         # If there are any remaining, then just remove using parser.remove_tags() method
 
         # remove formatting for inline citations
-        xml_str = re.sub(r'(?:(\[)?<xref ref-type="bibr".*?\/xref>(\]|\))?)', '', xml_str)
+        xml_str = _XREF_PATTERN.sub('', xml_str)
 
         # remove empty title tags (happens around List of Symbols sections
         xml_str = xml_str.replace("<title/>", "")
@@ -31,43 +71,14 @@ class IOPRemoveTrash(RuleIngredient):
         # add carots for exponentials (only for digits, not for inline citations)
         # note that this does not cover cases like below:
         # <mml:msup><mml:mrow><mml:mn>10</mml:mn></mml:mrow><mml:mrow><mml:mn>17</mml:mn></mml:mrow></mml:msup>
-        xml_str = re.sub(r"<sup>([\d+|[\−\d+])", r"<sup>^\1", xml_str)
+        xml_str = _SUP_NUMBER_PATTERN.sub(r"<sup>^\1", xml_str)
 
         # remove Google script tags
-        xml_str = re.sub(r"<\?.*?\s?(<.*>)?\?>", r"\1", xml_str)
-
-        parser = ParserPaper(xml_str, parser_type='html.parser', debugging=False)
-
-        list_remove = [
-            {'name': 'ref-list'},
-            {'name': 'table-wrap'},
-            {'name': 'fig'},
-            {'name': 'xref', 'ref-type': 'bibr'},
-            {'name': 'label'},
-            {'name': 'disp-formula'},
-            {'name': 'def-list', 'list-content': 'abbreviations'}
-        ]
-        parser.remove_tags(rules=list_remove)
-
-        # Added 202405
-        list_strip = [
-            {'name': 'inline-formula'},
-            {'name': 'mml:math'},
-            {'name': 'mml:msub'},
-            {'name': 'mml:mi'},
-            {'name': 'mml:mrow'},
-            {'name': 'mml:mn'},
-            {'name': 'mml:msub'},
-            {'name': 'sub'},
-            {'name': 'sup'},
-            # Uncommenting this will separate list items into separate paragraphs... we don't want this
-            # since synthesis descriptions could then be separated
-            # {'name': 'list-item'}
-        ]
-        parser.strip_tags(rules=list_strip)
-
-        # Added 20240521
-        parser.rename_tag(rule={'name': 'list'}, new_name='p')
+        xml_str = _PROCESSING_INSTRUCTION_PATTERN.sub(r"\1", xml_str)
+
+        parser = ParserPaper(xml_str, parser_type=html_parser, debugging=False)
+
+        parser.apply_rules(TRASH_RULES)
 
         return parser
 
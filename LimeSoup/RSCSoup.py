@@ -1,9 +1,10 @@
 import re
 from pprint import pprint
 
-from LimeSoup.lime_soup import Soup, RuleIngredient
-from LimeSoup.parser.paragraphs import extract_paragraphs_recursive, get_tag_text
+from LimeSoup.lime_soup import Soup, RuleIngredient, DEFAULT_HTML_PARSER
+from LimeSoup.parser.paragraphs import extract_paragraphs_recursive, get_tag_text, iter_paragraphs
 from LimeSoup.parser.parser_paper import ParserPaper
+from LimeSoup.parser.tag_rules import TagRules
 
 __author__ = 'Ziqin (Shaun) Rong, Tiago Botari, Haoyan Huo'
 __maintainer__ = 'Kevin Cruse'
@@ -12,45 +13,50 @@ __version__ = '0.3.1'
 
 
 class RSCParseHTML(RuleIngredient):
+    builds_html = True
+
     @staticmethod
-    def _parse(html_str):
-        return ParserPaper(html_str, parser_type='html.parser', debugging=False)
+    def _parse(html_str, html_parser=DEFAULT_HTML_PARSER):
+        return ParserPaper(html_str, parser_type=html_parser, debugging=False)
+
+
+# Compiled once, see LimeSoup.parser.tag_rules.
+TRASH_RULES = TagRules(remove=[
+    {'name': 'p', 'class': 'header_text'},  # Authors
+    {'name': 'div', 'id': 'art-admin'},  # Data rec./accept.
+    {'name': 'div', 'class': 'image_table'},  # Figures
+    {'name': 'div', 'id': 'crossmark-content'},  # Another Logo
+    {'name': 'code'},  # Codes inside the HTML
+    {'name': 'div', 'class': 'table_caption'},  # Remove table caption
+    {'name': 'div', 'class': 'rtable__wrapper'},  # Remove table itself
+    {'name': 'div', 'class': 'left_head'},  # Navigation links
+    {'name': 'table'},  # Remove Footnote
+    {'name': 'a', 'href': re.compile(r'#cit\d+')},  # Remove citations
+    {'name': 'script'},
+    {'name': 'figcaption'},
+    {'name': 'figure'},
+    # below added 2023-01-17
+    {'name': 'div', 'class': 'footnotes'},
+    {'name': 'div', 'class': 'article-copyright'},
+    {'name': 'div', 'class': 'biog'},
+    {'name': 'div', 'class': 'pnl pnl--border pnl--drop'}
+])
+# Added 20231012
+INLINE_RULES = TagRules(strip=[
+    {'name': 'em'},
+    {'name': 'annref'},
+    {'name': 'compname'}
+])
 
 
 class RSCRemoveTrash(RuleIngredient):
     @staticmethod
     def _parse(parser):
-        parser.remove_tags(rules=[
-            {'name': 'p', 'class': 'header_text'},  # Authors
-            {'name': 'div', 'id': 'art-admin'},  # Data rec./accept.
-            {'name': 'div', 'class': 'image_table'},  # Figures
-            {'name': 'div', 'id': 'crossmark-content'},  # Another Logo
-            {'name': 'code'},  # Codes inside the HTML
-            {'name': 'div', 'class': 'table_caption'},  # Remove table caption
-            {'name': 'div', 'class': 'rtable__wrapper'},  # Remove table itself
-            {'name': 'div', 'class': 'left_head'},  # Navigation links
-            {'name': 'table'},  # Remove Footnote
-            {'name': 'a', 'href': re.compile(r'#cit\d+')},  # Remove citations
-            {'name': 'script'},
-            {'name': 'figcaption'},
-            {'name': 'figure'},
-            # below added 2023-01-17
-            {'name': 'div', 'class': 'footnotes'},
-            {'name': 'div', 'class': 'article-copyright'},
-            {'name': 'div', 'class': 'biog'},
-            {'name': 'div', 'class': 'pnl pnl--border pnl--drop'}
-        ])
+        parser.apply_rules(TRASH_RULES)
         parser.remove_first_tag(rules=[
             {'name': 'p', 'class': 'bold italic', 'string': re.compile('First published on')}
         ])
-
-        # Added 20231012
-        rules = [
-            {'name': 'em'},
-            {'name': 'annref'},
-            {'name': 'compname'}
-        ]
-        parser.strip_tags(rules)
+        parser.apply_rules(INLINE_RULES)
 
         return parser
 
@@ -93,6 +99,19 @@ class RSCCreateTagAbstract(RuleIngredient):
         return parser
 
 
+EXCLUDE_SECTIONS = [
+    re.compile(r'.*?acknowledge?ment.*?', re.IGNORECASE),
+    re.compile(r'.*?reference.*?', re.IGNORECASE),
+    re.compile(r'.*?footnote.*?', re.IGNORECASE)
+]
+
+
+def _section_tags(parser):
+    for item in parser.soup.find_all('section_h1'):
+        for tag in item.find_all(**{'name': re.compile('^section_h[1-6]'), 'recursive': False}): # recursive: False seems wrong to include
+            yield tag
+
+
 class RSCCollect(RuleIngredient):
     @staticmethod
     def _parse(parser):
@@ -134,18 +153,8 @@ class RSCCollect(RuleIngredient):
 
         # Create tag from selection function in ParserPaper
         data = list()
-
-        exclude_sections = [
-            re.compile(r'.*?acknowledge?ment.*?', re.IGNORECASE),
-            re.compile(r'.*?reference.*?', re.IGNORECASE),
-            re.compile(r'.*?footnote.*?', re.IGNORECASE)
-        ]
-        for item in parser.soup.find_all('section_h1'):
-            for tag in item.find_all(**{'name': re.compile('^section_h[1-6]'), 'recursive': False}): # recursive: False seems wrong to include
-                data.extend(extract_paragraphs_recursive(
-                    tag,
-                    exclude_section_rules=exclude_sections
-                ))
+        for tag in _section_tags(parser):
+            data.extend(extract_paragraphs_recursive(tag, exclude_section_rules=EXCLUDE_SECTIONS))
 
         obj = {
             # 'DOI': doi,
@@ -156,6 +165,14 @@ class RSCCollect(RuleIngredient):
         }
         return obj
 
+    @staticmethod
+    def _iter_paragraphs(parser):
+        # Keywords are taken out of the document, as in _parse().
+        parser.get_keywords(rules=[{'name': 'li', 'class': 'kwd'}])
+        for tag in _section_tags(parser):
+            for paragraph in iter_paragraphs(tag, exclude_section_rules=EXCLUDE_SECTIONS):
+                yield paragraph
+
 
 RSCSoup = Soup(parser_version=__version__)
 RSCSoup.add_ingredient(RSCParseHTML())
@@ -1,8 +1,9 @@
 import re
 
-from LimeSoup.lime_soup import Soup, RuleIngredient
+from LimeSoup.lime_soup import Soup, RuleIngredient, DEFAULT_HTML_PARSER
 from LimeSoup.parser.paragraphs import extract_paragraphs_recursive
 from LimeSoup.parser.parser_paper import ParserPaper
+from LimeSoup.parser.regions import extract_region, keep_only
 
 from pprint import pprint
 
@@ -11,11 +12,35 @@ __maintainer__ = 'Kevin Cruse, Sanghoon Lee'
 __email__ = 'kevcruse96@gmail.com, sh.lee@lbl.gov'
 __version__ = '0.3.0'
 
+_CITATION_PATTERN = re.compile(
+    r'(?:(\[)<a data-track="click" data-track-action="reference anchor".*?\/a>(\]|\)))'
+)
+_SUP_NUMBER_PATTERN = re.compile(r"<sup>([\d+|[\−\d+])")
+
+
+def _article_markup(html_str):
+    """
+    Markup of the article body, as found by SpringerNatureExtractArticleBody,
+    and of the <meta> tags of the page, in its <head>. Nothing else of the
+    page is used.
+    """
+    # style 1
+    markup = extract_region(html_str, attrs={'data-article-body': 'true'}, keep=('meta',), head=True)
+    if markup is None:
+        # style 2
+        markup = extract_region(html_str, 'article', keep=('meta',), head=True)
+    if markup is None:
+        raise ValueError('Cannot find article body. You '
+                         'should inspect this HTML file carefully.')
+    return markup
+
 
 class SpringerNatureRemoveTagsSmallSub(RuleIngredient):
 
+    builds_html = True
+
     @staticmethod
-    def _parse(html_str):
+    def _parse(html_str, html_parser=DEFAULT_HTML_PARSER):
         """
         Deal with spaces in the sub, small tag and then remove it.
         """
@@ -23,20 +48,15 @@ class SpringerNatureRemoveTagsSmallSub(RuleIngredient):
         # Optional: remove formatting for inline citations
         # required closed brackets/parentheses... if open, only the reference is removed but bracket, comma formatting
         # will remain
-        html_str = re.sub(
-            r'(?:(\[)<a data-track="click" data-track-action="reference anchor".*?\/a>(\]|\)))',
-            '',
-            html_str
-        )
+        html_str = _CITATION_PATTERN.sub('', html_str)
 
         # remove space characters
-        html_str = re.sub(r'\xa0', ' ', html_str)
-        html_str = re.sub(r'\u2009', ' ', html_str)
+        html_str = html_str.replace('\xa0', ' ').replace('\u2009', ' ')
 
         # add carots for exponentials (only for digits, not for inline citations)
-        html_str = re.sub(r"<sup>([\d+|[\−\d+])", r"<sup>^\1", html_str)
+        html_str = _SUP_NUMBER_PATTERN.sub(r"<sup>^\1", html_str)
 
-        parser = ParserPaper(html_str, parser_type='html.parser', debugging=False)
+        parser = ParserPaper(_article_markup(html_str), parser_type=html_parser, debugging=False)
         rules = [{'name': 'small'},
                  {'name': 'sub'},
                  {'name': 'span', 'class': 'small_caps'},
@@ -124,6 +144,33 @@ class SpringerNatureCollectMetadata(RuleIngredient):
         return [obj, parser]
 
 
+def _read_metadata(markup, html_parser):
+    markup = markup.replace('\xa0', ' ').replace('\u2009', ' ')
+    parser = ParserPaper(markup, parser_type=html_parser, debugging=False)
+    obj, _ = SpringerNatureCollectMetadata._parse(parser)
+    return obj
+
+
+class SpringerNatureReadHead(RuleIngredient):
+    """
+    Collect the metadata from the <head> of the page only, without parsing
+    the article, for SpringerNatureSoup.parse_metadata(). The whole page is
+    read when its <head> has no DOI, Title or Journal.
+    """
+
+    builds_html = True
+
+    @staticmethod
+    def _parse(html_str, html_parser=DEFAULT_HTML_PARSER):
+        markup = extract_region(html_str, 'head')
+        if markup is not None:
+            obj = _read_metadata(markup, html_parser)
+            if all(obj[key] is not None for key in ('DOI', 'Title', 'Journal')):
+                return obj
+        # Broken pages may have <meta> tags in <body>.
+        return _read_metadata(html_str, html_parser)
+
+
 class SpringerNatureExtractArticleBody(RuleIngredient):
     """
     Take the body section out of the HTML DOM.
@@ -154,25 +201,27 @@ class SpringerNatureExtractArticleBody(RuleIngredient):
             raise ValueError('Cannot find article body. You '
                              'should inspect this HTML file carefully.')
 
-        parser = ParserPaper(str(article_body), parser_type='html.parser')
+        # The metadata is collected, the article body is all that is left to parse.
+        keep_only(parser.soup, article_body)
 
         return [obj, parser]
 
 
+ENDING_SECTIONS = [
+    re.compile(r'.*?acknowledge?ment.*?', re.IGNORECASE),
+    re.compile(r'.*?reference.*?', re.IGNORECASE),
+    re.compile(r'.*?author\s*information.*?', re.IGNORECASE),
+    re.compile(r'.*?related\s*links.*?', re.IGNORECASE), #FixAPR24) do not remove references
+    re.compile(r'.*?about\s*this\s*article.*?', re.IGNORECASE),
+    re.compile(r'.*?data\s*availability\s*statement.*?', re.IGNORECASE),
+]
+
+
 class SpringerNatureCollect(RuleIngredient):
     @staticmethod
     def _parse(parser_obj):
         obj, parser = parser_obj
 
-        ending_sections = [
-            re.compile(r'.*?acknowledge?ment.*?', re.IGNORECASE),
-            re.compile(r'.*?reference.*?', re.IGNORECASE),
-            re.compile(r'.*?author\s*information.*?', re.IGNORECASE),
-            re.compile(r'.*?related\s*links.*?', re.IGNORECASE), #FixAPR24) do not remove references
-            re.compile(r'.*?about\s*this\s*article.*?', re.IGNORECASE),
-            re.compile(r'.*?data\s*availability\s*statement.*?', re.IGNORECASE),
-        ]
-
         section_status = {
             'should_trim': False
         }
@@ -182,7 +231,7 @@ class SpringerNatureCollect(RuleIngredient):
             Remove anything after "ending_sections"
             """
             if isinstance(sections, dict):
-                for rule in ending_sections:
+                for rule in ENDING_SECTIONS:
                     if not section_status['should_trim']:
                         if rule.match(sections['name']):
                             section_status['should_trim'] = True
@@ -238,3 +287,4 @@ SpringerNatureSoup.add_ingredient(SpringerNatureRemoveTrash())
 SpringerNatureSoup.add_ingredient(SpringerNatureCollectMetadata())
 SpringerNatureSoup.add_ingredient(SpringerNatureExtractArticleBody())
 SpringerNatureSoup.add_ingredient(SpringerNatureCollect())
+SpringerNatureSoup.add_metadata_ingredient(SpringerNatureReadHead())
@@ -6,7 +6,7 @@ from __future__ import absolute_import
 
 import re
 
-from LimeSoup.lime_soup import Soup, RuleIngredient
+from LimeSoup.lime_soup import Soup, RuleIngredient, DEFAULT_HTML_PARSER
 from LimeSoup.parser.parser_paper_springer import ParserPaper
 
 from pprint import pprint
@@ -20,8 +20,7 @@ __version__ = '0.3.0'
 
 class SpringerFindJournalName(RuleIngredient):
     @staticmethod
-    def _parse(html_str):
-        parser = ParserPaper(html_str, parser_type='html.parser', debugging=False)
+    def _parse(parser):
         rules = [
             {'name': 'span', 'class':'JournalTitle'}
         ]
@@ -29,17 +28,19 @@ class SpringerFindJournalName(RuleIngredient):
             ParserPaper.journal_name = next(x for x in parser.get(rules))
         except StopIteration:
             ParserPaper.journal_name = None
-        return parser.raw_html
+        return parser
 
 
 class SpringerRemoveTagsSmallSub(RuleIngredient):
 
+    builds_html = True
+
     @staticmethod
-    def _parse(html_str):
+    def _parse(html_str, html_parser=DEFAULT_HTML_PARSER):
         """
         Deal with spaces in the sub, small tag and then remove it.
         """
-        parser = ParserPaper(html_str, parser_type='html.parser', debugging=False)
+        parser = ParserPaper(html_str, parser_type=html_parser, debugging=False)
         rules = [
                  {'name': 'sub'},
                  {'name': 'sup'},
@@ -54,15 +55,15 @@ class SpringerRemoveTagsSmallSub(RuleIngredient):
         parser.strip_tags(rules)
         tags = parser.soup.find_all(**{'name': 'p'})
         parser.strip_tags(rules)
-        html_str = str(parser.soup)
-        parser = ParserPaper(html_str, parser_type='html.parser', debugging=False)
+        # The later steps expect joined strings and whitespace around every tag.
+        parser.pad_tag_boundaries()
 
-        return parser.raw_html
+        return parser
 
 
 class SpringerRemoveTrash(RuleIngredient):
     @staticmethod
-    def _parse(html_str):
+    def _parse(parser):
         # Tags to be removed from the HTML paper 
         list_remove = [
             {'name': 'div', 'class': 'Table'},  # Table
@@ -87,61 +88,55 @@ class SpringerRemoveTrash(RuleIngredient):
             {'name': 'span', 'class': 'CitationRef'}, #references
             
         ]
-        parser = ParserPaper(html_str, parser_type='html.parser', debugging=False)
         parser.remove_tags(rules=list_remove)
         parser.remove_tag(
             rules=[{'name': 'p', 'class': 'bold italic', 'string': parser.compile('First published on')}]
         )
-        return parser.raw_html
+        return parser
 
 class SpringerCreateTags(RuleIngredient):
 
     @staticmethod
-    def _parse(html_str):
+    def _parse(parser):
         # This create a standard of sections tag name
-        parser = ParserPaper(html_str, parser_type='html.parser', debugging=False)
         parser.create_tag_sections()
-        return parser.raw_html
+        return parser
 
 
 class SpringerCreateTagAbstract(RuleIngredient):
 
     @staticmethod
-    def _parse(html_str):
+    def _parse(parser):
         # Create tag from selection function in ParserPaper
-        parser = ParserPaper(html_str, parser_type='html.parser', debugging=False)
         parser.create_tag_from_selection(
             rule={'name': 'div', 'class': 'AbstractSection'},
             name_new_tag='h2'
         )
-        return parser.raw_html
+        return parser
 
 
 class SpringerReplaceDivTag(RuleIngredient):
 
     @staticmethod
-    def _parse(html_str):
-        parser = ParserPaper(html_str, parser_type='html.parser', debugging=False)
+    def _parse(parser):
         rules = [{'name': 'div'}]
         parser.strip_tags(rules)
         rules = [{'name': 'span', 'id': parser.compile('^sect[0-9]+$')}]  # some span are heading
         _ = parser.strip_tags(rules)
-        return parser.raw_html
+        return parser
 
 class SpringerReplaceDivTagPara(RuleIngredient):
 
     @staticmethod
-    def _parse(html_str):
-        parser = ParserPaper(html_str, parser_type='html.parser', debugging=False)
+    def _parse(parser):
         rules = {'name': 'div', 'class': 'Para'}
         parser.rename_tag(rules, 'p')
-        return parser.raw_html
+        return parser
 
 class SpringerCollect(RuleIngredient):
 
     @staticmethod
-    def _parse(html_str):
-        parser = ParserPaper(html_str, parser_type='html.parser', debugging=False)
+    def _parse(parser):
         # Collect information from the paper using ParserPaper
         parser.get_keywords(rules=[{'name': 'span', 'class': 'Keyword'}])
         parser.get_title(rules=[
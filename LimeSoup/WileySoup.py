@@ -1,9 +1,8 @@
 import re
 
-from bs4 import BeautifulSoup
-
-from LimeSoup.lime_soup import Soup, RuleIngredient
+from LimeSoup.lime_soup import Soup, RuleIngredient, DEFAULT_HTML_PARSER
 from LimeSoup.parser.parser_paper_wiley import ParserPaper
+from LimeSoup.parser.regions import extract_region
 
 __author__ = 'Zach Jensen'
 __maintainer__ = ''
@@ -13,12 +12,14 @@ __version__ = '0.3.0'
 
 class WileyRemoveTagsSmallSub(RuleIngredient):
 
+    builds_html = True
+
     @staticmethod
-    def _parse(html_str):
+    def _parse(html_str, html_parser=DEFAULT_HTML_PARSER):
         """
         Deal with spaces in the sub, small tag and then remove it.
         """
-        parser = ParserPaper(html_str, parser_type='html.parser', debugging=True)
+        parser = ParserPaper(html_str, parser_type=html_parser, debugging=True)
         rules = [{'name':'i'},
                  {'name':'sub'},
                  {'name':'sup'},
@@ -42,14 +43,14 @@ class WileyRemoveTagsSmallSub(RuleIngredient):
                 tags_inside_paragraph = tag.find_all(**rule)
                 for tag_inside_paragraph in tags_inside_paragraph:
                     tag_inside_paragraph.replace_with_children()
-        # Recreating the ParserPaper bug in beautifulsoup
-        html_str = str(parser.soup)
-        parser = ParserPaper(html_str, parser_type='html.parser', debugging=False)
-        return parser.raw_html
+        # Recreating the ParserPaper bug in beautifulsoup: the later steps
+        # expect joined strings and whitespace around every tag.
+        parser.pad_tag_boundaries()
+        return parser
 
 class WileyRemoveTrash(RuleIngredient):
     @staticmethod
-    def _parse(html_str):
+    def _parse(parser):
         list_remove = [
             {'name': 'div', 'class': 'loa-wrappers loa_authors hidden-xs'},
             {'name':'div', 'class':'article-header__authors-container'},  # Authors X
@@ -99,28 +100,25 @@ class WileyRemoveTrash(RuleIngredient):
             {'name':'span', 'class':'inline-equation__label'},
             {'name':'div', 'class':'accordion article-accordion'},
         ]
-        parser = ParserPaper(html_str, parser_type='html.parser', debugging=False)
         parser.remove_tags(rules=list_remove)
         parser.remove_tag(
             rules=[{'name': 'p', 'class': 'bold italic', 'string': parser.compile('First published on')}]
         )
-        return parser.raw_html
+        return parser
 
 class WileyCreateTags(RuleIngredient):
 
     @staticmethod
-    def _parse(html_str):
+    def _parse(parser):
         # This create a standard of sections tag name
-        parser = ParserPaper(html_str, parser_type='html.parser', debugging=False)
         parser.create_tag_sections()
-        return parser.raw_html
+        return parser
 
 class WileyCreateTagAbstract(RuleIngredient):
 
     @staticmethod
-    def _parse(html_str):
+    def _parse(parser):
         # Create tag from selection function in ParserPaper
-        parser = ParserPaper(html_str, parser_type='html.parser', debugging=False)
         parser.create_tag_from_selection(
             rule={'name': 'p', 'class': 'abstract'},
             name_new_tag='h2'
@@ -131,37 +129,77 @@ class WileyCreateTagAbstract(RuleIngredient):
         #     name_new_tag='h2',
         #     name_section='Introduction(guess)'
         # )
-        return parser.raw_html
+        return parser
 
 class WileyReplaceDivTag(RuleIngredient):
 
     @staticmethod
-    def _parse(html_str):
-        parser = ParserPaper(html_str, parser_type='html.parser', debugging=False)
+    def _parse(parser):
         rules = [{'name': 'div'}]
         parser.strip_tags(rules)
         rules = [{'name': 'span', 'id': parser.compile('^sect[0-9]+$')}]  # some span are heading
         _ = parser.strip_tags(rules)
-        return parser.raw_html
+        return parser
+
+
+def _first_meta_content(parser, name):
+    # content of the first <meta> tag of a name, or None.
+    for tag in parser.meta_tags(name):
+        return tag.get('content')
+    return None
+
+
+def _collect_metadata(parser):
+    """
+    DOI, Title, Keywords and Journal of the <meta> tags of a document, None
+    for the ones the document does not have.
+    """
+    keywords = parser.meta_tags('citation_keywords')
+    keys = []
+    for key in keywords:
+        keys.append(parser.format_text(key.get('content')))
+    journal_name = _first_meta_content(parser, 'citation_journal_title')
+    if journal_name is not None:
+        journal_name = parser.format_text(journal_name)
+    doi = _first_meta_content(parser, 'citation_doi')
+    title = _first_meta_content(parser, 'citation_title')
+    if title is not None:
+        title = parser.format_text(title)
+    return {
+        'DOI': doi,
+        'Title': title,
+        'Keywords': keys,
+        'Journal': journal_name,
+    }
+
+
+class WileyReadHead(RuleIngredient):
+    """
+    Collect the metadata from the <head> of the page only, without parsing
+    the article, for WileySoup.parse_metadata(). The whole page is read when
+    its <head> has no DOI, Title or Journal.
+    """
+
+    builds_html = True
+
+    @staticmethod
+    def _parse(html_str, html_parser=DEFAULT_HTML_PARSER):
+        markup = extract_region(html_str, 'head')
+        if markup is not None:
+            metadata = _collect_metadata(ParserPaper(markup, parser_type=html_parser))
+            if all(metadata[key] is not None for key in ('DOI', 'Title', 'Journal')):
+                return metadata
+        # Broken pages may have <meta> tags in <body>.
+        return _collect_metadata(ParserPaper(html_str, parser_type=html_parser))
 
 
 class WileyCollect(RuleIngredient):
 
     @staticmethod
-    def _parse(html_str):
-        soup = BeautifulSoup(html_str, 'html.parser')
-        parser = ParserPaper(html_str, parser_type='html.parser', debugging=False)
+    def _parse(parser):
+        soup = parser.soup
         # Collect information from the paper using ParserPaper
-        keywords = soup.find_all(attrs={'name':'citation_keywords'})
-        keys = []
-        for key in keywords:
-            keys.append(parser.format_text(key.get('content')))
-        journal_name = soup.find(attrs={'name':'citation_journal_title'})
-        journal_name = parser.format_text(journal_name.get('content'))
-        doi = soup.find(attrs={'name':'citation_doi'})
-        doi = doi.get('content')
-        title = soup.find(attrs={'name':'citation_title'})
-        title = parser.format_text(title.get('content'))
+        metadata = _collect_metadata(parser)
         # Create tag from selection function in ParserPaper
         data = list()
         """
@@ -221,14 +259,8 @@ class WileyCollect(RuleIngredient):
                                 'content':[text]
                             }
                             data.insert(-1*index2, obj)
-        obj = {
-            'DOI': doi,
-            'Title': title,
-            'Keywords': keys,
-            'Journal': journal_name,
-            'Sections': data
-        }
-        return obj
+        metadata['Sections'] = data
+        return metadata
 
 
 WileySoup = Soup(parser_version=__version__)
@@ -237,4 +269,5 @@ WileySoup.add_ingredient(WileyRemoveTrash())
 WileySoup.add_ingredient(WileyCreateTags())
 # WileySoup.add_ingredient(WileyCreateTagAbstract())
 WileySoup.add_ingredient(WileyReplaceDivTag())
-WileySoup.add_ingredient(WileyCollect())
\ No newline at end of file
+WileySoup.add_ingredient(WileyCollect())
+WileySoup.add_metadata_ingredient(WileyReadHead())
\ No newline at end of file
@@ -1,12 +1,61 @@
-from LimeSoup.ACSSoup import ACSSoup
-from LimeSoup.AIPSoup import AIPSoup
-from LimeSoup.APSSoup import APSSoup
-from LimeSoup.ECSSoup import ECSSoup
-from LimeSoup.ElsevierSoup import ElsevierSoup
-from LimeSoup.IOPSoup import IOPSoup
-from LimeSoup.SpringerNatureSoup import SpringerNatureSoup
-from LimeSoup.SpringerSoup import SpringerSoup
-from LimeSoup.RSCSoup import RSCSoup
-from LimeSoup.SpringerSoup import SpringerSoup
-from LimeSoup.WileySoup import WileySoup
-from LimeSoup.IOPSoup_old import IOPSoup_old
+"""
+The Soups of the publishers are imported on first use, so that
+
+    from LimeSoup import RSCSoup
+
+only imports LimeSoup.RSCSoup and what it needs. parse_auto() detects the
+publisher of a document and parses it with its Soup.
+"""
+import importlib
+import sys
+import types
+
+# Package attribute -> module defining it.
+_SOUPS = {
+    'ACSSoup': 'LimeSoup.ACSSoup',
+    'AIPSoup': 'LimeSoup.AIPSoup',
+    'APSSoup': 'LimeSoup.APSSoup',
+    'ECSSoup': 'LimeSoup.ECSSoup',
+    'ElsevierSoup': 'LimeSoup.ElsevierSoup',
+    'IOPSoup': 'LimeSoup.IOPSoup',
+    'RSCSoup': 'LimeSoup.RSCSoup',
+    'SpringerNatureSoup': 'LimeSoup.SpringerNatureSoup',
+    'SpringerSoup': 'LimeSoup.SpringerSoup',
+    'WileySoup': 'LimeSoup.WileySoup',
+}
+
+# Package attribute -> module defining it, for other attributes.
+_ATTRIBUTES = dict(_SOUPS, **{
+    'detect_publisher': 'LimeSoup.registry',
+    'parse_auto': 'LimeSoup.registry',
+})
+
+__all__ = sorted(_ATTRIBUTES)
+
+
+class _Package(types.ModuleType):
+    def __setattr__(self, name, value):
+        # Importing LimeSoup.RSCSoup binds the submodule to LimeSoup.RSCSoup,
+        # the package attribute stays the Soup it defines.
+        if name in _SOUPS and isinstance(value, types.ModuleType):
+            value = getattr(value, name)
+        super(_Package, self).__setattr__(name, value)
+
+
+def __getattr__(name):
+    if name not in _ATTRIBUTES:
+        raise AttributeError('module %r has no attribute %r' % (__name__, name))
+    module = importlib.import_module(_ATTRIBUTES[name])
+    return getattr(module, name)
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_ATTRIBUTES))
+
+
+if sys.version_info >= (3, 7):
+    sys.modules[__name__].__class__ = _Package
+else:
+    # Module __getattr__ needs Python 3.7.
+    for _name in _ATTRIBUTES:
+        globals()[_name] = __getattr__(_name)
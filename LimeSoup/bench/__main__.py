@@ -0,0 +1,3 @@
+from LimeSoup.bench.soups import main
+
+main()
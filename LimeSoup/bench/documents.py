@@ -0,0 +1,124 @@
+"""
+Benchmark documents of each publisher.
+
+Every fixture in LimeSoup/bench/fixtures is a small but complete article that
+its Soup parses. The body part between the comments
+
+    <!-- BENCH REPEAT --> ... <!-- /BENCH REPEAT -->
+
+is copied to make larger articles of the same publisher: make_document('rsc',
+'huge') is an RSC article with about 10k paragraphs. Elsevier articles can
+also be made deep, with ce:section elements nested inside each other.
+"""
+import os
+import re
+
+__author__ = 'Kevin Cruse'
+__maintainer__ = 'Kevin Cruse'
+__email__ = 'kevcruse96@gmail.com'
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'fixtures')
+
+# Publisher name, as in LimeSoup.registry.SOUPS -> fixture file.
+FIXTURES = {
+    'acs': 'acs.xml',
+    'aip': 'aip.xml',
+    'aps': 'aps.xml',
+    'ecs': 'ecs.html',
+    'elsevier': 'elsevier.xml',
+    'elsevierlxml': 'elsevier.xml',
+    'elsevierstream': 'elsevier.xml',
+    'iop': 'iop.xml',
+    'rsc': 'rsc.html',
+    'springer': 'springer.html',
+    'springernature': 'springernature.html',
+    'wiley': 'wiley.html',
+}
+
+# Size name -> copies of the repeated part.
+SIZES = {
+    'small': 1,
+    'medium': 100,
+    'huge': 3400,
+}
+# Nesting depth of the sections in 'deep' documents.
+DEEP_SECTIONS = 200
+DEEP_PUBLISHERS = ('elsevier', 'elsevierlxml', 'elsevierstream')
+
+_REPEAT_PATTERN = re.compile(r'<!-- BENCH REPEAT -->\n?(.*?)<!-- /BENCH REPEAT -->\n?', re.DOTALL)
+
+
+def load_fixture(publisher):
+    """
+    :param publisher: publisher name, one of FIXTURES.
+    :return: the fixture article of the publisher, with its markers.
+    """
+    if publisher not in FIXTURES:
+        raise ValueError('No benchmark fixture for publisher %r, expecting one of: %s' %
+                         (publisher, ', '.join(sorted(FIXTURES))))
+    with open(os.path.join(FIXTURE_DIR, FIXTURES[publisher]), encoding='utf-8') as f:
+        return f.read()
+
+
+def _split(document):
+    match = _REPEAT_PATTERN.search(document)
+    if match is None:
+        raise ValueError('Document has no <!-- BENCH REPEAT --> part')
+    return document[:match.start()], match.group(1), document[match.end():]
+
+
+def scale(document, copies):
+    """
+    Repeat the marked part of a document.
+
+    :param document: fixture article.
+    :param copies: number of copies of the marked part, at least 1.
+    :return: the article without its markers.
+    """
+    if copies < 1:
+        raise ValueError('At least one copy is needed, got %r' % copies)
+    head, body, tail = _split(document)
+    return head + body * copies + tail
+
+
+def nest_elsevier_sections(document, depth):
+    """
+    Replace the marked part of an Elsevier article with ce:section elements
+    nested depth levels deep, each with a title and a paragraph.
+
+    :param document: Elsevier fixture article.
+    :param depth: number of nested sections.
+    :return: the article without its markers.
+    """
+    head, _, tail = _split(document)
+    opening = ''.join(
+        '<ce:section id="d{0}"><ce:label>{0}</ce:label><ce:section-title>Level {0}</ce:section-title>'
+        '<ce:para>Paragraph at depth {0} heated at 700&deg;C.</ce:para>\n'.format(level)
+        for level in range(1, depth + 1))
+    return head + opening + '</ce:section>' * depth + '\n' + tail
+
+
+def document_sizes(publisher):
+    """
+    :return: names of the sizes that can be made for a publisher.
+    """
+    sizes = list(SIZES)
+    if publisher in DEEP_PUBLISHERS:
+        sizes.append('deep')
+    return sizes
+
+
+def make_document(publisher, size='small'):
+    """
+    :param publisher: publisher name, one of FIXTURES.
+    :param size: one of SIZES, or 'deep' for Elsevier.
+    :return: benchmark article as a string.
+    """
+    document = load_fixture(publisher)
+    if size == 'deep':
+        if publisher not in DEEP_PUBLISHERS:
+            raise ValueError('Deep documents are only made for %s' % ', '.join(DEEP_PUBLISHERS))
+        return nest_elsevier_sections(document, DEEP_SECTIONS)
+    if size not in SIZES:
+        raise ValueError('Unknown size %r, expecting one of: %s' % (size, ', '.join(SIZES)))
+    return scale(document, SIZES[size])
@@ -0,0 +1,65 @@
+"""
+Benchmark of LimeSoup.parser.paragraphs.extract_paragraphs_recursive on
+long synthetic review articles.
+
+    python -m LimeSoup.bench.paragraphs
+
+The cost per text node should stay flat as the article gets longer.
+"""
+import argparse
+import time
+
+import bs4
+
+from LimeSoup.parser.paragraphs import extract_paragraphs_recursive
+
+__author__ = 'Kevin Cruse'
+__maintainer__ = 'Kevin Cruse'
+__email__ = 'kevcruse96@gmail.com'
+
+
+def make_article(n_sections, paragraphs_per_section=10, inline_per_paragraph=10):
+    """
+    Build an HTML article where every paragraph is full of inline elements,
+    like citations and formulas in a review article.
+    """
+    inline = ''.join(
+        'text <a href="#c{0}">[{0}]</a> and H<sub>2</sub>O '.format(i)
+        for i in range(inline_per_paragraph))
+    paragraph = '<p>{}</p>'.format(inline)
+
+    sections = []
+    for i in range(n_sections):
+        sections.append('<h2>Section {}</h2>'.format(i))
+        sections.append('<h3>Subsection {}</h3>'.format(i))
+        sections.append(paragraph * paragraphs_per_section)
+    return '<html><body><div>{}</div></body></html>'.format(''.join(sections))
+
+
+def run(sizes, repeat=3):
+    print('%10s %12s %10s %14s' % ('sections', 'text nodes', 'seconds', 'us/text node'))
+    for n_sections in sizes:
+        soup = bs4.BeautifulSoup(make_article(n_sections), 'html.parser')
+        n_strings = sum(1 for _ in soup.strings)
+
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            extract_paragraphs_recursive(soup)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        print('%10d %12d %10.3f %14.2f' % (n_sections, n_strings, best, best / n_strings * 1e6))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 40, 160, 640],
+                        help='Numbers of sections of the generated articles.')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per size, the best one is kept.')
+    args = parser.parse_args(argv)
+    run(args.sizes, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
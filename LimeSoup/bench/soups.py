@@ -0,0 +1,231 @@
+"""
+Benchmark of the publisher Soups on the fixture articles of
+LimeSoup.bench.documents.
+
+    python -m LimeSoup.bench
+    python -m LimeSoup.bench rsc elsevier --sizes small huge
+    python -m LimeSoup.bench --save baseline.json
+    python -m LimeSoup.bench --compare baseline.json
+
+Every publisher and size is measured in a new process, so that the peak RSS
+of a measurement is not raised by the ones before it. Huge documents take tens
+of seconds each and are only parsed when asked for with --sizes.
+"""
+import argparse
+import datetime
+import json
+import math
+import multiprocessing
+import platform
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from LimeSoup.bench.documents import FIXTURES, document_sizes, make_document
+from LimeSoup.registry import get_soup
+
+__author__ = 'Kevin Cruse'
+__maintainer__ = 'Kevin Cruse'
+__email__ = 'kevcruse96@gmail.com'
+
+DEFAULT_SIZES = ('small', 'medium', 'deep')
+# Size -> number of timed parses.
+RUNS = {
+    'small': 50,
+    'medium': 5,
+    'huge': 1,
+    'deep': 5,
+}
+
+
+def percentile(values, q):
+    """
+    Nearest-rank percentile.
+
+    :param values: non-empty list of numbers.
+    :param q: percentile between 0 and 100.
+    """
+    values = sorted(values)
+    rank = max(int(math.ceil(q / 100.0 * len(values))), 1)
+    return values[rank - 1]
+
+
+def peak_rss():
+    """
+    :return: peak resident set size of this process in bytes, or None if
+        it cannot be measured on this platform.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere.
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def measure(publisher, size, runs, warmup=1):
+    """
+    Parse one benchmark document repeatedly.
+
+    :param publisher: publisher name, as in LimeSoup.registry.SOUPS.
+    :param size: size of the document, see LimeSoup.bench.documents.
+    :param runs: number of timed parses.
+    :param warmup: number of parses before timing.
+    :return: dictionary of results.
+    """
+    soup = get_soup(publisher)
+    document = make_document(publisher, size)
+    result = {
+        'publisher': publisher,
+        'size': size,
+        'parser_version': soup.version,
+        'document_bytes': len(document.encode('utf-8')),
+    }
+
+    try:
+        for _ in range(warmup):
+            soup.parse(document)
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            soup.parse(document)
+            times.append(time.perf_counter() - start)
+    except Exception as e:
+        result['error'] = '%s: %s' % (type(e).__name__, e)
+        return result
+
+    result.update({
+        'runs': runs,
+        'docs_per_sec': runs / sum(times),
+        'p50': percentile(times, 50),
+        'p99': percentile(times, 99),
+        'peak_rss': peak_rss(),
+    })
+    return result
+
+
+def measure_in_new_process(publisher, size, runs, warmup=1):
+    """
+    Same as measure(), in a new interpreter started for this measurement.
+    """
+    context = multiprocessing.get_context('spawn')
+    pool = context.Pool(1)
+    try:
+        return pool.apply(measure, (publisher, size, runs, warmup))
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def run(publishers, sizes, runs=None, isolate=True):
+    """
+    :param publishers: publisher names.
+    :param sizes: document sizes, skipped for publishers that do not have them.
+    :param runs: number of timed parses per document, RUNS by default.
+    :param isolate: measure every document in a new process.
+    :return: list of results of measure().
+    """
+    results = []
+    print('%-16s %-7s %10s %10s %10s %10s %10s' % (
+        'publisher', 'size', 'KB', 'docs/sec', 'p50 ms', 'p99 ms', 'RSS MB'))
+    for publisher in publishers:
+        for size in sizes:
+            if size not in document_sizes(publisher):
+                continue
+            n = runs if runs is not None else RUNS[size]
+            if isolate:
+                result = measure_in_new_process(publisher, size, n)
+            else:
+                result = measure(publisher, size, n)
+            results.append(result)
+            print_result(result)
+    return results
+
+
+def print_result(result):
+    if 'error' in result:
+        print('%-16s %-7s %10.1f  %s' % (
+            result['publisher'], result['size'], result['document_bytes'] / 1e3, result['error']))
+        return
+    rss = result['peak_rss'] / 1e6 if result['peak_rss'] is not None else float('nan')
+    print('%-16s %-7s %10.1f %10.2f %10.2f %10.2f %10.1f' % (
+        result['publisher'], result['size'], result['document_bytes'] / 1e3, result['docs_per_sec'],
+        result['p50'] * 1e3, result['p99'] * 1e3, rss))
+
+
+def save_baseline(results, path):
+    baseline = {
+        'created': datetime.datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2)
+
+
+def compare(results, path, threshold):
+    """
+    Compare the median latencies with a saved baseline.
+
+    :param results: list of results of measure().
+    :param path: baseline file written by save_baseline().
+    :param threshold: relative slowdown of p50 reported as a regression.
+    :return: list of (publisher, size) that regressed.
+    """
+    with open(path) as f:
+        baseline = json.load(f)
+    previous = {(x['publisher'], x['size']): x for x in baseline['results'] if 'error' not in x}
+
+    print('\nCompared with %s (Python %s, %s)' % (path, baseline['python'], baseline['created']))
+    print('%-16s %-7s %12s %12s %9s' % ('publisher', 'size', 'base p50 ms', 'p50 ms', 'change'))
+    regressions = []
+    for result in results:
+        key = (result['publisher'], result['size'])
+        if key not in previous or 'error' in result:
+            continue
+        change = result['p50'] / previous[key]['p50'] - 1
+        flag = ''
+        if change > threshold:
+            flag = ' SLOWER'
+            regressions.append(key)
+        print('%-16s %-7s %12.2f %12.2f %+8.1f%%%s' % (
+            key[0], key[1], previous[key]['p50'] * 1e3, result['p50'] * 1e3, change * 100, flag))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n\n')[0])
+    parser.add_argument('publishers', nargs='*', metavar='publisher',
+                        help='Publishers to benchmark, all by default: %s.' % ', '.join(sorted(FIXTURES)))
+    parser.add_argument('--sizes', nargs='+', default=list(DEFAULT_SIZES),
+                        choices=['small', 'medium', 'huge', 'deep'],
+                        help='Document sizes, default: %s.' % ' '.join(DEFAULT_SIZES))
+    parser.add_argument('--runs', type=int, default=None,
+                        help='Timed parses per document, default depends on the size.')
+    parser.add_argument('--in-process', action='store_true',
+                        help='Measure in this process. Peak RSS is then the peak of the whole run.')
+    parser.add_argument('--save', metavar='PATH', help='Save the results as a baseline.')
+    parser.add_argument('--compare', metavar='PATH',
+                        help='Compare with a baseline, exit with status 1 if a document got slower.')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Relative p50 slowdown counted as a regression, default: 0.2.')
+    args = parser.parse_args(argv)
+
+    publishers = args.publishers or sorted(FIXTURES)
+    for publisher in publishers:
+        if publisher not in FIXTURES:
+            parser.error('unknown publisher %r' % publisher)
+    results = run(publishers, args.sizes, args.runs, isolate=not args.in_process)
+
+    if args.save:
+        save_baseline(results, args.save)
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
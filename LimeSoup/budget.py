@@ -0,0 +1,154 @@
+"""
+Time and size budgets of the parsing of one document.
+
+    data = RSCSoup.parse(html_str, budget=Budget(seconds=10, max_bytes=5000000))
+
+The size of the document and its number of tags are checked before it is
+parsed. The time is checked between the steps of the pipeline and, with
+checkpoint(), while the slow steps walk the DOM (tag rules, sections and
+paragraphs), so a step is stopped soon after the deadline. Building the DOM
+itself cannot be stopped: that is what max_bytes and max_nodes are for.
+
+When a budget is exceeded, Soup.parse() raises BudgetExceeded, or, if the
+budget has a fallback, returns the paragraphs of a plain text extraction of
+the document, with the reason under "Degraded".
+"""
+import contextlib
+import html
+import re
+import time
+
+__author__ = 'Kevin Cruse'
+__maintainer__ = 'Kevin Cruse'
+__email__ = 'kevcruse96@gmail.com'
+__all__ = ['Budget', 'BudgetExceeded', 'checkpoint', 'current_budget', 'plain_text_paragraphs']
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+class Budget(object):
+    """
+    Limits of the parsing of one document.
+    """
+
+    def __init__(self, seconds=None, max_bytes=None, max_nodes=None, fallback=True):
+        """
+        :param seconds: wall time allowed to parse the document.
+        :param max_bytes: largest document, in bytes of UTF-8.
+        :param max_nodes: largest number of tags, counted as the "<" of the
+            document.
+        :param fallback: if True, a document over budget is extracted as plain
+            text paragraphs and marked as degraded; otherwise BudgetExceeded
+            is raised.
+        """
+        self.seconds = seconds
+        self.max_bytes = max_bytes
+        self.max_nodes = max_nodes
+        self.fallback = fallback
+
+    def __repr__(self):
+        return 'Budget(seconds=%r, max_bytes=%r, max_nodes=%r, fallback=%r)' % (
+            self.seconds, self.max_bytes, self.max_nodes, self.fallback)
+
+    def check_size(self, html_str):
+        """
+        :raise BudgetExceeded: if the document is too large.
+        """
+        if isinstance(html_str, str):
+            # Encoding is only needed when the number of characters is not enough to tell.
+            if self.max_bytes is not None and len(html_str) * 4 > self.max_bytes:
+                if len(html_str) > self.max_bytes or len(html_str.encode('utf-8')) > self.max_bytes:
+                    raise BudgetExceeded('Document larger than %d bytes' % self.max_bytes)
+            if self.max_nodes is not None and html_str.count('<') > self.max_nodes:
+                raise BudgetExceeded('Document has more than %d tags' % self.max_nodes)
+        elif isinstance(html_str, bytes):
+            if self.max_bytes is not None and len(html_str) > self.max_bytes:
+                raise BudgetExceeded('Document larger than %d bytes' % self.max_bytes)
+            if self.max_nodes is not None and html_str.count(b'<') > self.max_nodes:
+                raise BudgetExceeded('Document has more than %d tags' % self.max_nodes)
+
+
+# Budget of the document being parsed in this process and its deadline, or
+# None. Documents are parsed one at a time by a process, like instrumentation
+# the budget is kept in a global.
+_active = None
+_deadline = None
+
+
+def current_budget():
+    """
+    :return: the Budget of the document being parsed, or None.
+    """
+    return _active
+
+
+@contextlib.contextmanager
+def running(budget):
+    """
+    Start the clock of a budget. A budget started while another one runs
+    keeps the deadline of the first.
+    """
+    global _active, _deadline
+    if _active is not None:
+        yield
+        return
+    _active = budget
+    _deadline = None if budget.seconds is None else time.monotonic() + budget.seconds
+    try:
+        yield
+    finally:
+        _active = _deadline = None
+
+
+def checkpoint():
+    """
+    :raise BudgetExceeded: if the budget of the document being parsed has no
+        time left.
+    """
+    if _deadline is not None and time.monotonic() > _deadline:
+        raise BudgetExceeded('Parsing took more than %g seconds' % _active.seconds)
+
+
+_HIDDEN_PATTERN = re.compile(
+    r'<(script|style|head|(?:\w+:)?math)\b[^>]*>.*?</\1\s*>|<!--.*?-->|<!\[CDATA\[.*?\]\]>',
+    re.DOTALL | re.IGNORECASE)
+_BLOCK_PATTERN = re.compile(
+    r'</?(?:p|div|br|li|ul|ol|dl|dt|dd|tr|table|blockquote|figure|figcaption|caption|section|article|'
+    r'h[1-6]|title|abstract|para|sec|ce:para|ce:section-title|ce:abstract)\b[^>]*>', re.IGNORECASE)
+_TAG_PATTERN = re.compile(r'<[^>]*>')
+_TITLE_PATTERN = re.compile(r'<title(?:\s[^>]*)?>(.*?)</title\s*>', re.DOTALL | re.IGNORECASE)
+_SPACE_PATTERN = re.compile(r'[ \t\r\f\v\xa0]+')
+
+
+def plain_text_paragraphs(html_str):
+    """
+    Extract paragraphs with regular expressions, without building a DOM: a
+    block element ends a paragraph, other tags are dropped, and so are
+    scripts, styles, <head> and math.
+
+    :param html_str: document, str or bytes.
+    :return: dict with "Title" and "Sections", one section holding every
+        paragraph.
+    """
+    if isinstance(html_str, bytes):
+        html_str = html_str.decode('utf-8', 'replace')
+
+    title = _TITLE_PATTERN.search(html_str)
+    if title is not None:
+        title = _SPACE_PATTERN.sub(' ', html.unescape(_TAG_PATTERN.sub('', title.group(1)))).strip() or None
+
+    text = _HIDDEN_PATTERN.sub(' ', html_str).replace('\n', ' ')
+    text = _BLOCK_PATTERN.sub('\n', text)
+    text = html.unescape(_TAG_PATTERN.sub('', text))
+    paragraphs = []
+    for line in text.split('\n'):
+        line = _SPACE_PATTERN.sub(' ', line).strip()
+        if line:
+            paragraphs.append(line)
+
+    return {
+        'Title': title,
+        'Sections': [{'type': 'section_h1', 'name': '', 'content': paragraphs}],
+    }
@@ -0,0 +1,254 @@
+"""
+Cache of parsed documents, keyed by the content of the document and the
+name and version of the Soup that parsed it.
+
+    cache = DirectoryCache('parsed-cache/')
+    soup = CachedSoup(RSCSoup, cache)
+    data = soup.parse(html_str)    # parsed by RSCSoup
+    data = soup.parse(html_str)    # read from the cache
+
+A document is parsed again once the version of its Soup changes, so a corpus
+can be reparsed after one parser is bumped and only the documents of that
+publisher cost anything. Documents that fail to parse, or that go over their
+budget (see LimeSoup.budget), are not cached.
+
+Three backends are provided: MemoryCache, an LRU cache in this process;
+SQLiteCache, a single database file; and DirectoryCache, one compressed JSON
+file per document. The two on-disk caches can be shared by worker processes.
+"""
+import collections
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import zlib
+
+from LimeSoup.instrumentation import soup_label
+from LimeSoup.lime_soup import DEFAULT_HTML_PARSER, Soup, iter_sections
+
+__author__ = 'Kevin Cruse'
+__maintainer__ = 'Kevin Cruse'
+__email__ = 'kevcruse96@gmail.com'
+__all__ = ['CachedSoup', 'MemoryCache', 'SQLiteCache', 'DirectoryCache', 'open_cache', 'document_key']
+
+
+def document_key(name, version, html_str):
+    """
+    :param name: name of the Soup.
+    :param version: version of the Soup.
+    :param html_str: raw document, str or bytes.
+    :return: hex digest identifying the parse of a document by a Soup.
+    """
+    digest = hashlib.sha256()
+    digest.update(('%s\0%s\0' % (name, version)).encode('utf-8'))
+    if isinstance(html_str, bytes):
+        digest.update(html_str)
+    else:
+        digest.update(html_str.encode('utf-8', 'surrogatepass'))
+    return digest.hexdigest()
+
+
+class MemoryCache(object):
+    """
+    Least recently used cache in the memory of this process.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        """
+        :param max_bytes: total size of the cached JSON documents, the least
+            recently used ones are dropped beyond it.
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._items[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                _, dropped = self._items.popitem(last=False)
+                self.size -= len(dropped)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._items)
+
+
+class SQLiteCache(object):
+    """
+    Cache in an SQLite database, with zlib compressed documents.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: database file, created if it does not exist.
+        """
+        self.path = path
+        self._connection = None
+        self._pid = None
+
+    def __getstate__(self):
+        # Connections cannot be shared with other processes.
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'])
+
+    @property
+    def connection(self):
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = sqlite3.connect(self.path, timeout=60, check_same_thread=False)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS documents (key TEXT PRIMARY KEY, value BLOB NOT NULL)')
+            self._pid = os.getpid()
+        return self._connection
+
+    def get(self, key):
+        row = self.connection.execute('SELECT value FROM documents WHERE key = ?', (key,)).fetchone()
+        return zlib.decompress(row[0]) if row is not None else None
+
+    def set(self, key, value):
+        with self.connection:
+            self.connection.execute('INSERT OR REPLACE INTO documents VALUES (?, ?)',
+                                    (key, zlib.compress(value)))
+
+    def clear(self):
+        with self.connection:
+            self.connection.execute('DELETE FROM documents')
+
+    def __len__(self):
+        return self.connection.execute('SELECT COUNT(*) FROM documents').fetchone()[0]
+
+
+class DirectoryCache(object):
+    """
+    Cache in a directory, with one gzipped JSON file per document.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: directory, created if it does not exist.
+        """
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, key):
+        return os.path.join(self.path, key[:2], key + '.json.gz')
+
+    def get(self, key):
+        try:
+            with open(self._file(key), 'rb') as f:
+                return gzip.decompress(f.read())
+        except FileNotFoundError:
+            return None
+
+    def set(self, key, value):
+        path = self._file(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write aside and rename, readers never see a partial file.
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(gzip.compress(value, compresslevel=6))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _files(self):
+        for root, _, files in os.walk(self.path):
+            for name in files:
+                if name.endswith('.json.gz'):
+                    yield os.path.join(root, name)
+
+    def clear(self):
+        for path in list(self._files()):
+            os.unlink(path)
+
+    def __len__(self):
+        return sum(1 for _ in self._files())
+
+
+def open_cache(path):
+    """
+    Open an on-disk cache: SQLiteCache for files ending with .sqlite, .sqlite3
+    or .db, DirectoryCache otherwise.
+    """
+    if path.endswith(('.sqlite', '.sqlite3', '.db')):
+        return SQLiteCache(path)
+    return DirectoryCache(path)
+
+
+class CachedSoup(Soup):
+    """
+    A Soup that reads the results of another Soup from a cache.
+    """
+
+    def __init__(self, soup, cache, name=None):
+        """
+        :param soup: Soup object, it must have a version.
+        :param cache: MemoryCache, SQLiteCache, DirectoryCache or any object
+            with get(key) and set(key, value) methods on bytes values.
+        :param name: name of the soup in cache keys, by default the module of
+            its first ingredient, such as "RSCSoup".
+        """
+        if soup.version is None:
+            raise ValueError('Soup has no parser version, its results cannot be cached')
+        super(CachedSoup, self).__init__(parser_version=soup.version, html_parser=soup.html_parser)
+        self.soup = soup
+        self.cache = cache
+        self.name = name or soup_label(soup)
+        # Results of other tree builders are kept apart.
+        if soup.html_parser != DEFAULT_HTML_PARSER:
+            self.name += '+' + soup.html_parser
+        self.hits = 0
+        self.misses = 0
+
+    def add_ingredient(self, ingredient):
+        raise ValueError('Add ingredients to the cached soup instead')
+
+    def parse(self, html_str, budget=None):
+        key = document_key(self.name, self.version, html_str)
+        value = self.cache.get(key)
+        if value is not None:
+            self.hits += 1
+            return json.loads(value.decode('utf-8'))
+
+        self.misses += 1
+        data = self.soup.parse(html_str, budget=budget)
+        # A degraded result depends on the budget, the document may fit the next one.
+        if not (isinstance(data, dict) and 'Degraded' in data):
+            self.cache.set(key, json.dumps(data, ensure_ascii=False).encode('utf-8'))
+        return data
+
+    def iter_paragraphs(self, html_str):
+        """
+        Yield the paragraphs of the cached result of a document, see
+        Soup.iter_paragraphs().
+        """
+        data = self.parse(html_str)
+        if isinstance(data, dict):
+            for paragraph in iter_sections(data.get('Sections') or []):
+                yield paragraph
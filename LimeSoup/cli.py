@@ -0,0 +1,402 @@
+"""
+Command line interface of LimeSoup.
+
+    limesoup parse articles/ --publisher rsc -o parsed.jsonl
+    limesoup parse dump.tar.gz --publisher wiley --workers 8
+    limesoup parse records.jsonl > parsed.jsonl
+    limesoup parse articles/ --publisher rsc --cache parsed-cache/
+    limesoup parse articles/ --format columnar -o parsed.msgpack
+    limesoup parse mixed-dump.tar.gz
+    limesoup serve --port 8080 --workers 8
+
+Inputs can be directory trees, tarballs, JSONL files of {doi, publisher, html}
+records, or single files. The publisher of a document without one is detected
+from its first characters, see LimeSoup.registry. Documents are streamed: only the documents being
+parsed by the workers are held in memory, and every result is written as one
+JSON line as soon as it is available. "limesoup serve" runs the parsing
+service of LimeSoup.service.
+"""
+import argparse
+import collections
+import gzip
+import io
+import itertools
+import json
+import os
+import re
+import sys
+import tarfile
+import zlib
+
+from LimeSoup.budget import Budget, current_budget
+from LimeSoup.cache import CachedSoup, open_cache
+from LimeSoup.columnar import ColumnarWriter
+from LimeSoup.lime_soup import Soup, RuleIngredient
+from LimeSoup.registry import SOUPS, detect_publisher, get_soup
+
+__author__ = 'Kevin Cruse'
+__maintainer__ = 'Kevin Cruse'
+__email__ = 'kevcruse96@gmail.com'
+
+# Errors of reading one document: I/O, gzip and UTF-8 decoding.
+_READ_ERRORS = (OSError, EOFError, UnicodeDecodeError, zlib.error)
+
+
+class RoutePublisher(RuleIngredient):
+    def __init__(self, cache=None, html_parser=None, metadata=False):
+        super(RoutePublisher, self).__init__()
+        self.cache = cache
+        self.html_parser = html_parser
+        self.metadata = metadata
+
+    def _parse(self, record):
+        publisher, html_str = record
+        if publisher is None:
+            raise ValueError('The publisher of the document is not given and cannot be detected')
+        soup = get_soup(publisher, html_parser=self.html_parser)
+        if self.metadata:
+            return soup.parse_metadata(html_str)
+        if self.cache is not None:
+            soup = CachedSoup(soup, self.cache)
+        # The Soup of the publisher falls back on the document itself.
+        return soup.parse(html_str, budget=current_budget())
+
+
+def make_router(cache=None, html_parser=None, metadata=False):
+    """
+    :param cache: cache of parsed documents, see LimeSoup.cache.
+    :param html_parser: tree builder of HTML documents, see LimeSoup.registry.get_soup().
+    :param metadata: if True, only read the metadata of documents, see
+        LimeSoup.lime_soup.Soup.parse_metadata().
+    :return: Soup parsing (publisher, document) pairs with the Soup of the publisher.
+    """
+    router = Soup(parser_version=None)
+    router.add_ingredient(RoutePublisher(cache, html_parser, metadata))
+    return router
+
+
+RouterSoup = make_router()
+
+
+def _open_text(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, encoding='utf-8')
+
+
+def _error(e):
+    return '%s: %s' % (type(e).__name__, e)
+
+
+def _read_text(path):
+    """
+    :return: record of a file, with "error" instead of "html" if it cannot be read.
+    """
+    try:
+        with _open_text(path) as f:
+            return {'path': path, 'html': f.read()}
+    except _READ_ERRORS as e:
+        return {'path': path, 'error': _error(e)}
+
+
+def iter_jsonl(path):
+    """
+    Read {doi, publisher, html} records from a JSONL file, "-" is stdin.
+    Lines that cannot be decoded are records with an "error".
+    """
+    try:
+        if path == '-':
+            f = sys.stdin.buffer
+        elif path.endswith('.gz'):
+            f = gzip.open(path, 'rb')
+        else:
+            f = open(path, 'rb')
+    except OSError as e:
+        yield {'path': path, 'error': _error(e)}
+        return
+    try:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            line_path = '%s:%d' % (path, line_number)
+            try:
+                record = json.loads(line.decode('utf-8'))
+                if not isinstance(record, dict):
+                    raise ValueError('Expecting a JSON object, got %s' % type(record).__name__)
+            except ValueError as e:
+                yield {'path': line_path, 'error': _error(e)}
+                continue
+            record.setdefault('path', line_path)
+            yield record
+    except _READ_ERRORS as e:
+        # A truncated or corrupt gzip file ends the stream.
+        yield {'path': path, 'error': _error(e)}
+    finally:
+        if f is not sys.stdin.buffer:
+            f.close()
+
+
+def iter_directory(path):
+    """
+    Read every file under a directory, in sorted order.
+    """
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            if name.startswith('.'):
+                continue
+            yield _read_text(os.path.join(root, name))
+
+
+def iter_tarball(path):
+    """
+    Read every file in a (compressed) tarball without extracting it.
+    """
+    # Stream mode reads members one by one and never seeks back, so a
+    # corrupt archive ends the stream, a corrupt member does not.
+    try:
+        with tarfile.open(path, mode='r|*') as tar:
+            for member in tar:
+                if not member.isfile():
+                    continue
+                data = tar.extractfile(member).read()
+                try:
+                    if member.name.endswith('.gz'):
+                        data = gzip.decompress(data)
+                    yield {'path': member.name, 'html': data.decode('utf-8')}
+                except _READ_ERRORS as e:
+                    yield {'path': member.name, 'error': _error(e)}
+    except (tarfile.TarError,) + _READ_ERRORS as e:
+        yield {'path': path, 'error': _error(e)}
+
+
+def iter_file(path):
+    """
+    Read a single document.
+    """
+    yield _read_text(path)
+
+
+def iter_records(path):
+    """
+    Read documents from a path. Directories, tarballs, JSONL files (also
+    gzipped, "-" for stdin) and single files are supported.
+
+    :return: generator of dict with "html" and optionally "doi", "publisher"
+        and "path", or with "path" and "error" for documents that cannot be
+        read.
+    """
+    if os.path.isdir(path):
+        return iter_directory(path)
+    if path == '-' or re.search(r'\.jsonl?(\.gz)?$', path):
+        return iter_jsonl(path)
+    try:
+        is_tarball = tarfile.is_tarfile(path)
+    except OSError:
+        # Missing or unreadable, iter_file() reports it.
+        is_tarball = False
+    if is_tarball:
+        return iter_tarball(path)
+    return iter_file(path)
+
+
+def parse_records(records, publisher=None, workers=1, chunksize=1, cache=None, budget=None,
+                  html_parser=None, metadata=False):
+    """
+    Parse records with the Soup of their publisher.
+
+    Records are pulled from the iterable only when a worker is ready for them,
+    so memory does not grow with the size of the corpus.
+
+    :param records: iterable of dict with "html" and optionally "doi",
+        "publisher" and "path". Records with an "error", or without "html",
+        are reported as failed without being parsed.
+    :param publisher: publisher of records that do not specify one, they are
+        detected with LimeSoup.registry.detect_publisher() if it is None or "auto".
+    :param workers: number of worker processes.
+    :param chunksize: number of documents sent to a worker in one task.
+    :param cache: cache of parsed documents shared by the workers, such as
+        LimeSoup.cache.DirectoryCache.
+    :param budget: LimeSoup.budget.Budget of each document.
+    :param html_parser: tree builder of HTML documents, such as "lxml", or
+        "fastest" for the fastest one giving the same results as html.parser
+        on well-formed markup for each publisher, see
+        LimeSoup.registry.fastest_html_parser().
+    :param metadata: if True, "data" only holds the metadata of the
+        documents, read without parsing their body when the Soup can.
+    :return: generator of dict, one per record, holding "data" or "error".
+    """
+    if cache is None and html_parser is None and not metadata:
+        router = RouterSoup
+    else:
+        router = make_router(cache, html_parser, metadata)
+    in_flight = {}
+    # Records that failed before parsing, written with the next result.
+    failed = collections.deque()
+    # Indices of the documents in parse_many().
+    indices = itertools.count()
+
+    def documents():
+        for record in records:
+            output = {
+                'doi': record.get('doi'),
+                'path': record.get('path'),
+                'publisher': record.get('publisher') or publisher,
+            }
+            if 'error' in record or not isinstance(record.get('html'), (str, bytes)):
+                output['error'] = record.get('error') or 'KeyError: record has no "html"'
+                failed.append(output)
+                continue
+            if output['publisher'] in (None, 'auto'):
+                output['publisher'] = detect_publisher(record['html'])
+            in_flight[next(indices)] = output
+            yield output['publisher'], record['html']
+
+    for result in router.parse_many(
+            documents(), workers=workers, chunksize=chunksize, ordered=False, budget=budget):
+        while failed:
+            yield failed.popleft()
+        output = in_flight.pop(result.index)
+        if result.error is None:
+            output['data'] = result.data
+        else:
+            output['error'] = _error(result.error)
+        yield output
+    while failed:
+        yield failed.popleft()
+
+
+def make_budget(args):
+    """
+    :return: Budget of the --max-* options, or None if none is given.
+    """
+    if args.max_seconds is None and args.max_bytes is None and args.max_nodes is None:
+        return None
+    return Budget(seconds=args.max_seconds, max_bytes=args.max_bytes, max_nodes=args.max_nodes,
+                  fallback=not args.no_fallback)
+
+
+def add_budget_arguments(parser):
+    parser.add_argument('--max-seconds', type=float,
+                        help='Time allowed to parse one document.')
+    parser.add_argument('--max-bytes', type=int, help='Largest document parsed.')
+    parser.add_argument('--max-nodes', type=int, help='Largest number of tags of a document parsed.')
+    parser.add_argument('--no-fallback', action='store_true',
+                        help='Fail documents over budget instead of extracting their plain text.')
+
+
+def add_html_parser_argument(parser):
+    parser.add_argument('--html-parser', metavar='NAME',
+                        help='Tree builder of HTML documents: html.parser (default), lxml, html5lib, '
+                             'or "fastest" for the fastest one giving the same results as html.parser on '
+                             'well-formed markup for each publisher; results may differ on broken markup.')
+
+
+def command_parse(args):
+    def records():
+        for path in args.inputs:
+            for record in iter_records(path):
+                yield record
+
+    columnar = args.format == 'columnar'
+    if columnar:
+        if args.output == '-':
+            print('--format columnar needs an output file, see -o.', file=sys.stderr)
+            return 2
+        output = ColumnarWriter(args.output)
+    elif args.output == '-':
+        output = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    else:
+        output = open(args.output, 'w', encoding='utf-8')
+
+    n_parsed, n_failed, n_degraded = 0, 0, 0
+    try:
+        cache = open_cache(args.cache) if args.cache else None
+        for result in parse_records(records(), publisher=args.publisher, workers=args.workers,
+                                    chunksize=args.chunksize, cache=cache, budget=make_budget(args),
+                                    html_parser=args.html_parser, metadata=args.metadata_only):
+            if columnar:
+                output.add(result.get('data'), {key: value for key, value in result.items() if key != 'data'})
+            else:
+                output.write(json.dumps(result, ensure_ascii=False))
+                output.write('\n')
+            n_parsed += 1
+            if 'error' in result:
+                n_failed += 1
+            elif isinstance(result['data'], dict) and 'Degraded' in result['data']:
+                n_degraded += 1
+    finally:
+        if args.output == '-':
+            # Keep sys.stdout usable after the wrapper is gone.
+            output.flush()
+            output.detach()
+        else:
+            output.close()
+
+    print('Parsed %d documents, %d failed, %d degraded.' % (n_parsed, n_failed, n_degraded), file=sys.stderr)
+    return 0
+
+
+def command_serve(args):
+    # Only the service needs asyncio and Python 3.7.
+    from LimeSoup.service import serve
+    if args.unix is None:
+        print('Serving on http://%s:%d' % (args.host, args.port), file=sys.stderr)
+    else:
+        print('Serving on %s' % args.unix, file=sys.stderr)
+    serve(args.host, args.port, path=args.unix, workers=args.workers, large_workers=args.large_workers,
+          large_size=args.large_size, max_pending=args.max_pending, budget=make_budget(args),
+          html_parser=args.html_parser)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='limesoup', description=__doc__.split('\n\n')[0].strip())
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    parse = commands.add_parser('parse', help='Parse papers into JSON lines.')
+    parse.add_argument('inputs', nargs='+',
+                       help='Directories, tarballs, JSONL files ("-" for stdin) or files.')
+    parse.add_argument('-p', '--publisher',
+                       help='Publisher of documents without one: %s. '
+                            'Detected for every document by default.' % ', '.join(sorted(SOUPS)))
+    parse.add_argument('-o', '--output', default='-', help='Output file, default stdout.')
+    parse.add_argument('--format', choices=['jsonl', 'columnar'], default='jsonl',
+                       help='JSON lines, or columns of paragraphs and sections read with '
+                            'LimeSoup.columnar.ColumnarReader: msgpack if the output ends with .msgpack '
+                            'or .msgpack.gz, JSON lines of columns otherwise, gzipped if it ends with .gz.')
+    parse.add_argument('-w', '--workers', type=int, default=1, help='Number of worker processes.')
+    parse.add_argument('--chunksize', type=int, default=1, help='Documents per worker task.')
+    parse.add_argument('--cache', metavar='PATH',
+                       help='Reuse the results of documents parsed before by the same parser version: '
+                            'a directory, or an SQLite file ending with .sqlite or .db.')
+    parse.add_argument('--metadata-only', action='store_true',
+                       help='Only output DOI, title, journal and keywords, reading the header of documents '
+                            'without parsing their body where the parser supports it.')
+    add_budget_arguments(parse)
+    add_html_parser_argument(parse)
+    parse.set_defaults(func=command_parse)
+
+    serve = commands.add_parser('serve', help='Parse papers sent over HTTP.')
+    serve.add_argument('--host', default='127.0.0.1', help='Address to listen on.')
+    serve.add_argument('--port', type=int, default=8080, help='Port to listen on.')
+    serve.add_argument('--unix', metavar='PATH', help='Listen on a Unix socket instead of a port.')
+    serve.add_argument('-w', '--workers', type=int, default=None,
+                       help='Number of worker processes, default the number of CPUs.')
+    serve.add_argument('--large-workers', type=int, default=None,
+                       help='Worker processes kept for large documents, default a quarter of --workers.')
+    serve.add_argument('--large-size', type=int, default=1000000,
+                       help='Size, in characters, from which a document is large.')
+    serve.add_argument('--max-pending', type=int, default=1000,
+                       help='Documents accepted at a time, beyond which requests get 503.')
+    add_budget_arguments(serve)
+    add_html_parser_argument(serve)
+    serve.set_defaults(func=command_serve)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,303 @@
+"""
+Columnar files of parsed documents.
+
+The section tree of each document is flattened into columns: one row per
+paragraph (text, section id) and one row per section (parent, type, name,
+depth, first paragraph). Jobs that only need paragraphs and their section
+paths read the columns as they are; the nested documents are rebuilt on
+demand.
+
+    with ColumnarWriter('parsed.msgpack') as writer:
+        for data in parsed:
+            writer.add(data, {'doi': doi})
+
+    reader = ColumnarReader('parsed.msgpack')
+    for document, text, path in reader.paragraphs():
+        ...
+    for record in reader.records():
+        data = record['data']
+
+A file is a stream of chunks of up to chunk_size documents, each a map of
+columns where section ids are rows of the chunk, so files are written and
+read without holding the whole corpus. Chunks are encoded with msgpack for
+paths ending with .msgpack or .msgpack.gz (pip install msgpack), or as JSON
+lines otherwise, gzipped for paths ending with .gz.
+"""
+import gzip
+import json
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+__author__ = 'Kevin Cruse'
+__maintainer__ = 'Kevin Cruse'
+__email__ = 'kevcruse96@gmail.com'
+__all__ = ['ColumnarWriter', 'ColumnarReader', 'flatten', 'unflatten']
+
+# Version of the layout of chunks.
+LAYOUT_VERSION = 1
+
+_SECTION_KEYS = {'type', 'name', 'content'}
+
+
+def _new_chunk():
+    return {
+        'layout': LAYOUT_VERSION,
+        # One row per document: the fields of the record (doi, path, ...),
+        # the parsed data without "Sections", and where its rows start.
+        'document_info': [],
+        'document_meta': [],
+        'document_paragraphs': [],
+        'document_sections': [],
+        # One row per paragraph: its text and the id of its section, -1 at the top.
+        'paragraph_text': [],
+        'paragraph_section': [],
+        # One row per section, parents before children.
+        'section_parent': [],
+        'section_type': [],
+        'section_name': [],
+        'section_depth': [],
+        # Index of the first paragraph of the section, sections before
+        # paragraphs with the same index.
+        'section_start': [],
+        # The content of the section is one string instead of a list.
+        'section_scalar': [],
+    }
+
+
+def _flatten_sections(sections, parent, depth, chunk):
+    for item in sections:
+        if isinstance(item, str):
+            chunk['paragraph_text'].append(item)
+            chunk['paragraph_section'].append(parent)
+            continue
+        if not isinstance(item, dict) or not set(item) <= _SECTION_KEYS:
+            raise ValueError('Cannot flatten %r, expecting strings and {type, name, content} sections' %
+                             (item,))
+
+        section_id = len(chunk['section_parent'])
+        chunk['section_parent'].append(parent)
+        chunk['section_type'].append(item.get('type'))
+        chunk['section_name'].append(item.get('name'))
+        chunk['section_depth'].append(depth)
+        chunk['section_start'].append(len(chunk['paragraph_text']))
+        content = item.get('content')
+        if isinstance(content, list):
+            chunk['section_scalar'].append(False)
+            _flatten_sections(content, section_id, depth + 1, chunk)
+        else:
+            chunk['section_scalar'].append(True)
+            chunk['paragraph_text'].append(content)
+            chunk['paragraph_section'].append(section_id)
+
+
+def _add_document(chunk, data, info):
+    chunk['document_info'].append(info)
+    chunk['document_paragraphs'].append(len(chunk['paragraph_text']))
+    chunk['document_sections'].append(len(chunk['section_parent']))
+    if isinstance(data, dict):
+        chunk['document_meta'].append({key: value for key, value in data.items() if key != 'Sections'})
+        _flatten_sections(data.get('Sections') or [], -1, 0, chunk)
+    else:
+        chunk['document_meta'].append(None)
+
+
+def flatten(documents):
+    """
+    Flatten parsed documents into one chunk of columns.
+
+    :param documents: iterable of parsed data, dict with "Sections".
+    :return: dict of columns.
+    """
+    chunk = _new_chunk()
+    for data in documents:
+        _add_document(chunk, data, None)
+    return chunk
+
+
+def _document_rows(chunk, index):
+    n_documents = len(chunk['document_meta'])
+    paragraphs = chunk['document_paragraphs']
+    sections = chunk['document_sections']
+    if index + 1 < n_documents:
+        return (paragraphs[index], paragraphs[index + 1]), (sections[index], sections[index + 1])
+    return (paragraphs[index], len(chunk['paragraph_text'])), (sections[index], len(chunk['section_parent']))
+
+
+def _rebuild(chunk, index):
+    meta = chunk['document_meta'][index]
+    if meta is None:
+        return None
+    (p_begin, p_end), (s_begin, s_end) = _document_rows(chunk, index)
+    text, paragraph_section = chunk['paragraph_text'], chunk['paragraph_section']
+    section_parent, section_start = chunk['section_parent'], chunk['section_start']
+
+    # Walk paragraphs and sections in document order, sections first when
+    # they start at the same paragraph.
+    root = []
+    # Content lists by section id, and sections whose content is one string.
+    lists = {-1: root}
+    scalars = {}
+    s = s_begin
+    for p in range(p_begin, p_end + 1):
+        while s < s_end and (p == p_end or section_start[s] <= p):
+            section = {'type': chunk['section_type'][s], 'name': chunk['section_name'][s]}
+            if chunk['section_scalar'][s]:
+                section['content'] = None
+                scalars[s] = section
+            else:
+                section['content'] = lists[s] = []
+            lists[section_parent[s]].append(section)
+            s += 1
+        if p == p_end:
+            break
+        section_id = paragraph_section[p]
+        if section_id in scalars:
+            scalars[section_id]['content'] = text[p]
+        else:
+            lists[section_id].append(text[p])
+
+    data = dict(meta)
+    data['Sections'] = root
+    return data
+
+
+def unflatten(chunk):
+    """
+    Rebuild the parsed documents of a chunk of columns.
+
+    :param chunk: dict of columns, as made by flatten().
+    :return: list of parsed data.
+    """
+    return [_rebuild(chunk, index) for index in range(len(chunk['document_meta']))]
+
+
+def _use_msgpack(path):
+    if path.endswith('.gz'):
+        path = path[:-len('.gz')]
+    if not path.endswith('.msgpack'):
+        return False
+    if msgpack is None:
+        raise ValueError('Writing or reading %s needs msgpack, install it with "pip install msgpack"' % path)
+    return True
+
+
+class ColumnarWriter(object):
+    """
+    Write parsed documents to a columnar file, one chunk at a time.
+    """
+
+    def __init__(self, path, chunk_size=1000):
+        """
+        :param path: output file, msgpack if it ends with .msgpack or
+            .msgpack.gz, JSON lines otherwise, gzipped if it ends with .gz.
+        :param chunk_size: documents per chunk.
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        self.binary = _use_msgpack(path)
+        mode = 'wb' if self.binary else 'wt'
+        if path.endswith('.gz'):
+            self.file = gzip.open(path, mode, encoding=None if self.binary else 'utf-8')
+        else:
+            self.file = open(path, mode, encoding=None if self.binary else 'utf-8')
+        self.chunk = _new_chunk()
+
+    def add(self, data, info=None):
+        """
+        :param data: parsed data, dict with "Sections", or None for a document
+            that failed.
+        :param info: JSON-serializable fields of the record, such as "doi".
+        """
+        _add_document(self.chunk, data, info)
+        if len(self.chunk['document_meta']) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self.chunk['document_meta']:
+            return
+        if self.binary:
+            self.file.write(msgpack.packb(self.chunk, use_bin_type=True))
+        else:
+            self.file.write(json.dumps(self.chunk, ensure_ascii=False, separators=(',', ':')))
+            self.file.write('\n')
+        self.chunk = _new_chunk()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class ColumnarReader(object):
+    """
+    Read a file written by ColumnarWriter.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.binary = _use_msgpack(path)
+
+    def _open(self):
+        mode = 'rb' if self.binary else 'rt'
+        if self.path.endswith('.gz'):
+            return gzip.open(self.path, mode, encoding=None if self.binary else 'utf-8')
+        return open(self.path, mode, encoding=None if self.binary else 'utf-8')
+
+    def chunks(self):
+        """
+        :return: generator of dict of columns, one per chunk.
+        """
+        with self._open() as f:
+            if self.binary:
+                chunks = msgpack.Unpacker(f, raw=False)
+            else:
+                chunks = (json.loads(line) for line in f if line.strip())
+            for chunk in chunks:
+                if chunk.get('layout') != LAYOUT_VERSION:
+                    raise ValueError('Unknown columnar layout %r in %s' % (chunk.get('layout'), self.path))
+                yield chunk
+
+    def paragraphs(self):
+        """
+        Read paragraphs without rebuilding the documents.
+
+        :return: generator of (document index, paragraph, section path), the
+            section path being a tuple of section names, outermost first.
+        """
+        offset = 0
+        for chunk in self.chunks():
+            names, parents = chunk['section_name'], chunk['section_parent']
+            paths = []
+            for name, parent in zip(names, parents):
+                paths.append((paths[parent] if parent >= 0 else ()) + (name,))
+
+            texts, sections = chunk['paragraph_text'], chunk['paragraph_section']
+            starts = chunk['document_paragraphs']
+            ends = starts[1:] + [len(texts)]
+            for document, (begin, end) in enumerate(zip(starts, ends), offset):
+                for p in range(begin, end):
+                    section_id = sections[p]
+                    yield document, texts[p], paths[section_id] if section_id >= 0 else ()
+            offset += len(starts)
+
+    def records(self):
+        """
+        Rebuild the documents.
+
+        :return: generator of dict, the info of each document with its parsed
+            data under "data", if it has some.
+        """
+        for chunk in self.chunks():
+            for index, data in enumerate(unflatten(chunk)):
+                record = dict(chunk['document_info'][index] or {})
+                if data is not None:
+                    record['data'] = data
+                yield record
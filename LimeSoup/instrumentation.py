@@ -0,0 +1,311 @@
+"""
+Per-stage timing and memory instrumentation of Soup pipelines.
+
+Instrumentation is off by default. When enabled, every ingredient run by a
+Soup is timed (wall and CPU time) and its peak memory allocation is traced
+with tracemalloc:
+
+    with instrument() as metrics:
+        RSCSoup.parse(html_str)
+
+    print(metrics.last_document)      # stages of the last document
+    print(metrics.to_prometheus())    # histograms per publisher/ingredient
+
+Metrics are collected in the current process. Soup.parse_many() with more
+than one worker parses in other processes, use workers=1 to instrument it.
+
+Peak memory needs tracemalloc.reset_peak(), new in Python 3.9. On older
+Pythons memory is not traced and peak_memory is None.
+"""
+import bisect
+import collections
+import contextlib
+import json
+import sys
+import threading
+import time
+import tracemalloc
+import weakref
+
+from LimeSoup import lime_soup
+
+__author__ = 'Kevin Cruse'
+__maintainer__ = 'Kevin Cruse'
+__email__ = 'kevcruse96@gmail.com'
+__all__ = ['PipelineMetrics', 'StageRecord', 'instrument', 'PEAK_MEMORY']
+
+# Whether peak memory can be measured per stage: without reset_peak(), the
+# peak of tracemalloc is the largest allocation since tracing started.
+PEAK_MEMORY = hasattr(tracemalloc, 'reset_peak')
+
+StageRecord = collections.namedtuple(
+    'StageRecord', ['publisher', 'ingredient', 'wall_time', 'cpu_time', 'peak_memory', 'error'])
+StageRecord.__doc__ = """
+Measurement of one ingredient on one document. Times are in seconds and
+include soups called by the ingredient; peak_memory is the largest amount of
+memory in bytes allocated during the stage, or None if memory is not traced
+or PEAK_MEMORY is False.
+error is the name of the exception raised by the stage, or None.
+"""
+
+TIME_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MEMORY_BUCKETS = tuple(2 ** x for x in range(16, 31, 2))
+
+
+class Histogram(object):
+    """
+    Cumulative histogram in the Prometheus sense.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self):
+        total, counts = 0, []
+        for count in self.counts:
+            total += count
+            counts.append(total)
+        return counts
+
+    def to_dict(self):
+        return {
+            'buckets': dict(zip([str(x) for x in self.buckets] + ['+Inf'], self.cumulative_counts())),
+            'sum': self.sum,
+            'count': self.count,
+        }
+
+
+class _Frame(object):
+    __slots__ = ('publisher', 'ingredient', 'wall', 'cpu', 'memory', 'peak')
+
+    def __init__(self, publisher, ingredient):
+        self.publisher = publisher
+        self.ingredient = ingredient
+        self.wall = self.cpu = self.memory = self.peak = None
+
+
+# First ingredient of a soup -> label of the soup, see soup_label().
+_labels = weakref.WeakKeyDictionary()
+
+
+def soup_label(soup):
+    """
+    Name of a soup in metrics, the module its first ingredient comes from,
+    such as "RSCSoup". Modules defining several soups, such as ElsevierSoup
+    with its lxml and streaming backends, give each its name in the module,
+    such as "ElsevierLxmlSoup". Copies of a soup sharing its ingredients, see
+    Soup.with_html_parser(), have its label.
+    """
+    first = soup._next
+    if first is None:
+        return type(soup).__name__
+    label = _labels.get(first)
+    if label is None:
+        module = sys.modules[type(first).__module__]
+        # Soups of the module, not the ones it imports.
+        soups = {name: value for name, value in vars(module).items()
+                 if isinstance(value, lime_soup.Soup) and value._next is not None
+                 and type(value._next).__module__ == module.__name__}
+        label = module.__name__.rsplit('.', 1)[-1]
+        if len(soups) > 1:
+            label = next((name for name, value in sorted(soups.items()) if value._next is first), label)
+        _labels[first] = label
+    return label
+
+
+class PipelineMetrics(object):
+    """
+    Collector of stage measurements, to be passed to instrument() or
+    LimeSoup.lime_soup.set_instrumentation().
+    """
+
+    def __init__(self, trace_memory=True, keep_documents=1000):
+        """
+        :param trace_memory: whether to trace peak memory with tracemalloc.
+            Tracing makes parsing noticeably slower. Ignored, and memory
+            never traced, when PEAK_MEMORY is False.
+        :param keep_documents: number of recent documents whose stages are kept.
+        """
+        self.trace_memory = trace_memory and PEAK_MEMORY
+        self.documents = collections.deque(maxlen=keep_documents)
+        self.wall_time = collections.defaultdict(lambda: Histogram(TIME_BUCKETS))
+        self.cpu_time = collections.defaultdict(lambda: Histogram(TIME_BUCKETS))
+        self.peak_memory = collections.defaultdict(lambda: Histogram(MEMORY_BUCKETS))
+        self.errors = collections.Counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _state(self):
+        if not hasattr(self._local, 'soups'):
+            self._local.soups = []
+            self._local.frames = []
+            self._local.records = []
+        return self._local
+
+    @contextlib.contextmanager
+    def soup(self, soup):
+        state = self._state()
+        state.soups.append(soup_label(soup))
+        try:
+            yield
+        finally:
+            state.soups.pop()
+            if not state.soups:
+                records, state.records = state.records, []
+                with self._lock:
+                    self.documents.append(records)
+
+    @contextlib.contextmanager
+    def stage(self, ingredient):
+        state = self._state()
+        publisher = state.soups[-1] if state.soups else None
+        frame = _Frame(publisher, type(ingredient).__name__)
+
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            # Save the peak of the enclosing stage before resetting it.
+            if state.frames and state.frames[-1].peak is not None:
+                state.frames[-1].peak = max(state.frames[-1].peak, peak)
+            tracemalloc.reset_peak()
+            frame.memory = frame.peak = current
+
+        state.frames.append(frame)
+        error = None
+        frame.wall, frame.cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            wall = time.perf_counter() - frame.wall
+            cpu = time.process_time() - frame.cpu
+            state.frames.pop()
+
+            peak_memory = None
+            if tracing:
+                frame.peak = max(frame.peak, tracemalloc.get_traced_memory()[1])
+                peak_memory = frame.peak - frame.memory
+                if state.frames and state.frames[-1].peak is not None:
+                    state.frames[-1].peak = max(state.frames[-1].peak, frame.peak)
+
+            record = StageRecord(frame.publisher, frame.ingredient, wall, cpu, peak_memory, error)
+            state.records.append(record)
+            self.observe(record)
+
+    def observe(self, record):
+        """
+        Add a StageRecord to the histograms.
+        """
+        key = (record.publisher, record.ingredient)
+        with self._lock:
+            self.wall_time[key].observe(record.wall_time)
+            self.cpu_time[key].observe(record.cpu_time)
+            if record.peak_memory is not None:
+                self.peak_memory[key].observe(record.peak_memory)
+            if record.error is not None:
+                self.errors[key] += 1
+
+    @property
+    def last_document(self):
+        """
+        StageRecords of the last parsed document, in the order stages ended.
+        """
+        return self.documents[-1] if self.documents else []
+
+    def to_dict(self):
+        stages = []
+        for key in sorted(self.wall_time, key=lambda x: tuple(str(y) for y in x)):
+            stage = {
+                'publisher': key[0],
+                'ingredient': key[1],
+                'wall_time': self.wall_time[key].to_dict(),
+                'cpu_time': self.cpu_time[key].to_dict(),
+                'errors': self.errors[key],
+            }
+            if key in self.peak_memory:
+                stage['peak_memory'] = self.peak_memory[key].to_dict()
+            stages.append(stage)
+
+        return {
+            'stages': stages,
+            'documents': [[x._asdict() for x in records] for records in self.documents],
+        }
+
+    def to_json(self, **kwargs):
+        """
+        :param kwargs: arguments of json.dumps().
+        :return: the metrics and recent documents as a JSON string.
+        """
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def to_prometheus(self, prefix='limesoup'):
+        """
+        :param prefix: prefix of metric names.
+        :return: the histograms in Prometheus text exposition format.
+        """
+        lines = []
+
+        def labels(key, **extra):
+            pairs = [('publisher', key[0]), ('ingredient', key[1])] + sorted(extra.items())
+            return ','.join('%s="%s"' % (name, _escape_label(value)) for name, value in pairs)
+
+        def histogram(name, help_text, histograms):
+            lines.append('# HELP %s_%s %s' % (prefix, name, help_text))
+            lines.append('# TYPE %s_%s histogram' % (prefix, name))
+            for key in sorted(histograms, key=lambda x: tuple(str(y) for y in x)):
+                h = histograms[key]
+                for bound, count in zip(list(h.buckets) + ['+Inf'], h.cumulative_counts()):
+                    lines.append('%s_%s_bucket{%s} %d' % (prefix, name, labels(key, le=bound), count))
+                lines.append('%s_%s_sum{%s} %r' % (prefix, name, labels(key), float(h.sum)))
+                lines.append('%s_%s_count{%s} %d' % (prefix, name, labels(key), h.count))
+
+        with self._lock:
+            histogram('stage_wall_seconds', 'Wall time of pipeline stages.', self.wall_time)
+            histogram('stage_cpu_seconds', 'CPU time of pipeline stages.', self.cpu_time)
+            if self.peak_memory:
+                histogram('stage_peak_memory_bytes', 'Peak memory allocated by pipeline stages.',
+                          self.peak_memory)
+            lines.append('# HELP %s_stage_errors_total Pipeline stages that raised.' % prefix)
+            lines.append('# TYPE %s_stage_errors_total counter' % prefix)
+            for key in sorted(self.wall_time, key=lambda x: tuple(str(y) for y in x)):
+                lines.append('%s_stage_errors_total{%s} %d' % (prefix, labels(key), self.errors[key]))
+
+        return '\n'.join(lines) + '\n'
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+@contextlib.contextmanager
+def instrument(metrics=None):
+    """
+    Instrument all soups in this process within a with block.
+
+    :param metrics: PipelineMetrics object, a new one by default.
+    :return: context manager giving the PipelineMetrics object.
+    """
+    if metrics is None:
+        metrics = PipelineMetrics()
+
+    started_tracing = metrics.trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+
+    previous = lime_soup.set_instrumentation(metrics)
+    try:
+        yield metrics
+    finally:
+        lime_soup.set_instrumentation(previous)
+        if started_tracing:
+            tracemalloc.stop()
@@ -1,4 +1,15 @@
 import abc
+import collections
+import copy
+import itertools
+import multiprocessing
+import os
+import pickle
+import queue
+
+import bs4.builder
+
+from LimeSoup import budget as _budget
 
 __author__ = 'Ziqin (Shaun) Rong'
 __maintainer__ = 'Ziqin (Shaun) Rong'
@@ -35,34 +46,304 @@ class SoupBase(object):
             self._next = ingredient
 
 
+ParseResult = collections.namedtuple('ParseResult', ['index', 'data', 'error'])
+ParseResult.__doc__ = """
+Outcome of one document in Soup.parse_many(). index is the position of the
+document in the input; data is the parsed JSON object, or None when parsing
+raised; error is the exception raised, or None.
+"""
+
+# Receiver of stage measurements, see LimeSoup.instrumentation. None when
+# instrumentation is off, which costs one global lookup per stage.
+_instrumentation = None
+
+
+def set_instrumentation(instrumentation):
+    """
+    Instrument all soups in this process.
+
+    :param instrumentation: object with soup(soup) and stage(ingredient)
+        context managers, such as LimeSoup.instrumentation.PipelineMetrics,
+        or None to turn instrumentation off.
+    :return: the previous instrumentation.
+    """
+    global _instrumentation
+    previous, _instrumentation = _instrumentation, instrumentation
+    return previous
+
+
+# BeautifulSoup tree builder of the HTML DOMs built by ingredients, see
+# Soup.html_parser and RuleIngredient.builds_html.
+DEFAULT_HTML_PARSER = 'html.parser'
+
+
+# The soup a pool worker parses with, and the budget of each document. They
+# are sent to each worker once, when the worker starts, instead of being
+# pickled along with every document.
+_worker_soup = None
+_worker_budget = None
+
+
+def _init_worker(soup, budget=None):
+    global _worker_soup, _worker_budget
+    _worker_soup = soup
+    _worker_budget = budget
+
+
+def _parse_chunk(chunk):
+    results = []
+    for index, html_str in chunk:
+        try:
+            results.append(ParseResult(index, _worker_soup.parse(html_str, budget=_worker_budget), None))
+        except Exception as e:
+            results.append(ParseResult(index, None, e))
+    return results
+
+
+def _picklable_error(e):
+    try:
+        pickle.loads(pickle.dumps(e))
+        return e
+    except Exception:
+        return RuntimeError('%s: %s' % (type(e).__name__, e))
+
+
+def _parse_chunk_in_worker(chunk):
+    # Results are pickled back to the parent, an error that does not pickle
+    # would fail the whole batch.
+    return [result if result.error is None else result._replace(error=_picklable_error(result.error))
+            for result in _parse_chunk(chunk)]
+
+
 class Soup(SoupBase):
 
-    def __init__(self, parser_version):
+    def __init__(self, parser_version, html_parser=DEFAULT_HTML_PARSER):
+        """
+        :param parser_version: version of the soup.
+        :param html_parser: BeautifulSoup tree builder of the HTML documents,
+            'html.parser', 'lxml' or 'html5lib'. The builders giving the same
+            results for each publisher are listed in LimeSoup.registry.
+        """
         super(Soup, self).__init__()
         self._version = parser_version
+        self.html_parser = html_parser
+        # First ingredient of the pipeline of parse_metadata(), or None.
+        self._metadata = None
 
     @property
     def version(self):
         return self._version
 
-    def parse(self, html_str):
+    def with_html_parser(self, html_parser):
+        """
+        :param html_parser: BeautifulSoup tree builder, such as 'lxml'.
+        :return: a copy of this soup building its HTML documents with another
+            tree builder. The ingredients are shared.
+        """
+        if bs4.builder.builder_registry.lookup(html_parser) is None:
+            raise ValueError('Unknown or not installed HTML tree builder %r' % html_parser)
+        soup = copy.copy(self)
+        soup.html_parser = html_parser
+        return soup
+
+    def parse(self, html_str, budget=None):
+        """
+        :param html_str: raw HTML/XML string.
+        :param budget: LimeSoup.budget.Budget limiting the time and size of
+            the parsing. Over budget, the result is a plain text extraction
+            with a "Degraded" reason, or BudgetExceeded is raised.
+        :return: Parse JSON object
+        """
         if not self._next:
             raise ValueError("Please provide at least one parsing rule ingredient to the soup")
-        return self._next.parse(html_str)
+        if budget is None:
+            return self._parse_all(html_str)
+
+        with _budget.running(budget):
+            try:
+                budget.check_size(html_str)
+                return self._parse_all(html_str)
+            except _budget.BudgetExceeded as e:
+                if not budget.fallback:
+                    raise
+                data = _budget.plain_text_paragraphs(html_str)
+                data['Degraded'] = str(e)
+                return data
+
+    def add_metadata_ingredient(self, ingredient):
+        """
+        :param ingredient: A parsing rule ingredient of the pipeline of
+            parse_metadata(), which reads the metadata of a document without
+            parsing its body.
+        """
+        if self._metadata is not None:
+            self._metadata.add_ingredient(ingredient)
+        else:
+            self._metadata = ingredient
+
+    def parse_metadata(self, html_str):
+        """
+        Read the metadata of a document, such as DOI, title, journal and
+        keywords, without its "Sections". Soups with a metadata pipeline only
+        read the header of the document; the others parse the whole document.
+
+        :param html_str: raw HTML/XML string.
+        :return: dict of metadata.
+        """
+        if self._metadata is None:
+            data = self.parse(html_str)
+            if isinstance(data, dict):
+                data = {key: value for key, value in data.items() if key != 'Sections'}
+            return data
+        return self._parse_all(html_str, self._metadata)
+
+    def iter_paragraphs(self, html_str):
+        """
+        Yield the paragraphs of a document one at a time. Soups whose last
+        step collects paragraphs from the DOM, such as RSC and ECS, yield each
+        one as soon as it is extracted, without building "Sections"; the
+        others parse the document first.
+
+        Budgets only apply to parse().
+
+        :param html_str: raw HTML/XML string.
+        :return: generator of (section path, paragraph), the section path being
+            a tuple of section names, outermost first.
+        """
+        if not self._next:
+            raise ValueError("Please provide at least one parsing rule ingredient to the soup")
+        return self._next.iter_paragraphs(html_str, self.html_parser)
+
+    def _parse_all(self, html_str, pipeline=None):
+        pipeline = pipeline or self._next
+        if _instrumentation is not None:
+            with _instrumentation.soup(self):
+                return pipeline.parse(html_str, self.html_parser)
+        return pipeline.parse(html_str, self.html_parser)
+
+    def parse_many(self, html_strs, workers=None, chunksize=1, ordered=True, budget=None):
+        """
+        Parse many documents on a pool of worker processes.
+
+        The workers are started and given this soup once, before any document
+        is sent, so that each task only carries the raw strings. Documents are
+        read from html_strs lazily; at most two chunks per worker are in flight
+        at any time.
+
+        :param html_strs: iterable of raw HTML/XML strings.
+        :param workers: number of worker processes, defaults to the number of
+            CPUs. With 1 worker, documents are parsed in this process.
+        :param chunksize: number of documents sent to a worker in one task.
+        :param ordered: if True, results come in input order; otherwise they
+            come as soon as their chunk is done.
+        :param budget: LimeSoup.budget.Budget of each document, see parse().
+        :return: generator of ParseResult. A document that fails to parse
+            yields a ParseResult with the exception, the batch goes on. With
+            more than one worker, exceptions that cannot be pickled, such as
+            lxml's XMLSyntaxError, are replaced by a RuntimeError holding
+            their type and message.
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1 or chunksize < 1:
+            raise ValueError("workers and chunksize must be positive")
+
+        documents = enumerate(html_strs)
+        chunks = iter(lambda: list(itertools.islice(documents, chunksize)), [])
+
+        if workers == 1:
+            _init_worker(self, budget)
+            for chunk in chunks:
+                for result in _parse_chunk(chunk):
+                    yield result
+            return
+
+        max_pending = 2 * workers
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(self, budget)) as pool:
+            if ordered:
+                pending = collections.deque()
+                for chunk in itertools.chain(chunks, [None]):
+                    if chunk is not None:
+                        pending.append(pool.apply_async(_parse_chunk_in_worker, (chunk,)))
+                    while pending and (chunk is None or len(pending) >= max_pending):
+                        for result in pending.popleft().get():
+                            yield result
+            else:
+                done = queue.Queue()
+                n_pending = 0
+                for chunk in itertools.chain(chunks, [None]):
+                    if chunk is not None:
+                        pool.apply_async(_parse_chunk_in_worker, (chunk,), callback=done.put,
+                                         error_callback=done.put)
+                        n_pending += 1
+                    while n_pending and (chunk is None or n_pending >= max_pending):
+                        results = done.get()
+                        n_pending -= 1
+                        if isinstance(results, BaseException):
+                            raise results
+                        for result in results:
+                            yield result
 
 
 class RuleIngredient(SoupBase):
     __metaclass__ = abc.ABCMeta
 
+    # True for ingredients building an HTML DOM from a string: their _parse()
+    # is called as _parse(html_str, html_parser), with the tree builder of the
+    # soup running the pipeline.
+    builds_html = False
+
     def __init__(self):
         super(RuleIngredient, self).__init__()
 
-    def parse(self, html_str):
-        results = self._parse(html_str)
+    def parse(self, html_str, html_parser=DEFAULT_HTML_PARSER):
+        """
+        :param html_str: input of this ingredient.
+        :param html_parser: BeautifulSoup tree builder of the soup, handed to
+            the ingredients building HTML DOMs.
+        :return: Parse JSON object
+        """
+        results = self._run(html_str, html_parser)
         if self._next:
-            results = self._next.parse(results)
+            results = self._next.parse(results, html_parser)
         return results
 
+    def _run(self, html_str, html_parser=DEFAULT_HTML_PARSER):
+        _budget.checkpoint()
+        args = (html_str, html_parser) if self.builds_html else (html_str,)
+        if _instrumentation is None:
+            return self._parse(*args)
+        with _instrumentation.stage(self):
+            return self._parse(*args)
+
+    def iter_paragraphs(self, html_str, html_parser=DEFAULT_HTML_PARSER):
+        """
+        :param html_str: input of this ingredient.
+        :param html_parser: BeautifulSoup tree builder of the soup, see parse().
+        :return: generator of (section path, paragraph) of the result of the
+            pipeline from this ingredient on.
+        """
+        if self._next:
+            for paragraph in self._next.iter_paragraphs(self._run(html_str, html_parser), html_parser):
+                yield paragraph
+        else:
+            args = (html_str, html_parser) if self.builds_html else (html_str,)
+            for paragraph in self._iter_paragraphs(*args):
+                yield paragraph
+
+    def _iter_paragraphs(self, html_str, html_parser=DEFAULT_HTML_PARSER):
+        """
+        Paragraphs of the last ingredient of a pipeline. By default its result
+        is built and then walked; ingredients collecting paragraphs override
+        this to yield them while they are extracted.
+
+        :return: generator of (section path, paragraph)
+        """
+        data = self._run(html_str, html_parser)
+        if isinstance(data, dict):
+            for paragraph in iter_sections(data.get('Sections') or []):
+                yield paragraph
+
     @staticmethod
     @abc.abstractmethod
     def _parse(html_str):
@@ -71,3 +352,25 @@ class RuleIngredient(SoupBase):
         :return: Parse JSON object
         """
         raise NotImplementedError
+
+
+def iter_sections(sections, path=()):
+    """
+    Walk a "Sections" list of parsed data.
+
+    :param sections: list of paragraphs and {type, name, content} sections.
+    :param path: names of the sections holding the list.
+    :return: generator of (section path, paragraph), the section path being a
+        tuple of section names, outermost first.
+    """
+    for item in sections:
+        if isinstance(item, dict):
+            section_path = path + (item['name'],)
+            content = item['content']
+            if isinstance(content, list):
+                for paragraph in iter_sections(content, section_path):
+                    yield paragraph
+            elif content:
+                yield section_path, content
+        else:
+            yield path, item
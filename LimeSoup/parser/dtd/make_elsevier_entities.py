@@ -0,0 +1,75 @@
+"""
+Generate LimeSoup/parser/elsevier_entities.py from the Elsevier DTDs in this
+directory. Run it again whenever the DTDs are updated:
+
+    python LimeSoup/parser/dtd/make_elsevier_entities.py
+"""
+import html
+import os
+import re
+
+from lxml import etree
+
+__author__ = 'Kevin Cruse'
+__maintainer__ = 'Kevin Cruse'
+__email__ = 'kevcruse96@gmail.com'
+
+DTD_DIR = os.path.dirname(os.path.realpath(__file__))
+ENTITY_FILE = os.path.join(DTD_DIR, 'ja5_art540', 'cep140', 'common140.ent')
+OUTPUT_FILE = os.path.join(os.path.dirname(DTD_DIR), 'elsevier_entities.py')
+
+# These are resolved by every XML parser and must stay escaped.
+XML_PREDEFINED = {'amp', 'lt', 'gt', 'quot', 'apos'}
+
+HEADER = '''"""
+Entities defined in the Elsevier Common Element Pool 1.4.0, mapped to the
+unicode strings they stand for.
+
+This file is generated by LimeSoup/parser/dtd/make_elsevier_entities.py,
+do not edit it by hand.
+"""
+
+ENTITIES = {
+'''
+
+
+def parameter_entity_names():
+    names = set()
+    for root, _, files in os.walk(DTD_DIR):
+        for name in files:
+            if not name.endswith(('.ent', '.dtd', '.mod')):
+                continue
+            with open(os.path.join(root, name), encoding='utf-8') as f:
+                source = re.sub(r'<!--.*?-->', '', f.read(), flags=re.DOTALL)
+            names.update(re.findall(r'<!ENTITY\s+%\s+(\S+)', source))
+    return names
+
+
+def load_entities():
+    # lxml lists parameter and general entities together,
+    # only general entities can appear in documents.
+    dtd = etree.DTD(ENTITY_FILE)
+    excluded = parameter_entity_names() | XML_PREDEFINED
+
+    entities = {}
+    for entity in dtd.entities():
+        if entity.name in excluded:
+            continue
+        if re.search(r'&(?!#)', entity.content):
+            raise ValueError('Entity %s refers to other entities: %r' % (entity.name, entity.content))
+        entities[entity.name] = html.unescape(entity.content)
+    return entities
+
+
+def main():
+    entities = load_entities()
+    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+        f.write(HEADER)
+        for name in sorted(entities):
+            f.write('    %r: %s,\n' % (name, ascii(entities[name])))
+        f.write('}\n')
+    print('Wrote %d entities to %s' % (len(entities), OUTPUT_FILE))
+
+
+if __name__ == '__main__':
+    main()
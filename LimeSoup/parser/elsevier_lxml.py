@@ -0,0 +1,331 @@
+"""
+lxml backend for the Elsevier XML grammar in LimeSoup.parser.elsevier_xml.
+
+The grammar functions only use a handful of BeautifulSoup attributes (name,
+prefix, attrs, children, string, find, find_all and get_text). The classes
+here provide them on top of lxml.etree elements, so the same grammar runs on
+the lxml tree directly and BeautifulSoup never builds its own copy of it.
+
+Nodes are wrapped lazily, when the grammar visits them, and follow the
+conventions of BeautifulSoup's 'lxml-xml' builder: elements in the default
+namespace have prefix '', and comments and processing instructions are
+strings among the children of an element.
+"""
+from lxml import etree
+
+from LimeSoup.parser.elsevier_xml import resolve_elsevier_entities
+
+__author__ = 'Kevin Cruse'
+__maintainer__ = 'Kevin Cruse'
+__email__ = 'kevcruse96@gmail.com'
+__all__ = ['parse_lxml_document', 'parse_lxml_header', 'iterparse_document', 'LxmlDocument', 'LxmlTag',
+           'LxmlString']
+
+# Same options as BeautifulSoup's 'lxml-xml' builder.
+_PARSER = etree.XMLParser(encoding='utf-8', recover=True, strip_cdata=False)
+
+# parse_lxml_header() stops at the first of these elements, which come after
+# the metadata (<coredata>, <xocs:meta> and the <head> of the article).
+HEADER_END_TAGS = ('{*}body', '{*}tail', '{*}rawtext')
+
+
+class LxmlString(str):
+    """
+    Text between elements, like bs4.NavigableString. It has no prefix, so
+    the grammar fails on strings where it fails with BeautifulSoup.
+    """
+    __slots__ = ()
+    name = None
+
+    @property
+    def string(self):
+        return self
+
+
+def _node_string(element):
+    if element.tag is etree.ProcessingInstruction:
+        return '%s %s' % (element.target, element.text or '')
+    return element.text or ''
+
+
+def _wrap_children(element):
+    if element.text:
+        yield LxmlString(element.text)
+    for child in element:
+        if isinstance(child.tag, str):
+            yield LxmlTag(child)
+        elif child.tag is etree.Comment or child.tag is etree.ProcessingInstruction:
+            yield LxmlString(_node_string(child))
+        if child.tail:
+            yield LxmlString(child.tail)
+
+
+def _collect_strings(element, strings):
+    # All strings under element in document order, like find_all(text=True).
+    for child in _wrap_children(element):
+        if child.name is None:
+            strings.append(child)
+        else:
+            _collect_strings(child.element, strings)
+
+
+def _escape(text):
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _quote(value):
+    value = _escape(value)
+    if '"' not in value:
+        return '"%s"' % value
+    if "'" not in value:
+        return "'%s'" % value
+    return '"%s"' % value.replace('"', '&quot;')
+
+
+def _serialize(element, parent_nsmap, out):
+    # Markup of element as BeautifulSoup prints it: sorted attributes, and
+    # only the namespaces declared on the element itself, where
+    # etree.tostring() would repeat the ones inherited from its ancestors.
+    if element.tag is etree.Comment:
+        out.append('<!--%s-->' % (element.text or ''))
+        return
+    if element.tag is etree.ProcessingInstruction:
+        out.append('<?%s?>' % _node_string(element))
+        return
+    if not isinstance(element.tag, str):
+        out.append(etree.tostring(element, encoding='unicode', with_tail=False))
+        return
+
+    tag = LxmlTag(element)
+    attrs = tag.attrs
+    for prefix, namespace in element.nsmap.items():
+        if parent_nsmap.get(prefix) != namespace:
+            attrs['xmlns:%s' % prefix if prefix else 'xmlns'] = namespace
+    name = '%s:%s' % (tag.prefix, tag.name) if tag.prefix else tag.name
+    out.append('<%s' % name)
+    for key, value in sorted(attrs.items()):
+        out.append(' %s=%s' % (key, _quote(value)))
+
+    if element.text is None and len(element) == 0:
+        out.append('/>')
+        return
+    out.append('>')
+    out.append(_escape(element.text or ''))
+    for child in element:
+        _serialize(child, element.nsmap, out)
+        out.append(_escape(child.tail or ''))
+    out.append('</%s>' % name)
+
+
+def _name_matcher(name):
+    if name is None or name is True:
+        return lambda tag: True
+    return lambda tag: tag.name == name or (tag.prefix and '%s:%s' % (tag.prefix, tag.name) == name)
+
+
+class _LxmlContainer(object):
+    __slots__ = ()
+
+    def _iter_elements(self):
+        raise NotImplementedError
+
+    def _text_roots(self):
+        raise NotImplementedError
+
+    def find_all(self, name=None, text=None):
+        """
+        :param name: tag name, with or without prefix, as in bs4.
+        :param text: if True, find all strings instead of tags.
+        :return: list of LxmlTag, or LxmlString if text is True.
+        """
+        if text is True:
+            strings = []
+            for element in self._text_roots():
+                _collect_strings(element, strings)
+            return strings
+
+        matches = _name_matcher(name)
+        return [tag for tag in map(LxmlTag, self._iter_elements()) if matches(tag)]
+
+    findAll = find_all
+
+    def find(self, name=None):
+        matches = _name_matcher(name)
+        for tag in map(LxmlTag, self._iter_elements()):
+            if matches(tag):
+                return tag
+        return None
+
+
+class LxmlTag(_LxmlContainer):
+    """
+    An element of the lxml tree, like bs4.Tag.
+    """
+    __slots__ = ('element',)
+
+    def __init__(self, element):
+        self.element = element
+
+    @property
+    def name(self):
+        return etree.QName(self.element).localname
+
+    @property
+    def prefix(self):
+        if self.element.prefix is not None:
+            return self.element.prefix
+        return '' if self.element.tag.startswith('{') else None
+
+    @property
+    def attrs(self):
+        attrs = {}
+        prefixes = {ns: prefix for prefix, ns in self.element.nsmap.items() if prefix}
+        for key, value in self.element.attrib.items():
+            if key.startswith('{'):
+                namespace, local_name = key[1:].split('}', 1)
+                if namespace in prefixes:
+                    key = '%s:%s' % (prefixes[namespace], local_name)
+                else:
+                    key = local_name
+            attrs[key] = value
+        return attrs
+
+    @property
+    def children(self):
+        return _wrap_children(self.element)
+
+    @property
+    def string(self):
+        children = list(self.children)
+        if len(children) != 1:
+            return None
+        return children[0].string
+
+    def _iter_elements(self):
+        return self.element.iterdescendants(etree.Element)
+
+    def _text_roots(self):
+        return [self.element]
+
+    def get_text(self):
+        return ''.join(self.element.itertext())
+
+    def __str__(self):
+        parent = self.element.getparent()
+        out = []
+        _serialize(self.element, parent.nsmap if parent is not None else {}, out)
+        return ''.join(out)
+
+
+class LxmlDocument(_LxmlContainer):
+    """
+    A parsed document, like bs4.BeautifulSoup.
+    """
+    __slots__ = ('root',)
+    name = '[document]'
+    prefix = None
+
+    def __init__(self, root):
+        self.root = root
+
+    @property
+    def children(self):
+        return iter([LxmlTag(self.root)])
+
+    def _iter_elements(self):
+        return self.root.iter(etree.Element)
+
+    def _text_roots(self):
+        return [self.root]
+
+    def get_text(self):
+        return ''.join(self.root.itertext())
+
+
+def parse_lxml_document(xml_string):
+    """
+    Parse an XML document with lxml, with the same recovery rules as
+    BeautifulSoup's 'lxml-xml' builder.
+
+    :param xml_string: XML document as a string.
+    :return: LxmlDocument object.
+    """
+    if isinstance(xml_string, str):
+        xml_string = xml_string.encode('utf-8')
+    root = etree.fromstring(xml_string, parser=_PARSER)
+    if root is None:
+        raise ValueError('Cannot parse XML document, no root element was found')
+    return LxmlDocument(root)
+
+
+class _EntityResolvingReader(object):
+    """
+    File-like view of an XML string for etree.iterparse(), resolving the
+    Elsevier entities of each chunk as it is read, so that the part of the
+    document after the point where parsing stops is never resolved.
+    """
+
+    def __init__(self, xml_string):
+        self.xml_string = xml_string
+        self.position = 0
+
+    def read(self, size=-1):
+        start = self.position
+        if start >= len(self.xml_string):
+            return b''
+        end = len(self.xml_string) if size < 0 else start + max(size, 1)
+        if end < len(self.xml_string):
+            # Do not cut an entity in two.
+            ampersand = self.xml_string.rfind('&', start, end)
+            if ampersand >= 0 and self.xml_string.find(';', ampersand, end) < 0:
+                if ampersand > start:
+                    end = ampersand
+                else:
+                    end = self.xml_string.find(';', ampersand) + 1 or len(self.xml_string)
+        self.position = end
+        return resolve_elsevier_entities(self.xml_string[start:end]).encode('utf-8')
+
+
+def iterparse_document(xml_string, events=('end',), tag=None):
+    """
+    etree.iterparse() over an Elsevier XML document, resolving its entities
+    as it is read, with the same recovery rules as parse_lxml_document().
+
+    :param xml_string: XML document as a string, with unresolved entities.
+    :param events: events of iterparse(), such as ('start', 'end').
+    :param tag: tags of the elements whose events are generated.
+    :return: iterparse object, generating (event, lxml element).
+    """
+    if isinstance(xml_string, bytes):
+        xml_string = xml_string.decode('utf-8')
+    return etree.iterparse(_EntityResolvingReader(xml_string), events=events, tag=tag,
+                           encoding='utf-8', recover=True, strip_cdata=False)
+
+
+def parse_lxml_header(xml_string):
+    """
+    Parse an Elsevier XML document up to its body, with etree.iterparse(),
+    for reading its metadata without building or resolving the rest.
+
+    :param xml_string: XML document as a string, with unresolved entities.
+    :return: LxmlDocument object of the elements before the body.
+    """
+    events = iterparse_document(xml_string, events=('start',), tag=HEADER_END_TAGS)
+    root = None
+    for _, element in events:
+        root = element.getroottree().getroot()
+        if element is root:
+            break
+        # The parser reads ahead: drop the element and everything after it.
+        node = element
+        while node is not root:
+            for sibling in list(node.itersiblings()):
+                node.getparent().remove(sibling)
+            node = node.getparent()
+        element.getparent().remove(element)
+        break
+    else:
+        root = events.root
+    if root is None:
+        raise ValueError('Cannot parse XML document, no root element was found')
+    return LxmlDocument(root)
@@ -1,9 +1,8 @@
-import os
 import re
 import warnings
 
-from lxml import etree
-from lxml.etree import XMLSyntaxError
+from LimeSoup.budget import checkpoint
+from LimeSoup.parser.elsevier_entities import ENTITIES
 
 __author__ = 'Haoyan Huo'
 __maintainer__ = 'Kevin Cruse'
@@ -21,11 +20,15 @@ def extract_text_any(_node, handler):
     return ''.join(result)
 
 
-def extract_text_or(_node, handlers):
+def extract_text_or(_node, handlers, failed=None):
     # Extract node text in rules:
     # A := (B|C|D|E)
+    # failed is a (handler, exception) pair of a handler already tried.
     last_exception = None
     for h in handlers:
+        if failed is not None and h is failed[0]:
+            last_exception = failed[1]
+            continue
         try:
             return h(_node)
         except NameError as e:
@@ -35,6 +38,70 @@ def extract_text_or(_node, handlers):
                     (_node.prefix, _node.name, str(_node)[:50], handlers, str(last_exception)))
 
 
+# Key of strings in dispatch tables.
+TEXT_NODE = '#text'
+
+
+def accepts(*names):
+    """
+    Declare the nodes accepted by a rule, so that it can be put in a
+    dispatch table.
+
+    :param names: 'prefix:name', '*:name' for any prefix, or TEXT_NODE.
+    :return: decorator.
+    """
+    def decorate(rule):
+        rule.accepted_nodes = tuple(tuple(x.split(':')) if ':' in x else x for x in names)
+        return rule
+
+    return decorate
+
+
+class Alternatives(object):
+    """
+    Rules A := (B|C|D|E) with a dispatch table from (prefix, name) to
+    B, C, D or E, so that a node is sent to the only rule accepting it
+    instead of trying each of them in turn.
+    """
+
+    def __init__(self, handlers, rule=None):
+        """
+        :param handlers: rules B, C, D, E. Each must have accepted_nodes.
+        :param rule: rule A, if any, which then accepts all nodes of B, C, D, E.
+        """
+        self.handlers = handlers
+        self.table = {}
+        for handler in handlers:
+            for key in handler.accepted_nodes:
+                if key in self.table:
+                    raise ValueError('Node %r is accepted by both %r and %r' %
+                                     (key, self.table[key], handler))
+                self.table[key] = handler
+
+        names = [key[1] for key in self.table if key != TEXT_NODE]
+        for key in self.table:
+            if key != TEXT_NODE and key[0] == '*' and names.count(key[1]) > 1:
+                raise ValueError('Node %r is accepted by more than one rule' % (key,))
+
+        if rule is not None:
+            rule.accepted_nodes = tuple(self.table)
+
+    def find(self, _node):
+        if _node.name is None:
+            return self.table.get(TEXT_NODE)
+        return self.table.get((_node.prefix, _node.name)) or self.table.get(('*', _node.name))
+
+    def extract(self, _node):
+        handler = self.find(_node)
+        if handler is None:
+            # Let extract_text_or() report unknown nodes as it always did.
+            return extract_text_or(_node, self.handlers)
+        try:
+            return handler(_node)
+        except NameError as e:
+            return extract_text_or(_node, self.handlers, failed=(handler, e))
+
+
 def find_non_empty_children(_node):
     children = []
     for child in _node.children:
@@ -69,6 +136,11 @@ def node_named(node, name):
         return node.name == name
 
 
+_WHITESPACES_PATTERN = re.compile(r'[ \t\n]+')
+_ANY_WHITESPACE_PATTERN = re.compile(r'\s')
+_BIB_REF_PATTERN = re.compile(r'bib.*', re.IGNORECASE)
+
+
 def remove_consecutive_whitespaces(string, keep_newline=False):
     def sub(m):
         if keep_newline and '\n' in m.group(0):
@@ -76,7 +148,7 @@ def remove_consecutive_whitespaces(string, keep_newline=False):
         else:
             return ' '
 
-    return re.sub(r'[ \t\n]+', sub, string)
+    return _WHITESPACES_PATTERN.sub(sub, string)
 
 
 # Elsevier XML format is defined here:
@@ -90,50 +162,45 @@ class XMLSyntaxWarning(Warning):
     pass
 
 
+def _escape_entity_value(value):
+    return value.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')
+
+
+# Entity name -> escaped replacement, built once per process.
+_ENTITY_REPLACEMENTS = {name: _escape_entity_value(value) for name, value in ENTITIES.items()}
+_ENTITY_PATTERN = re.compile(r'&([A-Za-z_][\w.:-]*);')
+_XML_PREDEFINED_ENTITIES = {'amp', 'lt', 'gt', 'quot', 'apos'}
+
+
 def resolve_elsevier_entities(xml_string):
     """
     Elsevier defined a set of entities that can be found in the corresponding
     ent (entity) files. However, XML files do not contain definition of such
-    entities. Thus, we need to load the entities and patch the XML files, so
-    that these entities are converted into unicode chars.
+    entities. Thus, we need to patch the XML files, so that these entities
+    are converted into unicode chars.
     See also "The Elsevier DTD 5 Family of XML DTDs" pp. 12
 
-    :param xml_string:
-    :return:
-    """
-    if not hasattr(resolve_elsevier_entities, 'dtd_strings'):
-        invocation = """<!DOCTYPE xml [
-        <!ENTITY % common.ent
-            PUBLIC "-//ES//ELEMENTS common element pool version 1.4.0//EN//XML"
-            "{file_dir}/dtd/ja5_art540/cep140/common140.ent">
-        %common.ent;]>\n"""
-
-        file_path = os.path.dirname(os.path.realpath(__file__))
-        # lxml hates backslashes
-        file_path = file_path.replace('\\', '/')
+    The entities are read from LimeSoup.parser.elsevier_entities, which is
+    generated from the DTDs, and substituted in one pass over the string.
+    Unknown entities are left untouched and will be dropped by the XML parser.
 
-        setattr(resolve_elsevier_entities, 'dtd_invocation', invocation.format(file_dir=file_path))
+    :param xml_string: XML document as a string.
+    :return: The XML document with Elsevier entities replaced.
+    """
+    def replace(m):
+        name = m.group(1)
+        if name in _ENTITY_REPLACEMENTS:
+            return _ENTITY_REPLACEMENTS[name]
+        if name not in _XML_PREDEFINED_ENTITIES:
+            warnings.warn('Unknown entity &%s; in XML source.' % name, XMLSyntaxWarning)
+        return m.group(0)
 
-    try:
-        parser = etree.XMLParser(load_dtd=True)
-        xml_tree = etree.fromstring(
-            getattr(resolve_elsevier_entities, 'dtd_invocation') + xml_string,
-            parser=parser,
-        )
-    except XMLSyntaxError:
-        if not hasattr(resolve_elsevier_entities, 'recover'):
-            warnings.warn('Enabling "recover" in XML parser. '
-                          'There might be a problem with XML source.', XMLSyntaxWarning)
-            setattr(resolve_elsevier_entities, 'recover', True)
-        parser = etree.XMLParser(load_dtd=True, recover=True)
-        xml_tree = etree.fromstring(
-            getattr(resolve_elsevier_entities, 'dtd_invocation') + xml_string,
-            parser=parser,
-        )
-
-    return etree.tostring(xml_tree)
+    return _ENTITY_PATTERN.sub(replace, xml_string)
 
 
+@accepts(TEXT_NODE, 'ce:glyph', 'ce:inline-figure', 'ce:bold', 'ce:italic', 'ce:monospace',
+         'ce:sans-serif', 'ce:small-caps', 'ce:underline', 'ce:cross-out', 'ce:sup', 'ce:inf',
+         'ce:hsp', 'ce:vsp')
 def process_richstring_data(_node):
     # <!ENTITY % richstring.data  "#PCDATA|ce:glyph|%text-effect;|ce:inline-figure
     #                              %local.richstring.data;" >
@@ -172,12 +239,10 @@ def process_richstring_data(_node):
 
 def process_text_data(_node):
     # <!ENTITY % text.data        "%richstring.data;|mml:math; %local.text.data;" >
-    return extract_text_or(_node, (
-        process_richstring_data,
-        extract_mml_math,
-    ))
+    return TEXT_DATA.extract(_node)
 
 
+@accepts('ce:inter-ref')
 def process_inter_ref(_node):
     # <!ELEMENT   ce:inter-ref        ( %text.data; )* >
     assert_node_type(_node, 'ce:inter-ref')
@@ -186,12 +251,10 @@ def process_inter_ref(_node):
 
 def process_textlink_data(_node):
     # <!ENTITY % textlink.data    "%text.data;|ce:inter-ref" >
-    return extract_text_or(_node, (
-        process_text_data,
-        process_inter_ref,
-    ))
+    return TEXTLINK_DATA.extract(_node)
 
 
+@accepts('ce:cross-ref', 'ce:intra-ref')
 def process_cross_ref(_node):
     # <!ENTITY % cross-ref        "ce:cross-ref|ce:intra-ref" >
     if node_named(_node, 'ce:intra-ref'):
@@ -199,7 +262,7 @@ def process_cross_ref(_node):
     elif node_named(_node, 'ce:cross-ref'):
         # We take only cross-ref's that are not bib refs. This includes,
         # for example, "Fig. ?", "Table ?"...
-        if not re.match(r'bib.*', _node.attrs['refid'], re.IGNORECASE):
+        if not _BIB_REF_PATTERN.match(_node.attrs['refid']):
             return extract_text_any(_node, process_text_data)
         else:
             return ''
@@ -208,6 +271,7 @@ def process_cross_ref(_node):
                         (_node.prefix, _node.name))
 
 
+@accepts('ce:cross-refs', 'ce:intra-refs')
 def process_cross_refs(_node):
     # <!ENTITY % cross-refs       "ce:cross-refs|ce:intra-refs" >
     # Same as process_cross_ref()
@@ -216,7 +280,7 @@ def process_cross_refs(_node):
     elif node_named(_node, 'ce:cross-refs'):
         # We take only cross-ref's that are not bib refs. This includes,
         # for example, "Fig. ?", "Table ?"...
-        if not re.match(r'bib.*', _node.attrs['refid'], re.IGNORECASE):
+        if not _BIB_REF_PATTERN.match(_node.attrs['refid']):
             return extract_text_any(_node, process_text_data)
         else:
             return ''
@@ -227,12 +291,10 @@ def process_cross_refs(_node):
 
 def process_cross_ref_s(_node):
     # <!ENTITY % cross-ref-s      "%cross-ref;|%cross-refs;" >
-    return extract_text_or(_node, (
-        process_cross_ref,
-        process_cross_refs,
-    ))
+    return CROSS_REF_S.extract(_node)
 
 
+@accepts('ce:inter-ref', 'ce:inter-refs')
 def process_inter_ref_s(_node):
     # <!ENTITY % inter-ref-s      "ce:inter-ref|ce:inter-refs" >
     if node_named(_node, 'ce:inter-ref'):
@@ -255,11 +317,7 @@ def process_inter_ref_s(_node):
 def process_textref_data(_node):
     # <!ENTITY % textref.data
     #            "%text.data;|%cross-ref-s;|%inter-ref-s; %local.textref.data;" >
-    return extract_text_or(_node, (
-        process_text_data,
-        process_cross_ref_s,
-        process_inter_ref_s
-    ))
+    return TEXTREF_DATA.extract(_node)
 
 
 def process_lists(_node):
@@ -267,19 +325,17 @@ def process_lists(_node):
     # This is a hack: insert a newline before list, so that it won't break the paragraph
     # If there is no paragraph, this does not hurt, as the paragraph will finally strip
     # the string.
-    return '\n' + extract_text_or(_node, (
-        extract_ce_def_list,
-        extract_ce_list,
-    ))
+    return '\n' + LISTS.extract(_node)
 
 
 def process_nondisplay_data(_node):
     # <!ENTITY % nondisplay.data  "%textref.data;|ce:footnote|
     #                             ce:anchor %local.nondisplay.data;">
-    try:
-        return process_textref_data(_node)
-    except NameError:
-        pass
+    if TEXTREF_DATA.find(_node) is not None:
+        try:
+            return process_textref_data(_node)
+        except NameError:
+            pass
 
     if node_named(_node, 'ce:footnote'):
         return extract_ce_footnote(_node)
@@ -298,57 +354,33 @@ def process_nondisplay_data(_node):
 
 def process_text_objects(_node):
     # <!ENTITY % text-objects     "ce:anchor|ce:grant-sponsor|ce:grant-number" >
-    return extract_text_or(_node, (
-        extract_ce_anchor,
-        extract_ce_grant_sponsor,
-        extract_ce_grant_number,
-    ))
+    return TEXT_OBJECTS.extract(_node)
 
 
 def process_textfn_data(_node):
     # <!ENTITY % textfn.data
     #          "%text.data;|ce:footnote|%cross-ref-s; %local.textfn.data;" >
-    return extract_text_or(_node, (
-        process_text_data,
-        extract_ce_footnote,
-        process_cross_ref_s
-    ))
+    return TEXTFN_DATA.extract(_node)
 
 
 def process_spar_data(_node):
     # <!ENTITY % spar.data        "%textref.data;|%display;|%lists;|ce:footnote|%text-objects;
     #                              %local.spar.data;" >
-    return extract_text_or(_node, (
-        process_textref_data,
-        process_display,
-        process_lists,
-        extract_ce_footnote,
-        process_text_objects,
-    ))
+    return SPAR_DATA.extract(_node)
 
 
 def process_display(_node):
     # <!ENTITY % display          "ce:display|ce:displayed-quote|ce:enunciation" >
-    return extract_text_or(_node, (
-        extract_ce_display,
-        extract_ce_displayed_quote,
-        extract_ce_enunciation,
-    ))
+    return DISPLAY.extract(_node)
 
 
 def process_par_data(_node):
     # <!ENTITY % par.data         "%textref.data;|ce:float-anchor|%display;|%lists;|ce:footnote|%text-objects;
     #                              %local.par.data;" >
-    return extract_text_or(_node, (
-        process_textref_data,
-        extract_ce_float_anchor,
-        process_display,
-        process_lists,
-        extract_ce_footnote,
-        process_text_objects,
-    ))
+    return PAR_DATA.extract(_node)
 
 
+@accepts('*:math')
 def extract_mml_math(node):
     try:
         assert_node_type(node, 'mml:math')
@@ -358,9 +390,10 @@ def extract_mml_math(node):
         assert_node_type(node, '*:math')
 
     # TODO: better rendering.
-    return re.sub(r'\s', '', ''.join(node.findAll(text=True)))
+    return _ANY_WHITESPACE_PATTERN.sub('', ''.join(node.findAll(text=True)))
 
 
+@accepts('ce:footnote')
 def extract_ce_footnote(node):
     assert_node_type(node, 'ce:footnote')
     return ''
@@ -411,6 +444,7 @@ def extract_ce_def_description(node):
     return '\n'.join(paragraphs)
 
 
+@accepts('ce:def-list')
 def extract_ce_def_list(node):
     assert_node_type(node, 'ce:def-list')
     # <!ELEMENT   ce:def-list         ( ce:label?, ce:section-title?,
@@ -460,6 +494,7 @@ def extract_ce_list_item(node):
     return '\n'.join(paragraphs)
 
 
+@accepts('ce:list')
 def extract_ce_list(node):
     # <!ELEMENT   ce:list             ( ce:label?, ce:section-title?, ce:list-item+ )>
     assert_node_type(node, 'ce:list')
@@ -478,61 +513,72 @@ def extract_ce_list(node):
     return '\n'.join(paragraphs)
 
 
+@accepts('ce:float-anchor')
 def extract_ce_float_anchor(node):
     assert_node_type(node, 'ce:float-anchor')
     return ''
 
 
+@accepts('ce:anchor')
 def extract_ce_anchor(node):
     # <!ELEMENT   ce:anchor           ( %richstring.data; )* >
     assert_node_type(node, 'ce:anchor')
     return extract_text_any(node, process_richstring_data)
 
 
+@accepts('ce:grant-sponsor')
 def extract_ce_grant_sponsor(node):
     # <!ELEMENT   ce:grant-sponsor    ( %text.data; )* >
     assert_node_type(node, 'ce:grant-sponsor')
     return extract_text_any(node, process_text_data)
 
 
+@accepts('ce:grant-number')
 def extract_ce_grant_number(node):
     # <!ELEMENT   ce:grant-number     ( %text.data; )* >
     assert_node_type(node, 'ce:grant-number')
     return extract_text_any(node, process_text_data)
 
 
+@accepts('ce:figure')
 def extract_ce_figure(node):
     assert_node_type(node, 'ce:figure')
     return ''
 
 
+@accepts('ce:table')
 def extract_ce_table(node):
     assert_node_type(node, 'ce:table')
     return ''
 
 
+@accepts('ce:textbox')
 def extract_ce_textbox(node):
     assert_node_type(node, 'ce:textbox')
     return ''
 
 
+@accepts('ce:e-component')
 def extract_ce_e_component(node):
     assert_node_type(node, 'ce:e-component')
     return ''
 
 
+@accepts('ce:chem')
 def extract_ce_chem(node):
     # <!ELEMENT   ce:chem             ( %textfn.data; )* >
     assert_node_type(node, 'ce:chem')
     return extract_text_any(node, process_textfn_data)
 
 
+@accepts('ce:link')
 def extract_ce_link(node):
     # <!ELEMENT   ce:link             EMPTY>
     assert_node_type(node, 'ce:link')
     return ''
 
 
+@accepts('*:formula')
 def extract_ce_formula(node):
     # <!ELEMENT   ce:formula
     #             ( ce:label?, ( mml:math | ce:chem | ce:link | ce:formula+ ))>
@@ -557,14 +603,10 @@ def extract_ce_formula(node):
         return ' '.join(formulas)
 
     # Another hack: we put an additional whitespace to separate formula and text
-    return ' %s ' % extract_text_or(children[0], (
-        extract_mml_math,
-        extract_ce_chem,
-        extract_ce_link,
-        extract_ce_formula,
-    ))
+    return ' %s ' % FORMULA_CONTENT.extract(children[0])
 
 
+@accepts('*:display')
 def extract_ce_display(node):
     # <!ELEMENT   ce:display
     #   ( ce:figure | ce:table | ce:textbox | ce:e-component | ce:formula )>
@@ -579,13 +621,7 @@ def extract_ce_display(node):
 
     if len(children) != 1:
         raise ValueError('ce:display must only have one child, got %d', len(children))
-    return extract_text_or(children[0], (
-        extract_ce_figure,
-        extract_ce_table,
-        extract_ce_textbox,
-        extract_ce_e_component,
-        extract_ce_formula,
-    ))
+    return DISPLAY_CONTENT.extract(children[0])
 
 
 def extract_ce_simple_para(node):
@@ -594,6 +630,7 @@ def extract_ce_simple_para(node):
     return remove_consecutive_whitespaces(text, keep_newline=True).strip()
 
 
+@accepts('ce:displayed-quote')
 def extract_ce_displayed_quote(node):
     # <!ELEMENT   ce:displayed-quote  ( ce:simple-para+, ce:source? )>
     assert_node_type(node, 'ce:displayed-quote')
@@ -612,6 +649,7 @@ def extract_ce_displayed_quote(node):
     return '\n'.join(paragraphs)
 
 
+@accepts('ce:enunciation')
 def extract_ce_enunciation(node):
     # <!ELEMENT   ce:enunciation      ( ce:label, ce:section-title?, ce:para+ )>
     # We ignore label and section title
@@ -657,6 +695,7 @@ def extract_ce_section(node):
             raise ValueError('Expecting more than 0 parsec')
 
         for _child in children_array:
+            checkpoint()
             if node_named(_child, 'ce:para'):
                 for i in extract_ce_para(_child).split('\n'):
                     yield i
@@ -752,3 +791,23 @@ def extract_ce_title(node):
         extract_text_any(node, process_textfn_data),
         keep_newline=False
     ).strip()
+
+
+# Dispatch tables of the grammar, built once all rules are defined. Rules
+# must be built after the rules they are made of.
+TEXT_DATA = Alternatives((process_richstring_data, extract_mml_math), process_text_data)
+TEXTLINK_DATA = Alternatives((process_text_data, process_inter_ref), process_textlink_data)
+CROSS_REF_S = Alternatives((process_cross_ref, process_cross_refs), process_cross_ref_s)
+TEXTREF_DATA = Alternatives((process_text_data, process_cross_ref_s, process_inter_ref_s), process_textref_data)
+LISTS = Alternatives((extract_ce_def_list, extract_ce_list), process_lists)
+TEXT_OBJECTS = Alternatives((extract_ce_anchor, extract_ce_grant_sponsor, extract_ce_grant_number),
+                            process_text_objects)
+TEXTFN_DATA = Alternatives((process_text_data, extract_ce_footnote, process_cross_ref_s), process_textfn_data)
+DISPLAY = Alternatives((extract_ce_display, extract_ce_displayed_quote, extract_ce_enunciation), process_display)
+SPAR_DATA = Alternatives((process_textref_data, process_display, process_lists, extract_ce_footnote,
+                          process_text_objects), process_spar_data)
+PAR_DATA = Alternatives((process_textref_data, extract_ce_float_anchor, process_display, process_lists,
+                         extract_ce_footnote, process_text_objects), process_par_data)
+FORMULA_CONTENT = Alternatives((extract_mml_math, extract_ce_chem, extract_ce_link, extract_ce_formula))
+DISPLAY_CONTENT = Alternatives((extract_ce_figure, extract_ce_table, extract_ce_textbox, extract_ce_e_component,
+                                extract_ce_formula))
@@ -2,6 +2,8 @@ import re
 
 from bs4 import Tag, Comment
 
+from LimeSoup.budget import checkpoint
+
 __author__ = "Haoyan Huo"
 __maintainer__ = "Haoyan Huo"
 __email__ = "haoyan.huo@lbl.gov"
@@ -31,8 +33,11 @@ NON_DISPLAY_TAGS = {
 }
 
 
+_SPACES_PATTERN = re.compile(r'[ \t]+')
+
+
 def normalize_text(string):
-    return re.sub(r'[ \t]+', ' ', string.strip())
+    return _SPACES_PATTERN.sub(' ', string.strip())
 
 
 def get_tag_text(cur_tag):
@@ -46,7 +51,7 @@ def get_tag_text(cur_tag):
     for child in cur_tag.contents:
         if child.name is None:
             # this is a pure text
-            strings.append(re.sub(r'\n', ' ', child))
+            strings.append(child.replace('\n', ' '))
         elif child.name in NON_DISPLAY_TAGS:
             pass
         elif child.name in LINEBREAK_ELEMENTS:
@@ -60,24 +65,55 @@ def get_tag_text(cur_tag):
     return normalize_text(' '.join(strings)) # FixAPR24) added space between section number and heading
 
 
-def extract_paragraphs_recursive(tag_or_soup, exclude_section_rules=None):
+def _iter_runs(tag_or_soup):
     """
-    This function recursively extracts paragraphs from a HTML DOM.
-
-    Section headings such as <h1>, <h2>, <h3>, <h4>, <h5> will be
-    used to determine the document hierarchy.
-
-    TODO: write unit tests for this function
+    Walk a HTML DOM and yield its paragraphs as soon as they end.
 
-    :param tag_or_soup: the Tag or BeautifulSoup object to analyze.
-    :type tag_or_soup: bs4.BeautifulSoup or bs4.element.Tag
-    :param exclude_section_rules: regular expressions representing
-        sections to exclude.
+    Consecutive strings under the same headings make a run, a heading being a
+    tuple of (level, (heading_name, section_type)) sorted by level. The first
+    event of a run is (heading, None), then each of its paragraphs comes as
+    (heading, paragraph).
     """
+    # The heading of the strings being added, and of the current run. A
+    # heading tuple is never modified, so strings under the same headings
+    # share one tuple.
+    cur_heading = [()]
+    run_heading = [None]
+    # Strings of the unfinished paragraph, and events ready to be yielded.
+    line = []
+    ready = []
+
+    def add_string(string):
+        heading = cur_heading[0]
+        if run_heading[0] is not heading and run_heading[0] != heading:
+            if line:
+                ready.append((run_heading[0], ''.join(line)))
+                del line[:]
+            run_heading[0] = heading
+            ready.append((heading, None))
+
+        if '\n' not in string:
+            line.append(string)
+            return
+        parts = string.split('\n')
+        line.append(parts[0])
+        ready.append((heading, ''.join(line)))
+        for part in parts[1:-1]:
+            ready.append((heading, part))
+        line[:] = [parts[-1]]
+
+    def drain():
+        events = list(ready)
+        del ready[:]
+        for heading, text in events:
+            if text is None:
+                yield heading, None
+            else:
+                text = _SPACES_PATTERN.sub(' ', text).strip()
+                if text:
+                    yield heading, text
 
-    text_chunks = []
-
-    def find_paragraphs(cur_tag, cur_heading=None):
+    def find_paragraphs(cur_tag):
         """
         Extracts the current tag's embedded text.
 
@@ -104,11 +140,9 @@ def extract_paragraphs_recursive(tag_or_soup, exclude_section_rules=None):
 
 
         """
-        # don't override caller's heading info, as we will be jumping outside
-        if cur_heading is None:
-            cur_heading = {}
-
-        for i, child in enumerate(cur_tag.contents):
+        checkpoint()
+        contents = cur_tag.contents
+        for i, child in enumerate(contents):
 
             # Skip comment blocks
             if isinstance(child, Comment):
@@ -116,69 +150,109 @@ def extract_paragraphs_recursive(tag_or_soup, exclude_section_rules=None):
 
             if child.name is None:
                 # this is a pure text
-                child_text = re.sub(r'\n', ' ', child)
-                if i < len(cur_tag.contents) - 1 and cur_tag.contents[i + 1].name is None:
+                child_text = child.replace('\n', ' ')
+                if i < len(contents) - 1 and contents[i + 1].name is None:
                     # !!! This is actually a hack. When we modify the HTML DOM, we might
                     # remove a node between text nodes, thus these two nodes are left disconnected
                     # an additional whitespace should be inserted.
                     child_text += ' '
-                # .copy(): performance issues?
-                text_chunks.append((cur_heading.copy(), child_text))
+                add_string(child_text)
             elif child.name in {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}:
                 child_level = int(child.name[1])
                 child_heading_name = get_tag_text(child)
 
-                for lower_levels in range(child_level + 1, 7):
-                    if lower_levels in cur_heading:
-                        del cur_heading[lower_levels]
-                # print(child, child_heading_name)
-                cur_heading[child_level] = (child_heading_name, 'section_' + child.name)
+                # Headings of lower levels end here.
+                cur_heading[0] = tuple(x for x in cur_heading[0] if x[0] < child_level) + \
+                    ((child_level, (child_heading_name, 'section_' + child.name)),)
             elif child.name in NON_DISPLAY_TAGS:
                 pass
             elif child.name in LINEBREAK_ELEMENTS:
-                text_chunks.append((cur_heading.copy(), '\n'))
+                add_string('\n')
             elif child.name in INLINE_TAGS:
-                find_paragraphs(child, cur_heading)
+                for event in find_paragraphs(child):
+                    yield event
             else:
-                text_chunks.append((cur_heading.copy(), '\n'))
-                find_paragraphs(child, cur_heading)
-                text_chunks.append((cur_heading.copy(), '\n'))
+                add_string('\n')
+                for event in find_paragraphs(child):
+                    yield event
+                add_string('\n')
+
+            if ready:
+                for event in drain():
+                    yield event
 
     if isinstance(tag_or_soup, Tag):
-        find_paragraphs(tag_or_soup)
+        tags = [tag_or_soup]
     else:
-        for tag in tag_or_soup:
-            find_paragraphs(tag)
+        tags = tag_or_soup
+    for tag in tags:
+        # Every tag starts without headings.
+        cur_heading[0] = ()
+        for event in find_paragraphs(tag):
+            yield event
 
-    # Up to now, we have recursively extracted all strings.
-    # Now we must merge strings according to the rules defined above.
-    paragraphs = []
+    if line:
+        ready.append((run_heading[0], ''.join(line)))
+    for event in drain():
+        yield event
+
+
+def _excluded(heading, exclude_section_rules):
+    return any(rule.match(name) for _, (name, _) in heading for rule in exclude_section_rules)
+
+
+def iter_paragraphs(tag_or_soup, exclude_section_rules=None):
+    """
+    Extract paragraphs from a HTML DOM, like extract_paragraphs_recursive(),
+    one at a time as the DOM is walked.
 
+    :param tag_or_soup: the Tag or BeautifulSoup object to analyze.
+    :type tag_or_soup: bs4.BeautifulSoup or bs4.element.Tag
+    :param exclude_section_rules: regular expressions representing
+        sections to exclude.
+    :return: generator of (section path, paragraph), the section path being
+        a tuple of heading names, outermost first.
+    """
     exclude_section_rules = exclude_section_rules or []
+    excluded = False
+    path = ()
+    for heading, text in _iter_runs(tag_or_soup):
+        if text is None:
+            excluded = _excluded(heading, exclude_section_rules)
+            path = tuple(name for _, (name, _) in heading)
+        elif not excluded:
+            yield path, text
+
 
-    def should_exclude_sec(sec_name):
-        for rule in exclude_section_rules:
-            if rule.match(sec_name):
-                return True
-        return False
+def extract_paragraphs_recursive(tag_or_soup, exclude_section_rules=None):
+    """
+    This function recursively extracts paragraphs from a HTML DOM.
+
+    Section headings such as <h1>, <h2>, <h3>, <h4>, <h5> will be
+    used to determine the document hierarchy.
 
-    while len(text_chunks) > 0:
-        strings = []
-        current_heading, string = text_chunks.pop(0)
-        strings.append(string)
+    :param tag_or_soup: the Tag or BeautifulSoup object to analyze.
+    :type tag_or_soup: bs4.BeautifulSoup or bs4.element.Tag
+    :param exclude_section_rules: regular expressions representing
+        sections to exclude.
+    """
+    exclude_section_rules = exclude_section_rules or []
+    paragraphs = []
+    cur_level = None
 
-        while len(text_chunks) > 0 and text_chunks[0][0] == current_heading:
-            _, string = text_chunks.pop(0)
-            strings.append(string)
+    for current_heading, text in _iter_runs(tag_or_soup):
+        if text is not None:
+            if cur_level is not None:
+                cur_level.append(text)
+            continue
 
-        if any(should_exclude_sec(x[0]) for x in current_heading.values()):
+        if _excluded(current_heading, exclude_section_rules):
+            cur_level = None
             continue
 
         # Construct paragraphs hierarchy!
         cur_level = paragraphs
-        for level in sorted(current_heading):
-            heading_name, heading_level = current_heading[level]
-
+        for _, (heading_name, heading_level) in current_heading:
             if len(cur_level) < 1 or not isinstance(cur_level[-1], dict) or \
                     cur_level[-1]['type'] != heading_level or cur_level[-1]['name'] != heading_name:
                 cur_level.append({
@@ -189,9 +263,4 @@ def extract_paragraphs_recursive(tag_or_soup, exclude_section_rules=None):
 
             cur_level = cur_level[-1]['content']
 
-        for paragraph in normalize_text(''.join(strings)).split('\n'):
-            paragraph = paragraph.strip()
-            if len(paragraph) > 0:
-                cur_level.append(paragraph)
-
     return paragraphs
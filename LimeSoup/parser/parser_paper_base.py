@@ -0,0 +1,484 @@
+"""
+Core of the ParserPaper classes of the publisher parsers.
+
+parser_paper.py, parser_paper_acs.py, parser_paper_aps.py, parser_paper_IOP.py,
+parser_paper_springer.py and parser_paper_wiley.py each define a ParserPaper
+subclass of ParserPaperBase, with only what is specific to their publishers.
+They customize the shared methods through class attributes:
+
+    heading_rule            find_all() rule of the headings, in debugging mode.
+    paragraph_rule          find_all() rule of the paragraphs, in debugging mode.
+    paragraph_pattern       children wrapped by create_tag_to_paragraphs_inside_tag().
+    default_section_name    heading of the sections created from a selection.
+    heading_levels          headings wrapped by create_tag_sections().
+    section_name            for XML papers with explicit sections, such as
+                            <sec>, the tag wrapped by create_tag_sections().
+    abstract_type           type of the section made by create_abstract().
+
+and by overriding convert_to_text(), keyword_text(), section_level() and
+create_parser_sections().
+"""
+import re
+import warnings
+
+import bs4
+
+import LimeSoup.parser.tools as tl
+from LimeSoup.parser.sections import HEADINGS, wrap_heading_sections
+from LimeSoup.parser.tag_rules import TagRules
+
+__author__ = 'Kevin Cruse'
+__maintainer__ = 'Kevin Cruse'
+__email__ = 'kevcruse96@gmail.com'
+__all__ = ['ParserPaperBase']
+
+
+class ParserPaperBase(object):
+    heading_rule = {'name': re.compile('^h[1-6]$')}
+    paragraph_rule = {'name': 'p'}
+    paragraph_pattern = re.compile('(p|ol)|span')
+    default_section_name = 'Abstract'
+    heading_levels = HEADINGS
+    section_name = None
+    abstract_type = 'abstract'
+    soup_file_name = 'soup.html'
+    # name -> <meta> tags of the document, built by meta_tags(), and whether
+    # it covers the whole document or only <head>.
+    _meta_index = None
+    _meta_index_complete = False
+    # True for malformed documents, whose DOM is parsed again after each edit,
+    # see repaired().
+    repair = False
+
+    def __init__(self, raw_html, parser_type='lxml-xml', debugging=False):
+        """
+        :param raw_html:
+        :param parser_type: can be 'html.parser', 'lxml', 'html5lib', 'lxml-xml'
+        :param debugging: True or False
+        """
+        self.debugging = debugging
+        self.soup = bs4.BeautifulSoup(raw_html, parser_type)
+        self.parser_type = parser_type
+        self.title = []
+        self.keywords = []
+        self.data_sections = []
+        self.headings_sections = []
+        self.number_paragraphs_sections = []
+        if debugging:
+            self.soup_orig = self.soup
+
+    @staticmethod
+    def create_soup(html_xlm, parser_type='html.parser'):
+        # parser_types = ['html.parser', 'lxml', 'html5lib', 'lxml-xml']
+        return bs4.BeautifulSoup(html_xlm, parser_type)
+
+    @staticmethod
+    def compile(pattern):
+        return re.compile(pattern)
+
+    @staticmethod
+    def convert_to_text(text):
+        return tl.convert_to_text(text)
+
+    def keyword_text(self, tag):
+        """
+        :param tag: keyword tag
+        :return: text of the keyword
+        """
+        return self.convert_to_text(tag.get_text())
+
+    def section_level(self, tag):
+        """
+        Level N of the <section_hN> tag wrapping an explicit section tag.
+        :param tag: tag named section_name
+        :return: int
+        """
+        raise NotImplementedError
+
+    def save_soup_to_file(self, filename=None, prettify=True):
+        """
+        Save the soup to a file to be analysed. This can be used during the
+        debugging process.
+        :param filename: str that contain the name of the file
+        :param prettify: boolean to add spaces on children tags
+        :return: None - just save a file on disk
+        """
+        with open(filename or self.soup_file_name, 'w', encoding='utf-8') as fd_div:
+            if prettify:
+                fd_div.write(self.soup.prettify())
+            else:
+                fd_div.write(str(self.soup))
+            fd_div.write('\n')
+
+    def meta_tags(self, name):
+        """
+        <meta> tags of the document with a name attribute, in the order of the
+        document. The tags of every name are indexed in one pass over <head>
+        (over the whole document if it has no <head>) at the first call. When
+        a name has no tag there, such as on broken pages where the tree
+        builder puts <meta> tags in <body>, the whole document is indexed
+        instead. Tags added to the soup later are not seen.
+
+        :param name: value of the name attribute, such as "citation_doi".
+        :return: list of bs4.Tag.
+        """
+        if self._meta_index is None:
+            root = self.soup.head
+            self._meta_index = self._index_meta(root or self.soup)
+            self._meta_index_complete = root is None
+        if not self._meta_index.get(name) and not self._meta_index_complete:
+            self._meta_index = self._index_meta(self.soup)
+            self._meta_index_complete = True
+        return list(self._meta_index.get(name, ()))
+
+    @staticmethod
+    def _index_meta(root):
+        index = {}
+        for tag in root.find_all('meta', attrs={'name': True}):
+            index.setdefault(tag['name'], []).append(tag)
+        return index
+
+    def extract_meta(self, *meta_names):
+        """
+        Extract metadata from <head> section. The <meta> tags will be removed.
+
+        :param meta_names: List of names that should be extracted.
+        :return: list of strings.
+        """
+        results = []
+        for name in meta_names:
+            for item in self.meta_tags(name):
+                if item.has_attr('content'):
+                    results.append(item['content'].strip())
+                item.extract()
+            self._meta_index.pop(name, None)
+        return results
+
+    def extract_first_meta(self, *meta_names):
+        """
+        Extract the first metadata from <head> section. The <meta> tag will be removed.
+
+        :param meta_names: List of names that should be extracted.
+        :return: a string containing the metadata value.
+        """
+        for name in meta_names:
+            for index, item in enumerate(self.meta_tags(name)):
+                if item.has_attr('content'):
+                    value = item['content'].strip()
+                    item.extract()
+                    del self._meta_index[name][index]
+                    return value
+        return None
+
+    def get(self, rules):
+        results = list()
+        for rule in rules:
+            finds = self.soup.find_all(**rule)
+            for item in finds:
+                text = self.convert_to_text(item.get_text())
+                results.append(text)
+                item.extract()
+        return results
+
+    def get_title(self, rules):
+        try:
+            self.title = next(x for x in self.get(rules))
+        except StopIteration:
+            self.title = None
+
+    def get_keywords(self, rules):
+        self.keywords = []
+        for rule in rules:
+            for keyword in self.soup.find_all(**rule):
+                self.keywords.append(self.keyword_text(keyword))
+                keyword.extract()
+        return self.keywords
+
+    def remove_tags(self, rules):
+        """
+        Remove tags from bs4 soup object using a list of bs4 rules to find_all()
+        :param rules: list() of dict() of rules of bs4 find_all()
+        :return: None
+        """
+        TagRules(remove=rules).apply(self.soup)
+
+    def remove_tag(self, rules):
+        """
+        Remove the first tag found by each rule.
+        :param rules: rules: list() of dict() of rules of bs4 find_all()
+        :return: None
+        """
+        for rule in rules:
+            for s in self.soup.find_all(limit=1, **rule):
+                s.extract()
+
+    def remove_first_tag(self, rules):
+        """
+        Remove the first tag found by the first rule that finds one.
+        :param rules: rules: list() of dict() of rules of bs4 find_all()
+        :return: None
+        """
+        for rule in rules:
+            for s in self.soup.find_all(limit=1, **rule):
+                s.extract()
+                return
+
+    def strip_tags(self, rules):
+        """
+        Replace some tag with the children tag.
+        :param rules: list of rules for bs4 find_all()
+        :return: names of the stripped tags
+        """
+        return TagRules(strip=rules).apply(self.soup)
+
+    def rename_tag(self, rule, new_name='section_h4'):
+        TagRules(rename=[(rule, new_name)]).apply(self.soup)
+
+    def apply_rules(self, rules):
+        """
+        Remove, strip and rename tags in one walk of the document.
+        :param rules: LimeSoup.parser.tag_rules.TagRules object
+        :return: names of the stripped tags
+        """
+        return rules.apply(self.soup)
+
+    def operation_tag_remove_space(self, rules):
+        for rule in rules:
+            for tag in self.soup.find_all(**rule):
+                tag.string = tag.get_text().strip()
+
+    def pad_tag_boundaries(self):
+        """
+        Join adjacent strings and surround tags with whitespace, in place,
+        the way a prettify() round trip lays out the text.
+        :return: None
+        """
+        tl.pad_tag_boundaries(self.soup)
+
+    def parse_formula(self, rules):
+        for rule in rules:
+            for item in self.soup.find_all(**rule):
+                label = item.find('id')
+                if label is not None:
+                    label.string = ' ' + label.string + ' '
+                item.append(', ')
+
+    def _new_section(self, name_new_tag, name_section):
+        if name_section is None:
+            name_section = self.default_section_name
+        section = self.soup.new_tag('section_{}'.format(name_new_tag))
+        if name_section is not None:
+            heading = self.soup.new_tag('h2')
+            heading.append(name_section)
+            section.append(heading)
+        return section
+
+    def create_tag_from_selection(self, rule, name_new_tag, name_section=None):
+        """
+        Create a tag inside a bs4 soup object from a selection using a rule.
+        :param rule: a dict() of rules of bs4 find_all()
+        :param name_new_tag: new tag's name
+        :param name_section: create a <h2> tag with the name_section content,
+            default_section_name by default
+        :return: None
+        """
+        inside_tags = self.soup.find_all(**rule)
+        section = self._new_section(name_new_tag, name_section)
+        for tag in inside_tags:
+            tag.wrap(section)
+            section.append(tag)
+
+    def create_tag_to_paragraphs_inside_tag(self, rule, name_new_tag, name_section=None):
+        """
+        Wrap the leading paragraphs of the first tag found by a rule into a
+        section, up to the first <section_h#> tag.
+        :param rule: a dict() of rules of bs4 find_all()
+        :param name_new_tag: new tag's name
+        :param name_section: create a <h2> tag with the name_section content,
+            default_section_name by default
+        :return: a message if no section was created
+        """
+        container = self.soup.find(**rule)
+        if container is None:
+            return 'Section not created, number of paragraphs equal zero.'
+        inside_tags = container.find_all(self.paragraph_pattern, recursive=False)
+        if len(inside_tags) == 0:
+            return 'Section not created, number of paragraphs equal zero.'
+        section = self._new_section(name_new_tag, name_section)
+        for tag in inside_tags:
+            tag_next_sibling = tag.find_next_sibling()
+            tag.wrap(section)
+            section.append(tag)
+            if tag_next_sibling is None or 'section_h' in tag_next_sibling.name:
+                break
+
+    def create_tag_sections(self, rule=None):
+        """
+        Create the standard tags (<section_h#>): wrap every section_name tag,
+        or the headings of heading_levels and the siblings that follow them,
+        see LimeSoup.parser.sections.
+        :param rule: unused
+        :return:
+        """
+        if self.section_name is None:
+            wrap_heading_sections(self.soup, levels=self.heading_levels)
+            return
+        for each_tag in self.soup.find_all(self.section_name):
+            section = self.soup.new_tag('section_h{}'.format(self.section_level(each_tag)))
+            each_tag.wrap(section)
+
+    def change_name_tag_sections(self):
+        tags = self.soup.find_all(re.compile('^h[2-6]'))
+        for each_tag in tags:
+            each_tag.parent.name = 'section_{}'.format(each_tag.name)
+
+    def create_section(self, name='no_name_section', type_section='no_type', content=[]):
+        return {
+            'type': type_section,
+            'name': name,
+            'content': content
+        }
+
+    def deal_with_sections(self):
+        """
+        Deal with the sections, parse tags that contains <'section_h#'>
+        Ex: <'section_h2'>
+        :return:
+        """
+        self.data_sections = []
+        self.create_parser_sections(self.soup)
+
+    def create_parser_sections(self, soup):
+        """
+        Fill data_sections from the <section_h#> tags of a soup.
+        """
+        raise NotImplementedError
+
+    def create_abstract(self, rule):
+        """
+        Create a section for the abstract
+        """
+        abstract = self.soup.find(**rule)
+        if abstract is not None:
+            self.data_sections.insert(0, self.create_section(
+                name='Abstract',
+                type_section=self.abstract_type,
+                content=self.convert_to_text(abstract.get_text())
+            ))
+
+    def get_abstract(self, rule):
+        """
+        Get abstract when there is no body article
+        """
+        abstract = self.soup.find(**rule)
+        if abstract is not None:
+            abstract_text = re.sub('(?<!\\.)\\n', '', abstract.get_text())
+            abstract_text = abstract_text.replace('Abstract', '')
+            abstract_text = abstract_text.replace('\n', '')
+            abstract_text = abstract_text.replace('  ', '')
+            return {
+                'type': 'section_h2',
+                'name': 'Abstract',
+                'content': [abstract_text]
+            }
+
+    def raw_text(self, rule):
+        """
+        Get the text with no format if the paper does not provide the sections hierarchy.
+        """
+        raw_text = self.soup.find(**rule)
+        if raw_text is not None:
+            return {
+                'type': 'section_h2',
+                'name': 'Raw text',
+                'content': [raw_text.get_text()]
+            }
+
+    @property
+    def headings_orig(self):
+        if not self.debugging:
+            warnings.warn('Debugging mode has to be True when call the class')
+            return None
+        return [item.get_text() for item in self.soup_orig.find_all(**self.heading_rule)]
+
+    @property
+    def headings(self):
+        if not self.debugging:
+            warnings.warn('Debugging mode has to be True when call the class')
+            return None
+        return [self.convert_to_text(item.get_text()) for item in self.soup.find_all(**self.heading_rule)]
+
+    @property
+    def paragraphs(self):
+        if not self.debugging:
+            warnings.warn('Debugging mode has to be True when call the class')
+            return None
+        list_paragraphs = []
+        for item in self.soup.find_all(**self.paragraph_rule):
+            text = self.convert_to_text(item.get_text())
+            if len(text) != 0:
+                item.string = text
+                list_paragraphs.append(item.get_text())
+        return list_paragraphs
+
+    @property
+    def paragraphs_orig(self):
+        if not self.debugging:
+            warnings.warn('Debugging mode has to be True when call the class')
+            return None
+        return [item.get_text() for item in self.soup_orig.find_all(name=re.compile('p'))]
+
+    @property
+    def span(self):
+        import copy
+        if not self.debugging:
+            warnings.warn('Debugging mode has to be True when call the class')
+            return None
+        soup_one = copy.copy(self.soup)
+        for e in soup_one.find_all(name=re.compile('^h[1-6]$')):
+            e.extract()
+        find_one = soup_one.find_all(name=re.compile('span|p'), limit=1)
+        list_paragraphs = []
+        while len(find_one) != 0:
+            text = self.convert_to_text(find_one[0].get_text())
+            if (find_one[0].name is not None) and (len(text) != 0):
+                list_paragraphs.append(text)
+            find_one[0].extract()
+            find_one = soup_one.find_all(name=re.compile('span|p'), limit=1)
+        return list_paragraphs
+
+    def number_of_paragraphs_inside_parameters(self, parameters):
+        if not self.debugging:
+            warnings.warn('Debugging mode has to be True when call the class')
+            return None
+        return sum(len(it.find_all('p', recursive=False)) for it in self.soup_orig.find_all(parameters))
+
+    def number_of_paragraphs_children(self):
+        if not self.debugging:
+            warnings.warn('Debugging mode has to be True when call the class')
+            return None
+        return len(list(self.soup_orig.children)[0].find_all('p', recursive=True))
+
+    @property
+    def raw_html(self):
+        return self.soup.prettify()
+
+    @property
+    def raw_xml(self):
+        return self.soup.prettify()
+
+    def repaired(self):
+        """
+        The tree builder repairs the nesting of a malformed document each time
+        it parses it, and the edits of the DOM can break it again. For those
+        documents, pipelines serialize the DOM and parse it again after each
+        step, as all of them did before they shared one DOM.
+
+        :return: this ParserPaper, or when repair is True, a new one parsing
+            the serialized document.
+        """
+        if not self.repair:
+            return self
+        parser = type(self)(str(self.soup), parser_type=self.parser_type, debugging=self.debugging)
+        parser.repair = True
+        return parser
@@ -0,0 +1,190 @@
+"""
+Find the region of a page worth parsing before building its DOM.
+
+Publisher pages wrap the article in navigation, scripts and recommendations.
+extract_region() scans the markup with a tokenizer, without building a DOM,
+and returns the markup of the article container only, optionally with the
+<meta> tags outside of it, so BeautifulSoup only builds the part that is used.
+
+    markup = extract_region(html_str, attrs={'data-article-body': 'true'}, keep=('meta',))
+    parser = ParserPaper(markup, parser_type='html.parser')
+
+The container ends where html.parser would close it: at its end tag, or at
+the end tag of an element around it when it is left open. This is only meant
+for documents parsed with 'html.parser'.
+"""
+import html
+import re
+
+from bs4.builder._htmlparser import HTMLParserTreeBuilder
+
+__author__ = 'Kevin Cruse'
+__maintainer__ = 'Kevin Cruse'
+__email__ = 'kevcruse96@gmail.com'
+__all__ = ['find_region', 'extract_region', 'keep_only']
+
+# Elements that never have children, as built by BeautifulSoup.
+VOID_ELEMENTS = frozenset(HTMLParserTreeBuilder().empty_element_tags)
+
+# Comments, declarations and processing instructions, then tags: the name,
+# and the attributes, which may have ">" inside quotes.
+_TOKEN_PATTERN = re.compile(
+    r'<(?:!--.*?-->|[!?][^>]*>|(/)?([a-zA-Z][^\t\n\r\f />\x00]*)((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>)',
+    re.DOTALL)
+_ATTRIBUTE_PATTERN = re.compile(
+    r'([^\s=/>]+)(?:\s*=\s*("[^"]*"|\'[^\']*\'|[^\s>]*))?')
+# html.parser reads the content of these elements as text until their end tag.
+_RAW_TEXT_END_PATTERNS = {
+    'script': re.compile(r'</\s*script\s*>', re.IGNORECASE),
+    'style': re.compile(r'</\s*style\s*>', re.IGNORECASE),
+}
+
+
+def _parse_attributes(text):
+    attributes = {}
+    for name, value in _ATTRIBUTE_PATTERN.findall(text):
+        if value[:1] in ('"', "'"):
+            value = value[1:-1]
+        attributes[name.lower()] = html.unescape(value)
+    return attributes
+
+
+def _matches(name, text, wanted_name, wanted_attrs):
+    if wanted_name is not None and name != wanted_name:
+        return False
+    if not wanted_attrs:
+        return True
+    lower = text.lower()
+    if not all(key in lower for key in wanted_attrs):
+        return False
+    attributes = _parse_attributes(text)
+    for key, value in wanted_attrs.items():
+        if key not in attributes:
+            return False
+        if key == 'class':
+            if value not in attributes[key].split() and value != attributes[key]:
+                return False
+        elif attributes[key] != value:
+            return False
+    return True
+
+
+def _scan(markup, name, attrs, keep):
+    """
+    :return: ((start, end) of the container or None, list of (start, end) of
+        the kept tags outside of it).
+    """
+    stack = []
+    container = None
+    start = end = None
+    kept = []
+
+    position = 0
+    while True:
+        match = _TOKEN_PATTERN.search(markup, position)
+        if match is None:
+            break
+        position = match.end()
+        tag_name = match.group(2)
+        if tag_name is None:
+            continue
+        tag_name = tag_name.lower()
+
+        if match.group(1):
+            # End tag, closing every element opened after the one it closes.
+            if tag_name not in stack:
+                continue
+            index = len(stack) - 1 - stack[::-1].index(tag_name)
+            if container is not None and end is None and index <= container:
+                end = match.end() if index == container else match.start()
+            del stack[index:]
+            if end is not None and not keep:
+                break
+            continue
+
+        if tag_name in VOID_ELEMENTS:
+            if tag_name in keep and (start is None or end is not None):
+                kept.append((match.start(), match.end()))
+            continue
+        if start is None and _matches(tag_name, match.group(3), name, attrs):
+            start = match.start()
+            if match.group(3).rstrip().endswith('/'):
+                end = match.end()
+                if not keep:
+                    break
+                continue
+            container = len(stack)
+        if match.group(3).rstrip().endswith('/'):
+            continue
+        stack.append(tag_name)
+
+        if tag_name in _RAW_TEXT_END_PATTERNS:
+            raw_end = _RAW_TEXT_END_PATTERNS[tag_name].search(markup, position)
+            if raw_end is None:
+                break
+            position = raw_end.start()
+
+    if start is None:
+        return None, kept
+    if end is None:
+        end = len(markup)
+    return (start, end), kept
+
+
+def find_region(markup, name=None, attrs=None):
+    """
+    Find the first element with a tag name and attributes, like
+    soup.find(name, attrs=attrs).
+
+    :param markup: HTML document, str.
+    :param name: tag name, or None for any.
+    :param attrs: dict of attribute values; "class" matches one of the
+        classes of the element.
+    :return: (start, end) offsets of the markup of the element, or None.
+    """
+    region, _ = _scan(markup, name, attrs, ())
+    return region
+
+
+def extract_region(markup, name=None, attrs=None, keep=(), head=False):
+    """
+    Cut the markup of the first element with a tag name and attributes out of
+    a document.
+
+    :param markup: HTML document, str.
+    :param name: tag name, or None for any.
+    :param attrs: dict of attribute values; "class" matches one of the
+        classes of the element.
+    :param keep: names of void elements, such as "meta", kept from the rest
+        of the document, in the order of the document.
+    :param head: if True, the kept tags are put in a <head> before the
+        element, so that they can be found without walking the element.
+    :return: the markup of the element and of the kept tags, or None if no
+        element matches.
+    """
+    region, kept = _scan(markup, name, attrs, frozenset(keep))
+    if region is None:
+        return None
+    start, end = region
+    before = ''.join(markup[a:b] for a, b in kept if b <= start)
+    after = ''.join(markup[a:b] for a, b in kept if a >= end)
+    if head:
+        return '<head>' + before + after + '</head>' + markup[start:end]
+    return before + markup[start:end] + after
+
+
+def keep_only(soup, tag):
+    """
+    Remove everything but tag from its document, and merge the strings left
+    next to each other by earlier removals, so the document is the one built
+    from str(tag).
+
+    :param soup: BeautifulSoup document.
+    :param tag: bs4.Tag of the document.
+    :return: the document.
+    """
+    tag.extract()
+    soup.clear()
+    soup.append(tag)
+    soup.smooth()
+    return soup
@@ -0,0 +1,110 @@
+"""
+Wrapping of HTML headings into <section_h#> tags.
+
+Each heading is wrapped, with the siblings following it, into a
+<section_hN> tag named after the heading. A section ends before the next
+sibling with the same heading name, or before a <script>. Headings are wrapped
+level by level, h1 first, so a section also takes the sections of higher
+levels that follow it among its siblings:
+
+    <h2/><p/><h3/><p/><h2/>
+    ->
+    <section_h2><h2/><p/><section_h3><h3/><p/></section_h3></section_h2>
+    <section_h2><h2/></section_h2>
+
+ParserPaper.create_tag_sections() used to do this with one find_all() per
+level and one append() per moved sibling. wrap_heading_sections() groups the
+children of every parent of a heading in memory for all levels, then moves
+each node once.
+"""
+
+from LimeSoup.budget import checkpoint
+
+__author__ = 'Kevin Cruse'
+__maintainer__ = 'Kevin Cruse'
+__email__ = 'kevcruse96@gmail.com'
+__all__ = ['HEADINGS', 'wrap_heading_sections']
+
+HEADINGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+# Siblings that end a section, besides the next heading of its level.
+_STOP = 'script'
+
+
+class _Section(object):
+    """
+    A <section_hN> tag to be created.
+    """
+    __slots__ = ('name', 'children')
+
+    def __init__(self, heading):
+        self.name = 'section_' + heading.name
+        self.children = [heading]
+
+
+def _group(nodes, levels):
+    """
+    :param nodes: list of sibling nodes and _Section objects.
+    :param levels: heading names, in the order they are wrapped.
+    :return: nodes, grouped into _Section objects.
+    """
+    if not levels:
+        return nodes
+    heading, levels = levels[0], levels[1:]
+    grouped = []
+    sections = []
+    section = None
+    for node in nodes:
+        name = node.name
+        if name == heading:
+            section = _Section(node)
+            sections.append(section)
+            grouped.append(section)
+        elif name == _STOP or section is None:
+            section = None
+            grouped.append(node)
+        else:
+            section.children.append(node)
+
+    if not sections:
+        return _group(nodes, levels)
+    for section in sections:
+        section.children = _group(section.children, levels)
+    return _group(grouped, levels)
+
+
+def _build(soup, parent, nodes):
+    for node in nodes:
+        if isinstance(node, _Section):
+            tag = soup.new_tag(node.name)
+            _build(soup, tag, node.children)
+            node = tag
+        parent.append(node)
+
+
+def wrap_heading_sections(soup, levels=HEADINGS):
+    """
+    Wrap the headings of a document into <section_hN> tags, in one pass.
+
+    :param soup: bs4.BeautifulSoup, modified in place.
+    :param levels: names of the headings to wrap, outermost level first.
+    :return: None
+    """
+    levels = tuple(levels)
+    parents = []
+    seen = set()
+    for heading in soup.find_all(levels):
+        parent = heading.parent
+        if id(parent) not in seen:
+            seen.add(id(parent))
+            parents.append(parent)
+
+    for parent in parents:
+        checkpoint()
+        children = list(parent.contents)
+        grouped = _group(children, levels)
+        # Every child is first in its parent when it is extracted.
+        for child in children:
+            child.extract()
+        _build(soup, parent, grouped)
+
@@ -0,0 +1,159 @@
+"""
+Compiled lists of bs4 find_all() rules.
+
+ParserPaper.remove_tags(), strip_tags() and rename_tag() used to call
+soup.find_all(**rule) once per rule, walking the whole document for every
+rule. TagRules compiles the rules once, usually at import, and applies all of
+them in one walk of the document:
+
+    TRASH = TagRules(
+        remove=[{'name': 'div', 'class': 'image_table'}, {'name': 'code'}],
+        strip=[{'name': 'em'}],
+    )
+    TRASH.apply(parser.soup)
+
+Rules are matched with bs4's own SoupStrainer, so they mean exactly what they
+mean to find_all(): attribute values can be strings, lists, regexes, callables
+or True, and class rules match any single class as well as the whole class
+attribute. Each tag is only tested against the rules for its name, and the
+rules whose name is not a plain string.
+
+One pass gives the same result as calling remove_tags(remove), then
+strip_tags(strip), then rename_tag() for every rename rule in order.
+"""
+import bs4
+
+from LimeSoup.budget import checkpoint
+
+__author__ = 'Kevin Cruse'
+__maintainer__ = 'Kevin Cruse'
+__email__ = 'kevcruse96@gmail.com'
+__all__ = ['TagRules']
+
+try:
+    from bs4.filter import SoupStrainer
+except ImportError:  # beautifulsoup4 < 4.13
+    from bs4.element import SoupStrainer
+
+REMOVE = 'remove'
+STRIP = 'strip'
+RENAME = 'rename'
+
+# Arguments of find_all() that are not part of a match.
+_UNSUPPORTED = ('limit',)
+
+
+def _make_strainer(rule):
+    rule = dict(rule)
+    for key in _UNSUPPORTED:
+        if key in rule:
+            raise ValueError('Rule %r cannot be compiled, %r is not supported' % (rule, key))
+    # Every tag of the document is visited anyway.
+    rule.pop('recursive', None)
+    if 'text' in rule and 'string' not in rule:
+        rule['string'] = rule.pop('text')
+
+    strainer = SoupStrainer(**rule)
+    if hasattr(strainer, 'matches_tag'):
+        return strainer.matches_tag
+    return lambda tag: strainer.search_tag(tag) is not None
+
+
+def _index_names(rule):
+    """
+    Tag names a rule can match, or None if it can match any name.
+    """
+    name = rule.get('name')
+    if isinstance(name, str):
+        # A prefixed name also matches the local name of a tag with that
+        # prefix, in namespace-aware documents.
+        return {name, name.split(':', 1)[-1]}
+    if isinstance(name, (list, tuple, set)) and all(isinstance(x, str) for x in name):
+        return set(name) | {x.split(':', 1)[-1] for x in name}
+    return None
+
+
+class TagRules(object):
+    """
+    Remove, strip and rename actions on tags, compiled from bs4 rules.
+    """
+
+    def __init__(self, remove=(), strip=(), rename=()):
+        """
+        :param remove: list of rules of tags to remove with their contents.
+        :param strip: list of rules of tags to replace with their children.
+        :param rename: list of (rule, new_name) of tags to rename. A tag
+            renamed by one rule can be renamed again by a later rule.
+        """
+        rules = [(REMOVE, rule, None) for rule in remove]
+        rules += [(STRIP, rule, None) for rule in strip]
+        rules += [(RENAME, rule, new_name) for rule, new_name in rename]
+
+        self._rules = []
+        self._any_name = []
+        self._indexed = {}
+        for i, (action, rule, new_name) in enumerate(rules):
+            self._rules.append((i, action, _make_strainer(rule), new_name))
+            names = _index_names(rule)
+            if names is None:
+                self._any_name.append(i)
+            else:
+                for name in names:
+                    self._indexed.setdefault(name, []).append(i)
+        self._by_name = {}
+
+    def _candidates(self, name):
+        """
+        Rules that can match a tag name, in order.
+        """
+        candidates = self._by_name.get(name)
+        if candidates is None:
+            indexes = sorted(set(self._indexed.get(name, ())) | set(self._any_name))
+            candidates = tuple(self._rules[i] for i in indexes)
+            self._by_name[name] = candidates
+        return candidates
+
+    def _match(self, tag):
+        """
+        Rename a tag if rename rules match, and tell what to do with it.
+
+        :return: REMOVE, STRIP or None.
+        """
+        last_rename = -1
+        candidates = self._candidates(tag.name)
+        i = 0
+        while i < len(candidates):
+            index, action, matches, new_name = candidates[i]
+            i += 1
+            if index <= last_rename or not matches(tag):
+                continue
+            if action != RENAME:
+                return action
+            # Later rules see the new name.
+            tag.name = new_name
+            last_rename = index
+            candidates, i = self._candidates(new_name), 0
+        return None
+
+    def apply(self, soup):
+        """
+        Apply the rules to a document, in one walk of its tags.
+
+        :param soup: bs4.BeautifulSoup or bs4.Tag, modified in place.
+        :return: names of the stripped tags, in document order.
+        """
+        stripped = []
+        stack = [x for x in reversed(soup.contents) if isinstance(x, bs4.Tag)]
+        while stack:
+            checkpoint()
+            tag = stack.pop()
+            action = self._match(tag)
+            if action == REMOVE:
+                tag.extract()
+                continue
+
+            stack.extend(x for x in reversed(tag.contents) if isinstance(x, bs4.Tag))
+            if action == STRIP:
+                stripped.append(tag.name)
+                tag.replace_with_children()
+        return stripped
@@ -0,0 +1,43 @@
+import unittest
+
+from LimeSoup.bench.documents import FIXTURES, load_fixture, make_document, nest_elsevier_sections, scale
+from LimeSoup.bench.soups import percentile
+from LimeSoup.registry import get_soup
+
+
+class TestBenchDocuments(unittest.TestCase):
+    def test_fixtures_parse(self):
+        for publisher in FIXTURES:
+            with self.subTest(publisher=publisher):
+                sections = get_soup(publisher).parse(make_document(publisher))['Sections']
+                self.assertGreater(len(sections), 1)
+
+    def test_scale(self):
+        document = 'head<!-- BENCH REPEAT -->\n<p>x</p><!-- /BENCH REPEAT -->\ntail'
+        self.assertEqual(scale(document, 1), 'head<p>x</p>tail')
+        self.assertEqual(scale(document, 3), 'head<p>x</p><p>x</p><p>x</p>tail')
+        with self.assertRaises(ValueError):
+            scale('<p>x</p>', 2)
+
+    def test_rsc_paragraphs(self):
+        def count(sections):
+            return sum(count(x['content']) if isinstance(x, dict) else 1 for x in sections)
+
+        document = load_fixture('rsc')
+        small = get_soup('rsc').parse(scale(document, 1))
+        large = get_soup('rsc').parse(scale(document, 3))
+        self.assertEqual(count(large['Sections']), count(small['Sections']) + 2 * 3)
+
+    def test_deep_elsevier(self):
+        data = get_soup('elsevierlxml').parse(nest_elsevier_sections(load_fixture('elsevier'), 30))
+        section, depth = data['Sections'][1], 1
+        while isinstance(section['content'][-1], dict):
+            section, depth = section['content'][-1], depth + 1
+        self.assertEqual(depth, 30)
+        self.assertEqual(section['name'], 'Level 30')
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([3.0], 99), 3.0)
@@ -0,0 +1,66 @@
+import unittest
+
+from LimeSoup.bench.documents import make_document
+from LimeSoup.budget import Budget, BudgetExceeded, checkpoint, plain_text_paragraphs
+from LimeSoup.cache import CachedSoup, MemoryCache
+from LimeSoup.cli import parse_records
+from LimeSoup.registry import get_soup
+
+
+class TestBudget(unittest.TestCase):
+    def test_within_budget(self):
+        document = make_document('rsc')
+        budget = Budget(seconds=60, max_bytes=10 ** 8, max_nodes=10 ** 6)
+        self.assertEqual(get_soup('rsc').parse(document, budget=budget), get_soup('rsc').parse(document))
+        # The clock stops with the document.
+        checkpoint()
+
+    def test_size(self):
+        document = make_document('wiley')
+        for budget in (Budget(max_bytes=1000), Budget(max_nodes=100)):
+            data = get_soup('wiley').parse(document, budget=budget)
+            self.assertIn('Degraded', data)
+            self.assertTrue(data['Sections'][0]['content'])
+
+        with self.assertRaises(BudgetExceeded):
+            get_soup('wiley').parse(document, budget=Budget(max_bytes=1000, fallback=False))
+        with self.assertRaises(BudgetExceeded):
+            Budget(max_bytes=3).check_size('éé')
+        Budget(max_bytes=4).check_size('éé')
+
+    def test_time(self):
+        for publisher in ('wiley', 'springer', 'elsevier', 'rsc'):
+            with self.subTest(publisher=publisher):
+                data = get_soup(publisher).parse(make_document(publisher, 'medium'), budget=Budget(seconds=0.001))
+                self.assertTrue(data['Degraded'].startswith('Parsing took more than'))
+                with self.assertRaises(BudgetExceeded):
+                    get_soup(publisher).parse(make_document(publisher, 'medium'),
+                                              budget=Budget(seconds=0.001, fallback=False))
+
+    def test_plain_text_paragraphs(self):
+        data = plain_text_paragraphs(
+            b'<html><head><title>A &amp; B</title><script>x()</script></head>'
+            b'<body><h2>Intro</h2><p>One <i>two</i>\n three.</p><!-- no --><div>Four&nbsp;five</div>'
+            b'<math><mi>x</mi></math></body></html>')
+        self.assertEqual(data['Title'], 'A & B')
+        self.assertEqual(data['Sections'][0]['content'], ['Intro', 'One two three.', 'Four five'])
+
+    def test_degraded_not_cached(self):
+        cache = MemoryCache()
+        soup = CachedSoup(get_soup('rsc'), cache)
+        self.assertIn('Degraded', soup.parse(make_document('rsc'), budget=Budget(max_bytes=10)))
+        self.assertEqual(len(cache), 0)
+        soup.parse(make_document('rsc'))
+        self.assertEqual(len(cache), 1)
+
+    def test_parse_records(self):
+        records = [{'html': make_document('rsc'), 'publisher': 'rsc'},
+                   {'html': make_document('ecs')}]
+        results = list(parse_records(records, budget=Budget(max_nodes=10)))
+        self.assertEqual([x['publisher'] for x in results], ['rsc', 'ecs'])
+        for result in results:
+            self.assertIn('Degraded', result['data'])
+
+        results = list(parse_records(records, workers=2, budget=Budget(max_nodes=10, fallback=False)))
+        for result in results:
+            self.assertTrue(result['error'].startswith('BudgetExceeded'))
@@ -0,0 +1,107 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+from LimeSoup.bench.documents import make_document
+from LimeSoup.cache import CachedSoup, DirectoryCache, MemoryCache, SQLiteCache, open_cache
+from LimeSoup.cli import parse_records
+from LimeSoup.lime_soup import Soup, RuleIngredient
+from LimeSoup.registry import get_soup
+
+
+class Count(RuleIngredient):
+    calls = 0
+
+    @staticmethod
+    def _parse(html_str):
+        Count.calls += 1
+        if not html_str:
+            raise ValueError('empty document')
+        return {'Sections': [html_str]}
+
+
+def make_soup(version):
+    soup = Soup(parser_version=version)
+    soup.add_ingredient(Count())
+    return soup
+
+
+class TestCachedSoup(unittest.TestCase):
+    def setUp(self):
+        Count.calls = 0
+
+    def test_hits(self):
+        soup = CachedSoup(make_soup('1.0'), MemoryCache())
+        first = soup.parse('<p>a</p>')
+        first['Sections'].append('changed')
+        self.assertEqual(soup.parse('<p>a</p>'), {'Sections': ['<p>a</p>']})
+        self.assertEqual((soup.hits, soup.misses, Count.calls), (1, 1, 1))
+
+    def test_version_change(self):
+        cache = MemoryCache()
+        CachedSoup(make_soup('1.0'), cache).parse('<p>a</p>')
+        CachedSoup(make_soup('1.1'), cache).parse('<p>a</p>')
+        CachedSoup(make_soup('1.1'), cache).parse('<p>a</p>')
+        self.assertEqual(Count.calls, 2)
+
+    def test_errors_not_cached(self):
+        soup = CachedSoup(make_soup('1.0'), MemoryCache())
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                soup.parse('')
+        self.assertEqual(Count.calls, 2)
+
+    def test_bytes(self):
+        rsc = get_soup('rsc')
+        soup = CachedSoup(rsc, MemoryCache())
+        document = make_document('rsc')
+        expected = rsc.parse(document)
+        for _ in range(2):
+            self.assertEqual(soup.parse(document.encode('utf-8')), expected)
+            self.assertEqual(list(soup.iter_paragraphs(document.encode('utf-8'))),
+                             list(rsc.iter_paragraphs(document)))
+        self.assertEqual((soup.hits, soup.misses), (3, 1))
+
+    def test_no_version(self):
+        with self.assertRaises(ValueError):
+            CachedSoup(make_soup(None), MemoryCache())
+
+
+class TestBackends(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_memory_lru(self):
+        cache = MemoryCache(max_bytes=10)
+        cache.set('a', b'1234')
+        cache.set('b', b'1234')
+        cache.get('a')
+        cache.set('c', b'1234')
+        self.assertEqual((cache.get('a'), cache.get('b'), cache.get('c')), (b'1234', None, b'1234'))
+        self.assertEqual(cache.size, 8)
+
+    def test_disk(self):
+        for path in ['cache.sqlite', 'cache']:
+            cache = open_cache(os.path.join(self.tmp.name, path))
+            self.assertIsNone(cache.get('ab12'))
+            cache.set('ab12', b'{"a": 1}')
+            cache.set('ab12', b'{"a": 2}')
+            cache = pickle.loads(pickle.dumps(cache))
+            self.assertEqual(cache.get('ab12'), b'{"a": 2}')
+            self.assertEqual(len(cache), 1)
+            cache.clear()
+            self.assertEqual(len(cache), 0)
+        self.assertIsInstance(open_cache('x.db'), SQLiteCache)
+        self.assertIsInstance(open_cache(self.tmp.name), DirectoryCache)
+
+    def test_parse_records(self):
+        cache = DirectoryCache(self.tmp.name)
+        records = [{'publisher': 'rsc', 'html': make_document('rsc')}]
+        first = list(parse_records(records, workers=2, cache=cache))
+        self.assertIn('data', first[0])
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(list(parse_records(records, cache=cache)), first)
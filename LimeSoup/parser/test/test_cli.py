@@ -0,0 +1,115 @@
+import io
+import json
+import os
+import tarfile
+import tempfile
+import unittest
+
+from LimeSoup.bench.documents import make_document
+from LimeSoup.cli import iter_records, main, parse_records, get_soup
+
+
+class TestIterRecords(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_directory(self):
+        os.makedirs(os.path.join(self.dir, 'papers', 'b'))
+        for name in ['papers/a.html', 'papers/b/c.html']:
+            with open(os.path.join(self.dir, name), 'w') as f:
+                f.write('<p>%s</p>' % name)
+
+        records = list(iter_records(os.path.join(self.dir, 'papers')))
+        self.assertEqual([x['html'] for x in records],
+                         ['<p>papers/a.html</p>', '<p>papers/b/c.html</p>'])
+
+    def test_jsonl(self):
+        path = os.path.join(self.dir, 'records.jsonl')
+        with open(path, 'w') as f:
+            f.write(json.dumps({'doi': '10.1/a', 'publisher': 'RSC', 'html': '<p/>'}) + '\n\n')
+
+        records = list(iter_records(path))
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['doi'], '10.1/a')
+        self.assertEqual(records[0]['publisher'], 'RSC')
+
+    def test_tarball(self):
+        path = os.path.join(self.dir, 'papers.tar.gz')
+        with tarfile.open(path, 'w:gz') as tar:
+            data = b'<p>tar</p>'
+            info = tarfile.TarInfo('papers/a.html')
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+
+        self.assertEqual(list(iter_records(path)), [{'path': 'papers/a.html', 'html': '<p>tar</p>'}])
+
+    def test_corrupt_records(self):
+        os.makedirs(os.path.join(self.dir, 'papers'))
+        for name, data in [('a.html', b'<p>a</p>'), ('b.html', b'<p>\xff</p>'), ('c.html', b'<p>c</p>')]:
+            with open(os.path.join(self.dir, 'papers', name), 'wb') as f:
+                f.write(data)
+        records = list(iter_records(os.path.join(self.dir, 'papers')))
+        self.assertEqual([x.get('html') for x in records], ['<p>a</p>', None, '<p>c</p>'])
+        self.assertTrue(records[1]['error'].startswith('UnicodeDecodeError'))
+
+        path = os.path.join(self.dir, 'papers.tar.gz')
+        with tarfile.open(path, 'w:gz') as tar:
+            for name, data in [('a.html', b'<p>a</p>'), ('b.html.gz', b'not gzip'), ('c.html', b'<p>c</p>')]:
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+        records = list(iter_records(path))
+        self.assertEqual([x['path'] for x in records], ['a.html', 'b.html.gz', 'c.html'])
+        self.assertIn('error', records[1])
+
+        path = os.path.join(self.dir, 'records.jsonl')
+        with open(path, 'wb') as f:
+            f.write(b'{"html": "<p/>"}\n{"html": \n[1]\n{"doi": "10.1/a"}\n"\xff"\n'
+                    b'{"html": "<p/>"}\n')
+        records = list(iter_records(path))
+        self.assertEqual([x['path'] for x in records], [path + ':%d' % i for i in range(1, 7)])
+        self.assertEqual(['error' in x for x in records], [False, True, True, False, True, False])
+
+        # Records that cannot be read are reported along with the parsed ones.
+        results = {x['path']: x for x in parse_records(records, publisher='rsc')}
+        self.assertEqual(len(results), 6)
+        for line_number, error in [(2, 'JSONDecodeError'), (3, 'ValueError'), (4, 'KeyError'),
+                                   (5, 'UnicodeDecodeError')]:
+            self.assertTrue(results[path + ':%d' % line_number]['error'].startswith(error))
+
+
+    def test_missing_input(self):
+        missing = os.path.join(self.dir, 'missing.html')
+        missing_jsonl = os.path.join(self.dir, 'missing.jsonl.gz')
+        papers = os.path.join(self.dir, 'a.html')
+        with open(papers, 'w') as f:
+            f.write(make_document('rsc'))
+        output = os.path.join(self.dir, 'parsed.jsonl')
+        self.assertEqual(main(['parse', missing, missing_jsonl, papers, '--publisher', 'rsc', '-o', output]), 0)
+        with open(output) as f:
+            results = [json.loads(line) for line in f]
+        self.assertEqual([x['path'] for x in results], [missing, missing_jsonl, papers])
+        self.assertTrue(results[0]['error'].startswith('FileNotFoundError'))
+        self.assertTrue(results[1]['error'].startswith('FileNotFoundError'))
+        self.assertIn('data', results[2])
+
+
+class TestParseRecords(unittest.TestCase):
+    def test_unknown_publisher(self):
+        results = list(parse_records([{'doi': '10.1/a', 'html': ''}], publisher='unknown'))
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['doi'], '10.1/a')
+        self.assertTrue(results[0]['error'].startswith('ValueError'))
+
+    def test_metadata(self):
+        records = [{'publisher': 'wiley', 'html': make_document('wiley')}]
+        results = list(parse_records(records, metadata=True))
+        self.assertEqual(results[0]['data'], get_soup('wiley').parse_metadata(records[0]['html']))
+        self.assertNotIn('Sections', results[0]['data'])
+
+    def test_publisher_names(self):
+        self.assertIs(get_soup('Springer Nature'), get_soup('nature'))
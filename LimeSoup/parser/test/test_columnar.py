@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+
+from LimeSoup import columnar
+from LimeSoup.bench.documents import FIXTURES, make_document
+from LimeSoup.columnar import ColumnarReader, ColumnarWriter, flatten, unflatten
+from LimeSoup.registry import get_soup
+
+DOCUMENT = {
+    'DOI': '10.1/a',
+    'Sections': [
+        {'type': 'abstract', 'name': 'Abstract', 'content': 'Short.'},
+        'Loose paragraph.',
+        {'type': 'section_h2', 'name': 'Intro', 'content': [
+            {'type': 'section_h3', 'name': 'Empty', 'content': []},
+            'First.',
+            {'type': 'section_h3', 'name': 'Sub', 'content': ['Second.']},
+            {'type': 'section_h3', 'name': 'Next', 'content': ['Third.']},
+            'Fourth.',
+        ]},
+    ],
+}
+
+
+class TestColumnar(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_columns(self):
+        chunk = flatten([DOCUMENT])
+        self.assertEqual(chunk['paragraph_text'],
+                         ['Short.', 'Loose paragraph.', 'First.', 'Second.', 'Third.', 'Fourth.'])
+        self.assertEqual(chunk['section_name'], ['Abstract', 'Intro', 'Empty', 'Sub', 'Next'])
+        self.assertEqual(chunk['section_parent'], [-1, -1, 1, 1, 1])
+        self.assertEqual(chunk['section_depth'], [0, 0, 1, 1, 1])
+        self.assertEqual(chunk['paragraph_section'], [0, -1, 1, 3, 4, 1])
+        self.assertEqual(unflatten(chunk), [DOCUMENT])
+
+    def test_fixtures(self):
+        documents = [get_soup(publisher).parse(make_document(publisher)) for publisher in sorted(FIXTURES)]
+        self.assertEqual(unflatten(flatten(documents)), documents)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            flatten([{'Sections': [{'type': 'x', 'name': 'y', 'content': [], 'extra': 1}]}])
+        with self.assertRaises(ValueError):
+            flatten([{'Sections': [['nested list']]}])
+
+    def check_file(self, name):
+        path = os.path.join(self.tmp.name, name)
+        with ColumnarWriter(path, chunk_size=2) as writer:
+            for i in range(5):
+                writer.add(DOCUMENT, {'doi': str(i)})
+            writer.add(None, {'doi': 'failed', 'error': 'ValueError: x'})
+
+        reader = ColumnarReader(path)
+        self.assertEqual(reader.binary, '.msgpack' in path)
+        self.assertEqual(len(list(reader.chunks())), 3)
+        records = list(reader.records())
+        self.assertEqual([x['doi'] for x in records], ['0', '1', '2', '3', '4', 'failed'])
+        self.assertEqual(records[4]['data'], DOCUMENT)
+        self.assertNotIn('data', records[5])
+
+        paragraphs = list(reader.paragraphs())
+        self.assertEqual(len(paragraphs), 5 * 6)
+        self.assertEqual(paragraphs[6], (1, 'Short.', ('Abstract',)))
+        self.assertEqual(paragraphs[-3], (4, 'Second.', ('Intro', 'Sub')))
+        self.assertEqual(paragraphs[-1], (4, 'Fourth.', ('Intro',)))
+
+    def test_json_files(self):
+        self.check_file('parsed.json')
+        self.check_file('parsed.json.gz')
+
+    @unittest.skipIf(columnar.msgpack is None, 'msgpack is not installed')
+    def test_msgpack_file(self):
+        self.check_file('parsed.msgpack')
+        self.check_file('parsed.msgpack.gz')
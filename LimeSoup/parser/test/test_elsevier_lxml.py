@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+import importlib
+import unittest
+from unittest import mock
+
+from bs4 import BeautifulSoup
+
+from LimeSoup.ElsevierSoup import ElsevierSoup, ElsevierLxmlSoup, ElsevierStreamSoup
+from LimeSoup.parser.elsevier_lxml import _EntityResolvingReader, parse_lxml_document, parse_lxml_header
+from LimeSoup.parser.elsevier_xml import extract_ce_section, extract_ce_text, resolve_elsevier_entities
+
+
+class TestLxmlBackend(unittest.TestCase):
+    article = """<?xml version="1.0" encoding="UTF-8"?>
+<full-text-retrieval-response xmlns="http://www.elsevier.com/xml/svapi/article/dtd"
+    xmlns:ce="http://www.elsevier.com/xml/common/dtd" xmlns:ja="http://www.elsevier.com/xml/ja/dtd"
+    xmlns:mml="http://www.w3.org/1998/Math/MathML" xmlns:xocs="http://www.elsevier.com/xml/xocs/dtd"
+    xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:prism="http://prismstandard.org/namespaces/basic/2.0/">
+<coredata><prism:publicationName>Journal</prism:publicationName></coredata>
+<originalText><xocs:doc><xocs:meta><xocs:doi>10.1016/j.test.2020.01.001</xocs:doi></xocs:meta>
+<ja:article><ja:head><ce:title>LiFePO<ce:inf>4</ce:inf> &amp; more</ce:title>
+<ce:keywords><ce:keyword><ce:text>Sol&ndash;gel</ce:text></ce:keyword></ce:keywords>
+<ce:abstract><ce:section-title>Abstract</ce:section-title><ce:abstract-sec>
+<ce:simple-para>Heated at 700&deg;C for 5&nbsp;h.</ce:simple-para></ce:abstract-sec></ce:abstract></ja:head>
+<ja:body><ce:sections><ce:section id="s1"><ce:label>1</ce:label><ce:section-title>Introduction</ce:section-title>
+<ce:para>Iron phosphate <ce:cross-ref refid="bib1">[1]</ce:cross-ref> in <ce:cross-ref refid="fig1">Fig. 1</ce:cross-ref>
+and <mml:math><mml:mi>E</mml:mi><!-- energy --><mml:mo>=</mml:mo></mml:math> &lt; 5.</ce:para>
+<ce:para>A list<ce:list><ce:list-item><ce:label>&bull;</ce:label><ce:para>one</ce:para></ce:list-item></ce:list></ce:para>
+</ce:section></ce:sections></ja:body></ja:article></xocs:doc></originalText></full-text-retrieval-response>"""
+
+    def test_same_output(self):
+        self.assertEqual(ElsevierLxmlSoup.parse(self.article), ElsevierSoup.parse(self.article))
+
+    def test_grammar_on_lxml_nodes(self):
+        xml_string = """<root xmlns:ce="http://www.elsevier.com/xml/common/dtd">
+        <ce:section id="s1"><ce:section-title>Photodamage</ce:section-title>
+        <ce:para>Sunlight <!-- comment --><ce:italic>coupled</ce:italic>
+        <ce:cross-ref refid="bib05">[1]</ce:cross-ref></ce:para></ce:section>
+        </root>"""
+
+        for soup in (BeautifulSoup(xml_string, 'lxml-xml'), parse_lxml_document(xml_string)):
+            self.assertEqual(extract_ce_section(soup.find('ce:section')), {
+                'type': 'ce_section',
+                'name': 'Photodamage',
+                'content': ['Sunlight comment coupled']
+            })
+
+    def test_error_on_unknown_tag(self):
+        xml_string = '<root xmlns:ce="http://www.elsevier.com/xml/common/dtd">' \
+                     '<ce:text>a<ce:unknown>b</ce:unknown></ce:text></root>'
+
+        with self.assertRaises(NameError):
+            extract_ce_text(parse_lxml_document(xml_string).find('ce:text'))
+
+    def test_error_message(self):
+        # Inherited namespaces are not repeated in the markup of the node.
+        xml_string = '<root xmlns="http://www.elsevier.com/xml/svapi/article/dtd" ' \
+                     'xmlns:ce="http://www.elsevier.com/xml/common/dtd" xmlns:xlink="http://www.w3.org/1999/xlink">' \
+                     '<ce:text>a<ce:unknown xlink:href="x" id="u1">b &amp; c</ce:unknown></ce:text></root>'
+
+        messages = []
+        for soup in (BeautifulSoup(xml_string, 'lxml-xml'), parse_lxml_document(xml_string)):
+            with self.assertRaises(NameError) as context:
+                extract_ce_text(soup.find('ce:text'))
+            messages.append(str(context.exception))
+        self.assertIn("'<ce:unknown id=\"u1\" xlink:href=\"x\">b &amp; c</ce:u'", messages[0])
+        self.assertEqual(messages[1], messages[0])
+
+    def test_markup(self):
+        xml_string = resolve_elsevier_entities(self.article)
+        tags = BeautifulSoup(xml_string, 'lxml-xml').find_all(True)
+        self.assertEqual([str(tag) for tag in parse_lxml_document(xml_string).find_all()],
+                         [str(tag) for tag in tags])
+
+    def test_streaming_size(self):
+        # Over STREAMING_SIZE, the error of the body is raised before the
+        # error of the head.
+        article = self.article.replace('<ce:text>Sol', '<ce:text><ce:head-error/>Sol', 1).replace(
+            '<ce:para>Iron', '<ce:para><ce:body-error/>Iron', 1)
+        module = importlib.import_module('LimeSoup.ElsevierSoup')
+        for soup in (ElsevierSoup, ElsevierLxmlSoup):
+            with mock.patch.object(module, 'STREAMING_SIZE', len(article)):
+                with self.assertRaisesRegex(NameError, 'head-error'):
+                    soup.parse(article)
+            with mock.patch.object(module, 'STREAMING_SIZE', len(article) - 1):
+                with self.assertRaisesRegex(NameError, 'body-error'):
+                    soup.parse(article)
+
+    def test_header(self):
+        header = parse_lxml_header(self.article)
+        self.assertEqual(header.find('xocs:doi').get_text(), '10.1016/j.test.2020.01.001')
+        self.assertEqual(header.find('ce:text').get_text(), 'Sol\u2013gel')
+        self.assertIsNone(header.find('body'))
+        self.assertIsNone(header.find('ce:sections'))
+        self.assertEqual(ElsevierSoup.parse_metadata(self.article),
+                         {key: value for key, value in ElsevierSoup.parse(self.article).items() if key != 'Sections'})
+
+    def test_entities_across_chunks(self):
+        for size in range(1, 40):
+            reader = _EntityResolvingReader(self.article)
+            chunks = iter(lambda: reader.read(size), b'')
+            self.assertEqual(b''.join(chunks).decode('utf-8'), resolve_elsevier_entities(self.article))
+
+    def test_stream(self):
+        article = self.article.replace(
+            '<ja:head>', '<ce:floats><ce:figure id="fig1"><ce:caption><ce:simple-para>Figure</ce:simple-para>'
+                         '</ce:caption></ce:figure></ce:floats><ja:head>', 1).replace(
+            '</ja:body>', '</ja:body><ja:tail><ce:bibliography><ce:section-title>References</ce:section-title>'
+                          '</ce:bibliography></ja:tail>', 1).replace(
+            '</ce:section></ce:sections>', '</ce:section><ce:para>Last &amp; least.</ce:para></ce:sections>', 1)
+        self.assertEqual(ElsevierStreamSoup.parse(article), ElsevierSoup.parse(article))
+        self.assertEqual(ElsevierStreamSoup.parse(self.article), ElsevierSoup.parse(self.article))
+
+        # LimeSoup.ElsevierSoup is the Soup, see LimeSoup/__init__.py.
+        module = importlib.import_module('LimeSoup.ElsevierSoup')
+        with mock.patch.object(module, 'STREAMING_SIZE', 10), \
+                mock.patch.object(module.ElsevierXMLSoup, 'parse', side_effect=AssertionError):
+            self.assertEqual(ElsevierSoup.parse(article), ElsevierStreamSoup.parse(article))
@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 import unittest
 
-from LimeSoup.parser.elsevier_xml import extract_ce_text, resolve_elsevier_entities, extract_ce_section
+from LimeSoup.parser.elsevier_xml import extract_ce_text, resolve_elsevier_entities, extract_ce_section, \
+    XMLSyntaxWarning, Alternatives, accepts, extract_ce_para
 from bs4 import BeautifulSoup
 
 
@@ -33,6 +34,17 @@ class TestExtractCEText(unittest.TestCase):
         text = extract_ce_text(tag)
         self.assertEqual(text, '┆ ◻ ⊨ 𝓇 ј')
 
+    def test_entities_stay_well_formed(self):
+        xml_string = """<root xmlns:ce="http://www.elsevier.com/xml/common/dtd">
+            <ce:text id="&quot;&lt;&amp;">a &lt; b &amp; &unknown; c</ce:text>
+        </root>"""
+
+        with self.assertWarns(XMLSyntaxWarning):
+            resolved = resolve_elsevier_entities(xml_string)
+        tag = BeautifulSoup(resolved, 'xml').find('ce:text')
+        self.assertEqual(tag['id'], '"<&')
+        self.assertEqual(extract_ce_text(tag), 'a < b & c')
+
     def test_space(self):
         xml_string = """<root xmlns:ce="http://www.elsevier.com/xml/common/dtd">
             <ce:text>Sub-2<ce:hsp sp="0.25"/>μm core–shell particles</ce:text>
@@ -73,3 +85,19 @@ class TestExtractSection(unittest.TestCase):
             'name': 'Photodamage',
             'content': ['Sunlight coupled']
         })
+
+
+class TestDispatch(unittest.TestCase):
+    def test_unknown_node(self):
+        xml_string = '<root xmlns:ce="http://www.elsevier.com/xml/common/dtd">' \
+                     '<ce:para>Text <ce:unknown>x</ce:unknown></ce:para></root>'
+
+        tag = BeautifulSoup(xml_string, 'xml').find('ce:para')
+        with self.assertRaisesRegex(NameError, r"Failed to match node \('ce', 'unknown', '<ce:unknown>x</ce:unknown>'\)"):
+            extract_ce_para(tag)
+
+    def test_ambiguous_rules(self):
+        first = accepts('ce:para')(lambda node: 'first')
+        second = accepts('*:para')(lambda node: 'second')
+        with self.assertRaises(ValueError):
+            Alternatives((first, second))
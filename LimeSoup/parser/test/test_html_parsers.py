@@ -0,0 +1,65 @@
+import threading
+import unittest
+
+import bs4.builder
+
+from LimeSoup.bench.documents import make_document
+from LimeSoup.cache import CachedSoup, MemoryCache
+from LimeSoup.RSCSoup import RSCParseHTML
+from LimeSoup.registry import HTML_PARSERS, fastest_html_parser, get_soup
+
+
+class TestHTMLParsers(unittest.TestCase):
+    def test_html_parsers(self):
+        # Every builder listed for a publisher gives the same results as html.parser.
+        for publisher, html_parsers in sorted(HTML_PARSERS.items()):
+            if publisher == 'elsevier':
+                continue
+            for size in ('small', 'medium'):
+                document = make_document(publisher, size)
+                expected = get_soup(publisher).parse(document)
+                for html_parser in html_parsers:
+                    if bs4.builder.builder_registry.lookup(html_parser) is None:
+                        continue
+                    with self.subTest(publisher=publisher, size=size, html_parser=html_parser):
+                        self.assertEqual(get_soup(publisher, html_parser=html_parser).parse(document), expected)
+
+    def test_iter_paragraphs(self):
+        if bs4.builder.builder_registry.lookup('lxml') is None:
+            self.skipTest('lxml is not installed')
+        document = make_document('rsc')
+        self.assertEqual(list(get_soup('rsc', html_parser='lxml').iter_paragraphs(document)),
+                         list(get_soup('rsc').iter_paragraphs(document)))
+
+    def test_threads(self):
+        # The builder is handed to the ingredients, soups with different
+        # builders do not see each other's in other threads.
+        if bs4.builder.builder_registry.lookup('lxml') is None:
+            self.skipTest('lxml is not installed')
+        document = make_document('rsc')
+        parser_types = {}
+
+        def parse(html_parser):
+            parser_types[html_parser] = RSCParseHTML().parse(document, html_parser).parser_type
+
+        threads = [threading.Thread(target=parse, args=(html_parser,)) for html_parser in ('html.parser', 'lxml')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(parser_types, {'html.parser': 'html.parser', 'lxml': 'lxml'})
+
+    def test_get_soup(self):
+        self.assertEqual(get_soup('rsc').html_parser, 'html.parser')
+        self.assertEqual(get_soup('wiley', html_parser='fastest').html_parser, 'html.parser')
+        self.assertEqual(get_soup('rsc', html_parser='fastest').html_parser, fastest_html_parser('rsc'))
+        self.assertEqual(fastest_html_parser('aip'), 'html.parser')
+        with self.assertRaises(ValueError):
+            get_soup('rsc', html_parser='nope')
+
+    def test_cache_name(self):
+        soup = get_soup('rsc')
+        name = CachedSoup(soup, MemoryCache()).name
+        if bs4.builder.builder_registry.lookup('lxml') is None:
+            self.skipTest('lxml is not installed')
+        self.assertEqual(CachedSoup(soup.with_html_parser('lxml'), MemoryCache()).name, name + '+lxml')
@@ -0,0 +1,77 @@
+import json
+import unittest
+from unittest import mock
+
+from LimeSoup import instrumentation, lime_soup
+from LimeSoup.ElsevierSoup import ElsevierSoup, ElsevierLxmlSoup, ElsevierStreamSoup
+from LimeSoup.instrumentation import instrument, PipelineMetrics, soup_label
+from LimeSoup.lime_soup import Soup, RuleIngredient
+from LimeSoup.RSCSoup import RSCSoup
+
+
+class Strip(RuleIngredient):
+    @staticmethod
+    def _parse(html_str):
+        return html_str.strip()
+
+
+class Check(RuleIngredient):
+    @staticmethod
+    def _parse(html_str):
+        if not html_str:
+            raise ValueError('empty document')
+        return {'text': html_str}
+
+
+TestSoup = Soup(parser_version='test')
+TestSoup.add_ingredient(Strip())
+TestSoup.add_ingredient(Check())
+
+
+class TestInstrumentation(unittest.TestCase):
+    def test_stages(self):
+        with instrument() as metrics:
+            TestSoup.parse(' a ')
+            with self.assertRaises(ValueError):
+                TestSoup.parse(' ')
+        self.assertIsNone(lime_soup._instrumentation)
+
+        self.assertEqual(len(metrics.documents), 2)
+        self.assertEqual([(x.publisher, x.ingredient, x.error) for x in metrics.last_document], [
+            ('test_instrumentation', 'Strip', None),
+            ('test_instrumentation', 'Check', 'ValueError'),
+        ])
+        if instrumentation.PEAK_MEMORY:
+            self.assertTrue(all(x.peak_memory is not None for x in metrics.last_document))
+
+        stages = json.loads(metrics.to_json())['stages']
+        self.assertEqual([(x['ingredient'], x['wall_time']['count'], x['errors']) for x in stages],
+                         [('Check', 2, 1), ('Strip', 2, 0)])
+
+    def test_no_peak_memory(self):
+        # Without tracemalloc.reset_peak(), before Python 3.9.
+        with mock.patch.object(instrumentation, 'PEAK_MEMORY', False):
+            with instrument() as metrics:
+                TestSoup.parse('a')
+        self.assertFalse(metrics.trace_memory)
+        self.assertTrue(all(x.peak_memory is None for x in metrics.last_document))
+        self.assertNotIn('peak_memory', metrics.to_prometheus())
+
+    def test_prometheus(self):
+        with instrument(PipelineMetrics(trace_memory=False)) as metrics:
+            TestSoup.parse('a')
+
+        text = metrics.to_prometheus()
+        self.assertIn('# TYPE limesoup_stage_wall_seconds histogram', text)
+        self.assertIn('limesoup_stage_wall_seconds_count{publisher="test_instrumentation",ingredient="Strip"} 1',
+                      text)
+        self.assertIn('limesoup_stage_errors_total{publisher="test_instrumentation",ingredient="Check"} 0', text)
+        self.assertNotIn('peak_memory', text)
+
+    def test_soup_label(self):
+        self.assertEqual(soup_label(TestSoup), 'test_instrumentation')
+        self.assertEqual(soup_label(RSCSoup), 'RSCSoup')
+        # Backends of one module have their own histograms.
+        self.assertEqual([soup_label(soup) for soup in (ElsevierSoup, ElsevierLxmlSoup, ElsevierStreamSoup)],
+                         ['ElsevierSoup', 'ElsevierLxmlSoup', 'ElsevierStreamSoup'])
+        self.assertEqual(soup_label(ElsevierLxmlSoup.with_html_parser('lxml')), 'ElsevierLxmlSoup')
@@ -0,0 +1,88 @@
+import unittest
+
+from LimeSoup.bench.documents import FIXTURES, make_document
+from LimeSoup.lime_soup import Soup, RuleIngredient, iter_sections
+from LimeSoup.registry import get_soup
+
+
+class UpperCase(RuleIngredient):
+    @staticmethod
+    def _parse(html_str):
+        if not html_str:
+            raise ValueError('empty document')
+        return html_str.upper()
+
+
+UpperSoup = Soup(parser_version='test')
+UpperSoup.add_ingredient(UpperCase())
+
+
+class UnpicklableError(Exception):
+    def __init__(self, message, code):
+        super(UnpicklableError, self).__init__(message)
+        self.code = code
+
+
+class RaiseUnpicklable(RuleIngredient):
+    @staticmethod
+    def _parse(html_str):
+        if html_str == 'bad':
+            # Cannot be rebuilt from its args, like lxml's XMLSyntaxError.
+            raise UnpicklableError('cannot parse', 1)
+        return html_str
+
+
+UnpicklableSoup = Soup(parser_version='test')
+UnpicklableSoup.add_ingredient(RaiseUnpicklable())
+
+
+class TestParseMany(unittest.TestCase):
+    documents = ['a', 'b', '', 'c', 'd']
+
+    def check(self, results):
+        results = sorted(results, key=lambda x: x.index)
+        self.assertEqual([x.index for x in results], [0, 1, 2, 3, 4])
+        self.assertEqual([x.data for x in results], ['A', 'B', None, 'C', 'D'])
+        self.assertIsInstance(results[2].error, ValueError)
+        self.assertTrue(all(x.error is None for i, x in enumerate(results) if i != 2))
+
+    def test_in_process(self):
+        self.check(UpperSoup.parse_many(self.documents, workers=1))
+
+    def test_ordered(self):
+        results = list(UpperSoup.parse_many(self.documents, workers=2, chunksize=2))
+        self.assertEqual([x.index for x in results], [0, 1, 2, 3, 4])
+        self.check(results)
+
+    def test_unordered(self):
+        self.check(UpperSoup.parse_many(iter(self.documents), workers=2, ordered=False))
+
+    def test_unpicklable_error(self):
+        for ordered in (True, False):
+            results = sorted(UnpicklableSoup.parse_many(['a', 'bad', 'c'], workers=2, ordered=ordered),
+                             key=lambda x: x.index)
+            self.assertEqual([x.data for x in results], ['a', None, 'c'])
+            self.assertIsInstance(results[1].error, RuntimeError)
+            self.assertEqual(str(results[1].error), 'UnpicklableError: cannot parse')
+
+
+class TestIterParagraphs(unittest.TestCase):
+    def test_fixtures(self):
+        for publisher in FIXTURES:
+            with self.subTest(publisher=publisher):
+                soup = get_soup(publisher)
+                sections = soup.parse(make_document(publisher))['Sections']
+                self.assertEqual(list(soup.iter_paragraphs(make_document(publisher))),
+                                 list(iter_sections(sections)))
+
+    def test_iter_sections(self):
+        sections = [{'type': 'abstract', 'name': 'Abstract', 'content': 'Short.'},
+                    'Loose.',
+                    {'type': 'section_h2', 'name': 'A', 'content': [
+                        {'type': 'section_h3', 'name': 'B', 'content': ['b']}, 'a']}]
+        self.assertEqual(list(iter_sections(sections)),
+                         [(('Abstract',), 'Short.'), ((), 'Loose.'), (('A', 'B'), 'b'), (('A',), 'a')])
+
+    def test_no_ingredient(self):
+        with self.assertRaises(ValueError):
+            Soup(parser_version=None).iter_paragraphs('')
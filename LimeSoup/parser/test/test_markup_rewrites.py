@@ -0,0 +1,20 @@
+import unittest
+
+from LimeSoup.IOPSoup import IOPRemoveTrash
+from LimeSoup.SpringerNatureSoup import SpringerNatureRemoveTagsSmallSub
+
+CITATION = '[<a data-track="click" data-track-action="reference anchor" href="#ref-%s">%s</a>]'
+
+
+class TestMarkupRewrites(unittest.TestCase):
+    def test_springernature(self):
+        parser = SpringerNatureRemoveTagsSmallSub._parse(
+            '<article><p>1\xa0mm and 2 K %s, x<sup>%s3</sup> y<sup>−1</sup> z<sup>a</sup></p></article>' % (
+                CITATION % ('1', '1\xa0'), CITATION % ('2', '2')))
+        self.assertEqual(str(parser.soup.article), '<article><p>1 mm and 2 K , x^3 y^−1 za</p></article>')
+
+    def test_iop(self):
+        parser = IOPRemoveTrash._parse(
+            '<?xml version="1.0"?><article><title/><p>a [<xref ref-type="bibr" rid="b1">1</xref>] '
+            'b<sup><xref ref-type="bibr" rid="b2">2</xref>3</sup><?google <i>c</i>?></p></article>')
+        self.assertEqual(str(parser.soup), '<article><p>a  b^3<i>c</i></p></article>')
@@ -0,0 +1,42 @@
+import re
+import unittest
+
+from LimeSoup.bench.documents import make_document
+from LimeSoup.registry import get_soup
+
+
+class TestParseMetadata(unittest.TestCase):
+    def test_same_as_parse(self):
+        # Soups with a metadata pipeline, then Soups parsing the whole document.
+        for publisher in ('springernature', 'wiley', 'elsevier', 'elsevierlxml', 'elsevierstream', 'rsc', 'acs'):
+            for size in ('small', 'medium'):
+                with self.subTest(publisher=publisher, size=size):
+                    document = make_document(publisher, size)
+                    soup = get_soup(publisher)
+                    data = soup.parse(document)
+                    del data['Sections']
+                    self.assertEqual(soup.parse_metadata(document), data)
+
+    def test_body_is_not_parsed(self):
+        broken = '<div data-article-body="true"><p>never closed'
+        document = make_document('springernature').replace('<body>', '<body>' + broken, 1)
+        self.assertEqual(get_soup('springernature').parse_metadata(document)['DOI'],
+                         get_soup('springernature').parse_metadata(make_document('springernature'))['DOI'])
+
+        # Only the elements before <ja:body> are read.
+        document = make_document('elsevier').replace('<ce:para>', '<ce:para><ce:unknown/>', 1)
+        with self.assertRaises(NameError):
+            get_soup('elsevier').parse(document)
+        self.assertEqual(get_soup('elsevier').parse_metadata(document)['Journal'], 'Journal of Testing')
+
+    def test_meta_in_body(self):
+        # Tree builders put <meta> tags of broken pages in <body>.
+        for publisher in ('springernature', 'wiley'):
+            with self.subTest(publisher=publisher):
+                document = make_document(publisher)
+                meta = re.search(r'<meta name="citation_doi"[^>]*>', document).group(0)
+                moved = document.replace(meta, '', 1).replace('<body>', '<body>' + meta, 1)
+                soup = get_soup(publisher)
+                self.assertEqual(soup.parse(moved)['DOI'], soup.parse(document)['DOI'])
+                self.assertEqual(soup.parse_metadata(moved)['DOI'], soup.parse(document)['DOI'])
+                self.assertIsNone(soup.parse(document.replace(meta, '', 1))['DOI'])
@@ -0,0 +1,44 @@
+import json
+import subprocess
+import sys
+import unittest
+
+import LimeSoup
+from LimeSoup.lime_soup import Soup
+
+
+def loaded_modules(code):
+    """
+    :return: LimeSoup modules imported by code, in a new interpreter.
+    """
+    script = code + '\nimport json, sys\nprint(json.dumps(sorted(m for m in sys.modules if m.startswith("LimeSoup"))))'
+    output = subprocess.check_output([sys.executable, '-c', script], universal_newlines=True)
+    return json.loads(output.splitlines()[-1])
+
+
+class TestLazyPackage(unittest.TestCase):
+    def test_import_loads_no_soup(self):
+        self.assertEqual(loaded_modules('import LimeSoup'), ['LimeSoup'])
+
+    def test_import_one_soup(self):
+        modules = loaded_modules('from LimeSoup import RSCSoup')
+        self.assertIn('LimeSoup.RSCSoup', modules)
+        for name in LimeSoup._SOUPS:
+            if name != 'RSCSoup':
+                self.assertNotIn('LimeSoup.' + name, modules)
+
+    def test_attributes_are_soups(self):
+        import LimeSoup.IOPSoup
+        from LimeSoup.IOPSoup import IOPSoup
+        self.assertIs(LimeSoup.IOPSoup, IOPSoup)
+        for name in LimeSoup._SOUPS:
+            self.assertIsInstance(getattr(LimeSoup, name), Soup, name)
+        self.assertEqual(set(LimeSoup.__all__) - set(dir(LimeSoup)), set())
+
+    def test_parse_auto(self):
+        self.assertIn('parse_auto', LimeSoup.__all__)
+        self.assertEqual(loaded_modules('from LimeSoup import parse_auto'), ['LimeSoup', 'LimeSoup.registry'])
+
+    def test_unknown_attribute(self):
+        with self.assertRaises(AttributeError):
+            LimeSoup.IOPSoup_old
@@ -1,8 +1,10 @@
+import re
 import unittest
 
 from bs4 import BeautifulSoup
 
-from LimeSoup.parser.paragraphs import get_tag_text, INLINE_TAGS, LINEBREAK_ELEMENTS, NON_DISPLAY_TAGS
+from LimeSoup.parser.paragraphs import get_tag_text, extract_paragraphs_recursive, iter_paragraphs, \
+    INLINE_TAGS, LINEBREAK_ELEMENTS, NON_DISPLAY_TAGS
 
 
 class HTMLTagText(unittest.TestCase):
@@ -49,3 +51,54 @@ class TestTagText(unittest.TestCase):
             ),
             'Test1\nTest2'
         )
+
+
+class TestExtractParagraphs(unittest.TestCase):
+    html = '<div>Preface<h2>Intro</h2><p>First <i>one</i>.</p><p>Second.</p>' \
+           '<h3>Details</h3><p>Third.</p><h2>Acknowledgements</h2><p>Thanks.</p>' \
+           '<h2>Intro</h2><p>Fourth.</p></div>'
+
+    def test_hierarchy(self):
+        self.assertEqual(
+            extract_paragraphs_recursive(BeautifulSoup(self.html, 'html.parser')),
+            [
+                'Preface',
+                {'type': 'section_h2', 'name': 'Intro', 'content': [
+                    'First one.',
+                    'Second.',
+                    {'type': 'section_h3', 'name': 'Details', 'content': ['Third.']},
+                ]},
+                {'type': 'section_h2', 'name': 'Acknowledgements', 'content': ['Thanks.']},
+                {'type': 'section_h2', 'name': 'Intro', 'content': ['Fourth.']},
+            ]
+        )
+
+    def test_exclude_sections(self):
+        sections = extract_paragraphs_recursive(
+            BeautifulSoup(self.html, 'html.parser'),
+            exclude_section_rules=[re.compile(r'.*?acknowledge?ment.*?', re.IGNORECASE)])
+        self.assertEqual([x['name'] for x in sections[1:]], ['Intro'])
+        self.assertNotIn('Thanks.', str(sections))
+
+    def test_iter_paragraphs(self):
+        self.assertEqual(
+            list(iter_paragraphs(BeautifulSoup(self.html, 'html.parser'),
+                                 exclude_section_rules=[re.compile(r'.*?acknowledge?ment.*?', re.IGNORECASE)])),
+            [
+                ((), 'Preface'),
+                (('Intro',), 'First one.'),
+                (('Intro',), 'Second.'),
+                (('Intro', 'Details'), 'Third.'),
+                (('Intro',), 'Fourth.'),
+            ]
+        )
+
+    def test_iter_paragraphs_streams(self):
+        soup = BeautifulSoup(self.html, 'html.parser')
+        # Walking the last paragraph would fail.
+        soup.find_all('p')[-1].contents = None
+        paragraphs = iter_paragraphs(soup)
+        self.assertEqual(next(paragraphs), ((), 'Preface'))
+        self.assertEqual(next(paragraphs), (('Intro',), 'First one.'))
+        with self.assertRaises(TypeError):
+            list(paragraphs)
@@ -0,0 +1,85 @@
+import importlib
+import os
+import tempfile
+import unittest
+
+from LimeSoup.parser.parser_paper_base import ParserPaperBase
+
+VARIANTS = ['parser_paper', 'parser_paper_acs', 'parser_paper_aps', 'parser_paper_IOP',
+            'parser_paper_springer', 'parser_paper_wiley']
+
+
+def parser_class(variant):
+    return importlib.import_module('LimeSoup.parser.' + variant).ParserPaper
+
+
+class TestParserPaperBase(unittest.TestCase):
+    def test_variants_share_the_core(self):
+        for variant in VARIANTS:
+            cls = parser_class(variant)
+            self.assertTrue(issubclass(cls, ParserPaperBase), variant)
+            for name in ('remove_tags', 'strip_tags', 'rename_tag', 'apply_rules', 'get'):
+                self.assertIs(getattr(cls, name), getattr(ParserPaperBase, name), (variant, name))
+
+    def test_heading_sections(self):
+        parser = parser_class('parser_paper_springer')(
+            '<body><h2>A</h2><p>a</p><h5>B</h5><p>b</p></body>', parser_type='html.parser')
+        parser.create_tag_sections()
+        self.assertEqual(str(parser.soup), '<body><section_h2><h2>A</h2><p>a</p><section_h5><h5>B</h5>'
+                                           '<p>b</p></section_h5></section_h2></body>')
+
+    def test_explicit_sections(self):
+        xml = '<body><sec><id>2-1</id><title>T</title></sec></body>'
+        for variant, level in (('parser_paper_acs', 2), ('parser_paper_IOP', 3)):
+            parser = parser_class(variant)(xml, parser_type='html.parser')
+            parser.create_tag_sections()
+            self.assertIsNotNone(parser.soup.find('section_h%d' % level), variant)
+
+    def test_paragraphs_inside_tag(self):
+        html = '<div id="b"><p>one</p><p>two</p><section_h2><h2>S</h2></section_h2><p>three</p></div>'
+        parser = parser_class('parser_paper')(html, parser_type='html.parser')
+        parser.create_tag_to_paragraphs_inside_tag({'name': 'div'}, 'h2')
+        self.assertEqual(str(parser.soup), '<div id="b"><section_h2><p>one</p><p>two</p></section_h2>'
+                                           '<section_h2><h2>S</h2></section_h2><p>three</p></div>')
+
+        parser = parser_class('parser_paper_IOP')(html, parser_type='html.parser')
+        parser.create_tag_to_paragraphs_inside_tag({'name': 'div'}, 'h2', name_section='')
+        self.assertEqual(parser.soup.section_h2.h2.get_text(), '')
+
+    def test_keywords(self):
+        html = '<div><kwd>\nalloy \n</kwd><kwd>oxide</kwd></div>'
+        parser = parser_class('parser_paper_acs')(html, parser_type='html.parser')
+        self.assertEqual(parser.get_keywords([{'name': 'kwd'}]), ['alloy ', 'oxide'])
+        parser = parser_class('parser_paper')(html, parser_type='html.parser')
+        self.assertEqual(parser.get_keywords([{'name': 'kwd'}]), ['alloy', 'oxide'])
+        self.assertIsNone(parser.soup.find('kwd'))
+
+    def test_meta(self):
+        html = ('<html><head><meta name="doi" content=" 10.1/a "><meta name="kw">'
+                '<meta name="kw" content="a"><meta name="kw" content="b"><meta property="og:title" content="t">'
+                '</head><body><meta name="doi" content="10.1/b"></body></html>')
+        parser = parser_class('parser_paper')(html, parser_type='html.parser')
+        self.assertEqual([tag.get('content') for tag in parser.meta_tags('kw')], [None, 'a', 'b'])
+        self.assertEqual(parser.extract_first_meta('title', 'doi'), '10.1/a')
+        # Not in <head> any more, found in <body>.
+        self.assertEqual(parser.extract_first_meta('doi'), '10.1/b')
+        self.assertIsNone(parser.extract_first_meta('doi'))
+        self.assertEqual(parser.extract_first_meta('kw'), 'a')
+        self.assertEqual(parser.extract_meta('kw', 'doi'), ['b'])
+        self.assertEqual(parser.meta_tags('kw'), [])
+        self.assertEqual(len(parser.soup.find_all('meta')), 1)
+
+    def test_meta_in_body(self):
+        html = ('<html><head><meta name="description" content="d"></head>'
+                '<body><meta name="citation_doi" content="10.1/b"><p>a</p></body></html>')
+        parser = parser_class('parser_paper')(html, parser_type='html.parser')
+        self.assertEqual([tag.get('content') for tag in parser.meta_tags('citation_doi')], ['10.1/b'])
+        self.assertEqual([tag.get('content') for tag in parser.meta_tags('description')], ['d'])
+
+    def test_save_soup_to_file(self):
+        parser = parser_class('parser_paper_aps')('<body><p>a</p></body>', parser_type='html.parser')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'soup.xml')
+            parser.save_soup_to_file(path, prettify=False)
+            with open(path, encoding='utf-8') as f:
+                self.assertEqual(f.read(), '<body><p>a</p></body>\n')
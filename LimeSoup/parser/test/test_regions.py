@@ -0,0 +1,61 @@
+import unittest
+
+import bs4
+
+from LimeSoup.bench.documents import make_document
+from LimeSoup.parser.regions import extract_region, find_region, keep_only
+from LimeSoup.registry import get_soup
+
+BOILERPLATE = ('<nav><div class="fulltext">menu</div></nav><!-- <div class="fulltext-view"> -->'
+               '<script>document.write("<article>");</script>')
+
+
+class TestRegions(unittest.TestCase):
+    def test_find_region(self):
+        markup = ('<!-- <article> --><script>var a = "<article>";</script>'
+                  '<div><article id="a"><div><article>x</article></div><br></article></div>')
+        start, end = find_region(markup, 'article')
+        self.assertEqual(markup[start:end], '<article id="a"><div><article>x</article></div><br></article>')
+        self.assertIsNone(find_region(markup, 'section'))
+
+    def test_attributes(self):
+        markup = ('<div data-article-body="false">a</div>'
+                  '<div title="a > b" class="c-article fulltext-view" data-article-body=true>b</div>')
+        for attrs in ({'class': 'fulltext-view'}, {'data-article-body': 'true'}):
+            start, end = find_region(markup, attrs=attrs)
+            self.assertTrue(markup[start:end].endswith('>b</div>'))
+        self.assertIsNone(find_region(markup, 'p', attrs={'class': 'fulltext-view'}))
+
+    def test_unclosed(self):
+        # The end tag of the element around closes the container, as in html.parser.
+        markup = '<section><article><p>a</p></section><p>b</p>'
+        self.assertEqual(extract_region(markup, 'article'), '<article><p>a</p>')
+        self.assertEqual(extract_region('<article><p>a', 'article'), '<article><p>a')
+        self.assertEqual(extract_region('<article/><p>a</p>', 'article'), '<article/>')
+
+    def test_keep(self):
+        markup = ('<head><meta name="a" content="1"><title>t</title></head>'
+                  '<body><article><meta name="b"><p>x</p></article><meta name="c"></body>')
+        self.assertEqual(extract_region(markup, 'article', keep=('meta',)),
+                         '<meta name="a" content="1"><article><meta name="b"><p>x</p></article><meta name="c">')
+        self.assertEqual(extract_region(markup, 'article', keep=('meta',), head=True),
+                         '<head><meta name="a" content="1"><meta name="c"></head><article><meta name="b"><p>x</p></article>')
+
+    def test_keep_only(self):
+        soup = bs4.BeautifulSoup('<p>a</p><div>b<span>c</span>d<i>e</i></div>', 'html.parser')
+        for span in soup.find_all('span'):
+            span.extract()
+        keep_only(soup, soup.div)
+        self.assertEqual(soup.div.contents, ['bd', soup.i])
+        self.assertEqual(str(soup), '<div>bd<i>e</i></div>')
+
+    def test_boilerplate(self):
+        for publisher in ('springernature', 'ecs'):
+            with self.subTest(publisher=publisher):
+                document = make_document(publisher)
+                padded = document.replace('<body>', '<body>' + BOILERPLATE, 1).replace(
+                    '</body>', BOILERPLATE + '</body>', 1)
+                self.assertEqual(get_soup(publisher).parse(padded), get_soup(publisher).parse(document))
+
+        with self.assertRaises(ValueError):
+            get_soup('springernature').parse('<html><body><p>x</p></body></html>')
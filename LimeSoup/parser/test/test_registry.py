@@ -0,0 +1,54 @@
+import unittest
+
+from LimeSoup.bench.documents import FIXTURES, make_document
+from LimeSoup.cli import parse_records
+from LimeSoup.registry import SOUPS, detect_publisher, get_soup, parse_auto, sniff
+
+
+class TestDetectPublisher(unittest.TestCase):
+    def test_fixtures(self):
+        for publisher in FIXTURES:
+            with self.subTest(publisher=publisher):
+                expected = 'elsevier' if publisher in ('elsevierlxml', 'elsevierstream') else publisher
+                document = make_document(publisher)
+                self.assertEqual(detect_publisher(document), expected)
+                self.assertEqual(detect_publisher(document.encode('utf-8')), expected)
+
+    def test_registered_soups(self):
+        for publisher in SOUPS:
+            self.assertIsNotNone(get_soup(publisher))
+
+    def test_sniff(self):
+        signatures = sniff('<?xml version="1.0"?>\n<!-- x -->\n<article xmlns="urn:a">'
+                           '<article-id pub-id-type="doi">10.1103/X.1</article-id>'
+                           '<ref>doi:10.1021/Y.2</ref></article>')
+        self.assertEqual(signatures['format'], 'xml')
+        self.assertEqual(signatures['root'], 'article')
+        self.assertEqual(signatures['namespaces'], {'urn:a'})
+        self.assertEqual(signatures['doi_prefix'], '10.1103/')
+
+        signatures = sniff('<!DOCTYPE html><html><head><meta content="10.1039/C0" name="citation_doi">'
+                           '</head><body>10.1016/Z</body></html>')
+        self.assertEqual(signatures['format'], 'html')
+        self.assertEqual(signatures['doi_prefix'], '10.1039/')
+
+    def test_root_is_not_enough(self):
+        self.assertIsNone(detect_publisher('<article><body><p>text</p></body></article>'))
+        self.assertIsNone(detect_publisher('<html><body><p>text</p></body></html>'))
+        self.assertIsNone(detect_publisher(''))
+
+    def test_parse_auto(self):
+        data = parse_auto(make_document('rsc'))
+        self.assertEqual(data, get_soup('rsc').parse(make_document('rsc')))
+        with self.assertRaises(ValueError):
+            parse_auto('<html><body><p>text</p></body></html>')
+
+    def test_parse_records(self):
+        records = [{'html': make_document('aps')},
+                   {'html': make_document('wiley'), 'publisher': 'auto'},
+                   {'html': '<p>text</p>'}]
+        results = list(parse_records(records))
+        self.assertEqual([x['publisher'] for x in results], ['aps', 'wiley', None])
+        self.assertIn('data', results[0])
+        self.assertIn('data', results[1])
+        self.assertTrue(results[2]['error'].startswith('ValueError'))
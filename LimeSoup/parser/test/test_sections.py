@@ -0,0 +1,75 @@
+import itertools
+import random
+import unittest
+
+import bs4
+
+from LimeSoup.bench.documents import make_document
+from LimeSoup.parser.sections import HEADINGS, wrap_heading_sections
+
+
+def wrap_level_by_level(soup, levels=HEADINGS):
+    # ParserPaper.create_tag_sections() before wrap_heading_sections().
+    for tag_name in levels:
+        for each_tag in soup.find_all(tag_name):
+            inside_tags = list(itertools.takewhile(
+                lambda t: t.name not in [each_tag.name, 'script'],
+                each_tag.next_siblings))
+            section = soup.new_tag('section_{}'.format(tag_name))
+            each_tag.wrap(section)
+            for tag in inside_tags:
+                section.append(tag)
+
+
+def random_html(rng, depth=0):
+    parts = []
+    for _ in range(rng.randint(0, 7)):
+        if rng.random() < 0.15:
+            parts.append('text ')
+            continue
+        name = rng.choice(['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'div', 'script'])
+        inner = 'x'
+        if depth < 3 and name != 'script' and rng.random() < 0.5:
+            inner = random_html(rng, depth + 1)
+        parts.append('<{0}>{1}</{0}>'.format(name, inner))
+    return ''.join(parts)
+
+
+class TestSections(unittest.TestCase):
+    def check(self, html, parser='html.parser', levels=HEADINGS):
+        expected = bs4.BeautifulSoup(html, parser)
+        wrap_level_by_level(expected, levels)
+        actual = bs4.BeautifulSoup(html, parser)
+        wrap_heading_sections(actual, levels)
+        self.assertEqual(str(actual), str(expected))
+        # The tree is linked the same way, not only printed the same way.
+        self.assertEqual([str(x) for x in actual.descendants], [str(x) for x in expected.descendants])
+        return str(actual)
+
+    def test_nesting(self):
+        result = self.check('<body><h2>A</h2><p>a</p><h3>B</h3><p>b</p><h2>C</h2><p>c</p></body>')
+        self.assertEqual(result, '<body><section_h2><h2>A</h2><p>a</p><section_h3><h3>B</h3><p>b</p>'
+                                 '</section_h3></section_h2><section_h2><h2>C</h2><p>c</p></section_h2></body>')
+
+    def test_script_ends_section(self):
+        result = self.check('<div><h2>A</h2><p>a</p><script>s</script><p>b</p></div>')
+        self.assertEqual(result, '<div><section_h2><h2>A</h2><p>a</p></section_h2>'
+                                 '<script>s</script><p>b</p></div>')
+
+    def test_lower_heading_first(self):
+        # Only a heading of the same level ends a section.
+        self.check('<body><h3>A</h3><p>a</p><h2>B</h2><p>b</p><h1>C</h1><p>c</p></body>')
+
+    def test_levels(self):
+        html = '<body><h5>A</h5><p>a</p><h6>B</h6><p>b</p></body>'
+        self.assertNotIn('section_h6', self.check(html, levels=HEADINGS[:5]))
+
+    def test_random_documents(self):
+        rng = random.Random(12)
+        for _ in range(300):
+            html = '<html><body>{}</body></html>'.format(random_html(rng))
+            self.check(html, parser=rng.choice(['html.parser', 'lxml', 'lxml-xml']))
+
+    def test_fixtures(self):
+        for publisher in ('rsc', 'ecs', 'springer', 'springernature'):
+            self.check(make_document(publisher))
@@ -0,0 +1,96 @@
+import asyncio
+import concurrent.futures
+import concurrent.futures.process
+import http.client
+import json
+import threading
+import unittest
+from unittest import mock
+
+from LimeSoup.bench.documents import make_document
+from LimeSoup.registry import get_soup
+from LimeSoup.service import ParseService
+
+
+class BrokenPool(concurrent.futures.Executor):
+    def submit(self, fn, *args, **kwargs):
+        raise concurrent.futures.process.BrokenProcessPool('A worker died')
+
+
+class TestParseService(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.service = ParseService(workers=2, large_workers=1, large_size=20000, max_pending=10)
+        cls.loop = asyncio.new_event_loop()
+        cls.server = cls.loop.run_until_complete(cls.service.start('127.0.0.1', 0))
+        cls.port = cls.server.sockets[0].getsockname()[1]
+        cls.thread = threading.Thread(target=cls.loop.run_forever)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.loop.call_soon_threadsafe(cls.server.close)
+        # Let the connections see that the clients are gone.
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0.1), cls.loop).result()
+        cls.loop.call_soon_threadsafe(cls.loop.stop)
+        cls.thread.join()
+        cls.loop.close()
+        cls.service.close()
+
+    def request(self, method, path, payload=None):
+        connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=60)
+        try:
+            body = None if payload is None else json.dumps(payload)
+            connection.request(method, path, body=body)
+            response = connection.getresponse()
+            return response.status, json.loads(response.read().decode('utf-8'))
+        finally:
+            connection.close()
+
+    def test_health_version_queue(self):
+        self.assertEqual(self.request('GET', '/health'), (200, {'status': 'ok'}))
+        status, versions = self.request('GET', '/version')
+        self.assertEqual(versions['soups']['rsc'], get_soup('rsc').version)
+        status, queue = self.request('GET', '/queue')
+        self.assertEqual(queue['pending'], 0)
+        self.assertEqual(queue['pools']['large']['workers'], 1)
+
+    def test_parse_batch(self):
+        large = make_document('wiley', 'medium')
+        self.assertGreater(len(large), self.service.large_size)
+        documents = [{'doi': 'a', 'html': make_document('rsc')},
+                     {'doi': 'b', 'html': large},
+                     {'doi': 'c', 'html': make_document('ecs'), 'publisher': 'ecs'},
+                     {'doi': 'd', 'html': '<p>text</p>'}]
+        status, response = self.request('POST', '/parse', {'documents': documents})
+        self.assertEqual(status, 200)
+        results = response['results']
+        self.assertEqual([x['doi'] for x in results], ['a', 'b', 'c', 'd'])
+        self.assertEqual([x['publisher'] for x in results], ['rsc', 'wiley', 'ecs', None])
+        self.assertEqual(results[0]['data'], json.loads(json.dumps(get_soup('rsc').parse(documents[0]['html']))))
+        self.assertIn('data', results[1])
+        self.assertTrue(results[3]['error'].startswith('ValueError'))
+
+    def test_errors(self):
+        self.assertEqual(self.request('GET', '/nowhere')[0], 404)
+        self.assertEqual(self.request('GET', '/parse')[0], 405)
+        self.assertEqual(self.request('POST', '/parse', {'html': ''})[0], 400)
+        self.assertEqual(self.request('POST', '/parse', {'documents': [{'doi': 'a'}]})[0], 400)
+        status, response = self.request('POST', '/parse', {'documents': [{'html': ''}] * 11})
+        self.assertEqual(status, 503)
+        self.assertIn('error', response)
+
+    def test_internal_error(self):
+        with mock.patch.object(self.service, 'versions', side_effect=RuntimeError('boom')):
+            self.assertEqual(self.request('GET', '/version'), (500, {'error': 'RuntimeError: boom'}))
+        self.assertEqual(self.request('GET', '/health'), (200, {'status': 'ok'}))
+
+    def test_broken_pool(self):
+        self.service.pools['regular'] = BrokenPool()
+        documents = [{'doi': 'a', 'html': make_document('rsc')}]
+        status, response = self.request('POST', '/parse', {'documents': documents})
+        self.assertEqual(status, 200)
+        self.assertTrue(response['results'][0]['error'].startswith('BrokenProcessPool'))
+        self.assertIsInstance(self.service.pools['regular'], concurrent.futures.ProcessPoolExecutor)
+        status, response = self.request('POST', '/parse', {'documents': documents})
+        self.assertIn('data', response['results'][0])
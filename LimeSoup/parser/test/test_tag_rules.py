@@ -0,0 +1,72 @@
+import re
+import unittest
+
+import bs4
+
+from LimeSoup.parser.tag_rules import TagRules
+
+
+def apply_one_by_one(soup, remove=(), strip=(), rename=()):
+    for rule in remove:
+        for tag in soup.find_all(**rule):
+            tag.extract()
+    for rule in strip:
+        for tag in soup.find_all(**rule):
+            tag.replace_with_children()
+    for rule, new_name in rename:
+        for tag in soup.find_all(**rule):
+            tag.name = new_name
+
+
+class TestTagRules(unittest.TestCase):
+    html = '<div class="a b"><p class="b">one <em>two</em></p><a href="#cit1">[1]</a>' \
+           '<span id="s1"><a href="/x">link</a></span><title>Title</title><mml:mi>x</mml:mi></div>'
+
+    def check(self, html=None, parser='html.parser', **rules):
+        html = html or self.html
+        expected = bs4.BeautifulSoup(html, parser)
+        apply_one_by_one(expected, **rules)
+        actual = bs4.BeautifulSoup(html, parser)
+        TagRules(**rules).apply(actual)
+        self.assertEqual(str(actual), str(expected))
+        return str(actual)
+
+    def test_remove(self):
+        result = self.check(remove=[
+            {'name': 'a', 'href': re.compile(r'#cit\d+')},
+            {'name': 'p', 'class': 'b'},
+        ])
+        self.assertEqual(result, '<div class="a b"><span id="s1"><a href="/x">link</a></span>'
+                                 '<title>Title</title><mml:mi>x</mml:mi></div>')
+
+    def test_class_semantics(self):
+        self.check(remove=[{'name': 'div', 'class': 'a b'}])
+        self.check(remove=[{'name': 'div', 'class_': 'b'}])
+        self.check(strip=[{'class': 'b'}])
+        self.check(strip=[{'name': re.compile('^(p|span)$')}, {'name': ['em', 'mml:mi']}])
+
+    def test_strip_inside_removed(self):
+        self.check(remove=[{'name': 'span'}], strip=[{'name': 'a'}, {'name': 'span'}])
+
+    def test_rename_chain(self):
+        result = self.check(rename=[
+            ({'name': 'title'}, 'h1'),
+            ({'name': 'h1'}, 'h2'),
+            ({'name': 'em'}, 'i'),
+            ({'name': 'title'}, 'never'),
+        ])
+        self.assertIn('<h2>Title</h2>', result)
+        self.assertIn('<i>two</i>', result)
+
+    def test_prefixed_names(self):
+        html = '<root xmlns:mml="http://www.w3.org/1998/Math/MathML"><p>a <mml:mi>x</mml:mi> <mi>y</mi></p></root>'
+        self.check(html, parser='lxml-xml', strip=[{'name': 'mml:mi'}])
+        self.check(html, parser='lxml-xml', remove=[{'name': 'mi'}])
+
+    def test_stripped_names(self):
+        soup = bs4.BeautifulSoup(self.html, 'html.parser')
+        self.assertEqual(TagRules(strip=[{'name': ['em', 'span']}]).apply(soup), ['em', 'span'])
+
+    def test_limit(self):
+        with self.assertRaises(ValueError):
+            TagRules(remove=[{'name': 'p', 'limit': 1}])
@@ -0,0 +1,63 @@
+import json
+import os
+import unittest
+
+from bs4 import BeautifulSoup
+
+from LimeSoup.bench.documents import load_fixture
+from LimeSoup.parser.tools import is_well_formed_xml, pad_tag_boundaries
+from LimeSoup.registry import get_soup
+
+# parse() of the benchmark fixtures by the parsers that reparsed the DOM at
+# every step, before pad_tag_boundaries(). The *_malformed outputs are those
+# of the ACS and APS fixtures with a stray <!DOCTYPE> in a paragraph.
+FIXTURE_OUTPUTS = os.path.join(os.path.dirname(__file__), 'fixture_outputs.json')
+
+
+class TestPadTagBoundaries(unittest.TestCase):
+    html = '<div><p>H<sub>2</sub>O <a href="#">is</a>water<!--c-->.</p>' \
+           '<pre> keep  <b>this</b> </pre><p></p></div>'
+
+    def test_same_text_as_prettify(self):
+        prettified = BeautifulSoup(
+            BeautifulSoup(self.html, 'html.parser').prettify(), 'html.parser')
+        padded = BeautifulSoup(self.html, 'html.parser')
+        pad_tag_boundaries(padded)
+
+        for a, b in zip(prettified.find_all('p'), padded.find_all('p')):
+            self.assertEqual(a.get_text().split(), b.get_text().split())
+        self.assertEqual(prettified.pre.get_text(), padded.pre.get_text())
+
+    def test_adjacent_strings_are_joined(self):
+        soup = BeautifulSoup('<p>Li<i>2</i>O</p>', 'html.parser')
+        soup.i.replace_with_children()
+        pad_tag_boundaries(soup)
+        self.assertEqual(soup.p.get_text().split(), ['Li2O'])
+
+
+class TestIsWellFormedXml(unittest.TestCase):
+    def test_well_formed(self):
+        self.assertTrue(is_well_formed_xml('<a xmlns:x="x"><mml:math/>&nbsp;&#x00B0;</a>'))
+        self.assertTrue(is_well_formed_xml(load_fixture('acs')))
+
+    def test_malformed(self):
+        self.assertFalse(is_well_formed_xml('<a><b></a>'))
+        self.assertFalse(is_well_formed_xml('<a>&</a>'))
+        self.assertFalse(is_well_formed_xml(''))
+
+
+class TestFixtureOutputs(unittest.TestCase):
+    def test_same_output(self):
+        with open(FIXTURE_OUTPUTS, encoding='utf-8') as f:
+            expected = json.load(f)
+        for publisher in ('acs', 'aps', 'springer', 'wiley'):
+            with self.subTest(publisher=publisher):
+                self.assertEqual(get_soup(publisher).parse(load_fixture(publisher)), expected[publisher])
+
+    def test_same_output_malformed(self):
+        with open(FIXTURE_OUTPUTS, encoding='utf-8') as f:
+            expected = json.load(f)
+        for publisher in ('acs', 'aps'):
+            with self.subTest(publisher=publisher):
+                document = load_fixture(publisher).replace('Fe(NO<sub>', 'Fe(NO<!DOCTYPE html><sub>')
+                self.assertEqual(get_soup(publisher).parse(document), expected[publisher + '_malformed'])
@@ -9,6 +9,9 @@ __maintainer__ = "Tiago Botari"
 __email__ = "tiagobotari@gmail.com"
 __date__ = "Mar 12 2018"
 
+from bs4 import NavigableString, Tag
+from lxml import etree
+
 
 def convert_to_text(text_input):
     # import unicodedata
@@ -58,3 +61,84 @@ def n_paragraphs_sections(data):
         'paragraphs': paragraphs,
         'keywords': n_keywords
     }
+
+
+def pad_tag_boundaries(soup, preserve_whitespace_tags=('pre', 'textarea')):
+    """
+    Merge adjacent strings and put whitespace around every tag, in place.
+
+    Several pipelines used to serialize the DOM with prettify() and parse it
+    again between every step. Besides being slow, that round trip changed the
+    text: consecutive strings were joined, every string was stripped, and an
+    indented line break showed up at each tag boundary. This function reproduces that
+    text layout on the live DOM so that those pipelines can keep one soup
+    from start to end and still produce the same output.
+
+    :param soup: bs4 BeautifulSoup or Tag object to normalize.
+    :param preserve_whitespace_tags: tags whose content is left untouched.
+    :return: None
+    """
+    stack = [soup]
+    while stack:
+        tag = stack.pop()
+        if tag.name in preserve_whitespace_tags:
+            continue
+
+        items = []
+        strings = []
+        for child in tag.contents:
+            # Comments, doctypes, scripts, etc. are not merged with text.
+            if type(child) is NavigableString:
+                strings.append(child)
+                continue
+
+            if strings:
+                items.append(''.join(strings).strip())
+                strings = []
+            items.append(child)
+            if isinstance(child, Tag):
+                stack.append(child)
+        if strings:
+            items.append(''.join(strings).strip())
+
+        if not items:
+            continue
+
+        tag.clear()
+        padded = False
+        for item in items:
+            if isinstance(item, NavigableString) or isinstance(item, Tag):
+                if not padded:
+                    tag.append('\n ')
+                tag.append(item)
+                padded = False
+            elif item:
+                tag.append('\n %s\n ' % item)
+                padded = True
+        if not padded:
+            tag.append('\n ')
+
+
+def is_well_formed_xml(markup):
+    """
+    Check the nesting of the tags of an XML document.
+
+    Undeclared entities, such as HTML's &nbsp;, and undeclared namespace
+    prefixes are not counted as errors: papers use them, and the HTML tree
+    builders read them without repairing the document.
+
+    :param markup: XML string.
+    :return: True if lxml reads the document without any other error.
+    """
+    parser = etree.XMLParser(recover=True, resolve_entities=False, load_dtd=False, no_network=True)
+    try:
+        etree.fromstring(markup.encode('utf-8'), parser)
+    except etree.XMLSyntaxError:
+        return False
+    for error in parser.error_log:
+        if error.domain == etree.ErrorDomains.NAMESPACE:
+            continue
+        if error.type in (etree.ErrorTypes.ERR_UNDECLARED_ENTITY, etree.ErrorTypes.WAR_UNDECLARED_ENTITY):
+            continue
+        return False
+    return True
@@ -0,0 +1,301 @@
+"""
+Registry of the publisher Soups, and detection of the publisher of a document.
+
+Every publisher declares cheap signatures of its documents: DOI prefixes,
+<meta> tags, root elements, XML namespaces and markers found near the top of
+the page. detect_publisher() only reads the first SNIFF_SIZE characters of a
+document, so a mixed dump can be routed without sorting it first:
+
+    from LimeSoup import parse_auto
+    data = parse_auto(raw)
+
+Soups are imported the first time they are used, so that a run only loads
+the publishers it needs.
+"""
+import collections
+import importlib
+import re
+
+import bs4.builder
+
+__author__ = 'Kevin Cruse'
+__maintainer__ = 'Kevin Cruse'
+__email__ = 'kevcruse96@gmail.com'
+__all__ = ['Publisher', 'PUBLISHERS', 'SOUPS', 'PUBLISHER_ALIASES', 'HTML_PARSERS', 'get_soup',
+           'fastest_html_parser', 'sniff', 'detect_publisher', 'parse_auto']
+
+# Characters of a document read by detect_publisher().
+SNIFF_SIZE = 16 * 1024
+
+Publisher = collections.namedtuple('Publisher', [
+    'name',          # registry name, as in SOUPS
+    'soup',          # "module:soup"
+    'formats',       # 'html' and/or 'xml'
+    'doi_prefixes',  # DOI registrant prefixes, such as '10.1039/'
+    'roots',         # names of the root element
+    'namespaces',    # XML namespace URIs declared at the top
+    'meta',          # (name, content regex) of <meta> tags
+    'markers',       # substrings of the page
+])
+
+
+def _publisher(name, soup, formats, doi_prefixes=(), roots=(), namespaces=(), meta=(), markers=()):
+    meta = tuple((meta_name.lower(), re.compile(content, re.IGNORECASE)) for meta_name, content in meta)
+    return Publisher(name, soup, tuple(formats), tuple(doi_prefixes), tuple(roots),
+                     tuple(namespaces), meta, tuple(markers))
+
+
+PUBLISHERS = [
+    _publisher('acs', 'LimeSoup.ACSSoup:ACSSoup', ['xml'],
+               doi_prefixes=['10.1021/'], roots=['article']),
+    _publisher('aip', 'LimeSoup.AIPSoup:AIPSoup', ['xml', 'html'],
+               doi_prefixes=['10.1063/', '10.1116/', '10.1121/'], roots=['fulltext'],
+               meta=[('citation_publisher', 'AIP Publishing|American Institute of Physics')]),
+    _publisher('aps', 'LimeSoup.APSSoup:APSSoup', ['xml'],
+               doi_prefixes=['10.1103/'], roots=['article']),
+    _publisher('ecs', 'LimeSoup.ECSSoup:ECSSoup', ['html'],
+               doi_prefixes=['10.1149/'],
+               meta=[('citation_publisher', 'Electrochemical Society')],
+               markers=['highwire-journal-article-marker', 'ecsdl.org']),
+    _publisher('elsevier', 'LimeSoup.ElsevierSoup:ElsevierSoup', ['xml', 'html'],
+               doi_prefixes=['10.1016/'], roots=['full-text-retrieval-response'],
+               namespaces=['http://www.elsevier.com/xml/svapi/article/dtd'],
+               meta=[('citation_publisher', 'Elsevier')],
+               markers=['sciencedirect.com']),
+    _publisher('iop', 'LimeSoup.IOPSoup:IOPSoup', ['xml'],
+               doi_prefixes=['10.1088/', '10.1149/'], roots=['article']),
+    _publisher('rsc', 'LimeSoup.RSCSoup:RSCSoup', ['html'],
+               doi_prefixes=['10.1039/'],
+               meta=[('DC.publisher', 'Royal Society of Chemistry'),
+                     ('citation_publisher', 'Royal Society of Chemistry')],
+               markers=['pnlArticleContent']),
+    _publisher('springer', 'LimeSoup.SpringerSoup:SpringerSoup', ['html'],
+               doi_prefixes=['10.1007/'],
+               meta=[('citation_publisher', '^Springer')],
+               markers=['class="ArticleTitle"', 'class="Para"']),
+    _publisher('springernature', 'LimeSoup.SpringerNatureSoup:SpringerNatureSoup', ['html'],
+               doi_prefixes=['10.1038/'],
+               meta=[('citation_publisher', 'Nature Publishing Group')],
+               markers=['c-article-body', 'c-article-title']),
+    _publisher('wiley', 'LimeSoup.WileySoup:WileySoup', ['html'],
+               doi_prefixes=['10.1002/', '10.1111/'],
+               meta=[('citation_publisher', 'Wiley')],
+               markers=['article-section__content']),
+]
+
+# Publisher name -> "module:soup".
+SOUPS = {publisher.name: publisher.soup for publisher in PUBLISHERS}
+# Same output as ElsevierSoup, XML papers are parsed on lxml trees. Not
+# detected, documents are routed to 'elsevier'.
+SOUPS['elsevierlxml'] = 'LimeSoup.ElsevierSoup:ElsevierLxmlSoup'
+# Same output again, XML papers are streamed with lxml.etree.iterparse.
+SOUPS['elsevierstream'] = 'LimeSoup.ElsevierSoup:ElsevierStreamSoup'
+
+PUBLISHER_ALIASES = {
+    'nature': 'springernature',
+}
+
+# Publisher name -> BeautifulSoup tree builders of its HTML documents giving
+# the same results as html.parser on well-formed markup, such as the fixtures
+# of test_html_parsers, fastest first. Publishers not listed never build HTML
+# documents. Broken markup (unclosed tags, stray end tags) is repaired
+# differently by each builder, so results may differ on it, as they do on
+# some mutated iop, springer, springernature, rsc and ecs pages.
+# lxml builds documents the way browsers do, even from well-formed markup:
+# - aip: the <body> of JATS articles becomes the HTML body and the front
+#   matter (DOI, abstract) ends up in paragraphs;
+# - wiley: a <p> is closed by the block elements inside it, whose text is
+#   lost from the paragraph;
+# - elsevier: its HTML papers have no fixture to check them on.
+HTML_PARSERS = {
+    'aip': ['html.parser'],
+    'ecs': ['lxml', 'html.parser'],
+    'elsevier': ['html.parser'],
+    'iop': ['lxml', 'html.parser'],
+    'rsc': ['lxml', 'html.parser'],
+    'springer': ['lxml', 'html.parser'],
+    'springernature': ['lxml', 'html.parser'],
+    'wiley': ['html.parser'],
+}
+
+# Weight of each kind of signature in the score of a publisher.
+_WEIGHTS = {
+    'doi_prefixes': 4,
+    'roots': 2,
+    'namespaces': 3,
+    'meta': 3,
+    'markers': 1,
+}
+
+_SKIP_PATTERN = re.compile(r'\s*(<\?.*?\?>|<!--.*?-->|<!\[CDATA\[.*?\]\]>|<![^>]*>)', re.DOTALL)
+_HTML_DOCTYPE_PATTERN = re.compile(r'\s*<!doctype\s+html', re.IGNORECASE)
+# Roots of HTML pages and fragments, JATS <article> roots are XML.
+_HTML_ELEMENTS = {'html', 'head', 'body', 'div', 'section', 'main', 'header', 'p', 'span', 'table'}
+_ROOT_PATTERN = re.compile(r'\s*<([A-Za-z_][\w:.-]*)')
+_NAMESPACE_PATTERN = re.compile(r'''\sxmlns(?::[\w.-]+)?\s*=\s*["']([^"']+)["']''')
+_META_PATTERN = re.compile(r'<meta\s[^>]*>', re.IGNORECASE)
+_META_ATTRIBUTE_PATTERN = re.compile(r'''([\w.:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)')''')
+# Where a paper states its own DOI, before the DOIs of its references.
+_OWN_DOI_PATTERN = re.compile(
+    r'''(?:pub-id-type=["']doi["'][^>]*>|<(?:\w+:)?doi>|doi:|doi\.org/)\s*(10\.\d{4,9}/)''', re.IGNORECASE)
+_DOI_PATTERN = re.compile(r'\b(10\.\d{4,9}/)')
+
+
+def _soup_name(publisher):
+    name = re.sub(r'[^a-z]', '', (publisher or '').lower())
+    name = PUBLISHER_ALIASES.get(name, name)
+    if name not in SOUPS:
+        raise ValueError('Unknown publisher %r, expecting one of: %s' %
+                         (publisher, ', '.join(sorted(SOUPS))))
+    return name
+
+
+def fastest_html_parser(publisher):
+    """
+    :param publisher: publisher name.
+    :return: the fastest installed tree builder giving the same results as
+        html.parser for the publisher on well-formed markup, see
+        HTML_PARSERS. Results may differ on broken markup.
+    """
+    for html_parser in HTML_PARSERS.get(_soup_name(publisher), []):
+        if bs4.builder.builder_registry.lookup(html_parser) is not None:
+            return html_parser
+    return 'html.parser'
+
+
+def get_soup(publisher, html_parser=None):
+    """
+    Find the Soup of a publisher.
+
+    :param publisher: publisher name, such as "RSC" or "Springer Nature".
+    :param html_parser: BeautifulSoup tree builder of the HTML documents,
+        such as "lxml", or "fastest" for fastest_html_parser(). By default
+        the Soup uses html.parser.
+    :return: LimeSoup.lime_soup.Soup object.
+    """
+    name = _soup_name(publisher)
+    module_name, soup_name = SOUPS[name].split(':')
+    soup = getattr(importlib.import_module(module_name), soup_name)
+    if html_parser == 'fastest':
+        html_parser = fastest_html_parser(name)
+    if html_parser is not None and html_parser != soup.html_parser:
+        soup = soup.with_html_parser(html_parser)
+    return soup
+
+
+def _root(head):
+    position = 0
+    while True:
+        match = _SKIP_PATTERN.match(head, position)
+        if match is None:
+            break
+        position = match.end()
+    match = _ROOT_PATTERN.match(head, position)
+    return match.group(1).lower() if match else None
+
+
+def _meta(head):
+    tags = {}
+    for tag in _META_PATTERN.findall(head):
+        attributes = {key.lower(): double or single
+                      for key, double, single in _META_ATTRIBUTE_PATTERN.findall(tag)}
+        name = attributes.get('name') or attributes.get('property')
+        if name and 'content' in attributes:
+            tags.setdefault(name.lower(), []).append(attributes['content'])
+    return tags
+
+
+def sniff(raw, size=SNIFF_SIZE):
+    """
+    Read the signatures of a document from its first characters.
+
+    :param raw: document, str or bytes.
+    :param size: number of characters read.
+    :return: dict with "format" ("html" or "xml"), "root", "namespaces",
+        "doi_prefix", "meta" (name -> list of contents) and "head".
+    """
+    head = raw[:size]
+    if isinstance(head, bytes):
+        head = head.decode('utf-8', 'replace')
+
+    root = _root(head)
+    if root in _HTML_ELEMENTS or _HTML_DOCTYPE_PATTERN.match(head):
+        document_format = 'html'
+    elif root is not None or head.lstrip().startswith('<?xml'):
+        document_format = 'xml'
+    else:
+        document_format = 'html'
+    meta = _meta(head)
+
+    doi_prefix = None
+    for content in meta.get('citation_doi', []) + meta.get('dc.identifier', []):
+        match = _DOI_PATTERN.search(content)
+        if match:
+            doi_prefix = match.group(1)
+            break
+    if doi_prefix is None:
+        match = _OWN_DOI_PATTERN.search(head) or _DOI_PATTERN.search(head)
+        if match:
+            doi_prefix = match.group(1)
+
+    return {
+        'format': document_format,
+        'root': root,
+        'namespaces': set(_NAMESPACE_PATTERN.findall(head)),
+        'doi_prefix': doi_prefix,
+        'meta': meta,
+        'head': head,
+    }
+
+
+def _score(publisher, signatures):
+    if signatures['format'] not in publisher.formats:
+        return 0
+    score = 0
+    if signatures['doi_prefix'] in publisher.doi_prefixes:
+        score += _WEIGHTS['doi_prefixes']
+    if signatures['root'] in publisher.roots:
+        score += _WEIGHTS['roots']
+    if signatures['namespaces'].intersection(publisher.namespaces):
+        score += _WEIGHTS['namespaces']
+    for name, content in publisher.meta:
+        if any(content.search(x) for x in signatures['meta'].get(name, ())):
+            score += _WEIGHTS['meta']
+            break
+    if any(marker in signatures['head'] for marker in publisher.markers):
+        score += _WEIGHTS['markers']
+    return score
+
+
+def detect_publisher(raw, size=SNIFF_SIZE):
+    """
+    Guess the publisher of a document from its first characters.
+
+    A root element alone is not enough: many publishers send JATS <article>
+    documents, a DOI prefix, a namespace, a <meta> tag or a marker must match.
+
+    :param raw: document, str or bytes.
+    :param size: number of characters read.
+    :return: publisher name, as in SOUPS, or None.
+    """
+    signatures = sniff(raw, size)
+    best, best_score = None, _WEIGHTS['roots']
+    for publisher in PUBLISHERS:
+        score = _score(publisher, signatures)
+        if score > best_score:
+            best, best_score = publisher.name, score
+    return best
+
+
+def parse_auto(raw, size=SNIFF_SIZE):
+    """
+    Parse a document with the Soup of its detected publisher.
+
+    :param raw: document.
+    :param size: number of characters read to detect the publisher.
+    :return: data extracted by the Soup.
+    """
+    publisher = detect_publisher(raw, size)
+    if publisher is None:
+        raise ValueError('Cannot detect the publisher of the document from its first %d characters' % size)
+    return get_soup(publisher).parse(raw)
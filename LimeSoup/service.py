@@ -0,0 +1,314 @@
+"""
+Parsing service: an asyncio HTTP/JSON front end to pools of worker processes.
+
+    limesoup serve --port 8080 --workers 8
+    limesoup serve --unix /run/limesoup.sock
+
+Endpoints:
+
+    POST /parse    {"publisher": "rsc", "documents": [{"doi": ..., "html": ...}, ...]}
+                   -> {"results": [{"doi": ..., "publisher": ..., "data": ...}, ...]}
+    GET  /health   -> {"status": "ok"}
+    GET  /version  -> {"soups": {"rsc": "2.0.0", ...}}
+    GET  /queue    -> documents waiting or being parsed, per pool
+
+Each document of a batch is a task of its own, and documents larger than
+large_size characters go to a separate, smaller pool, so a few huge papers
+never hold back the small ones behind them. Publishers are detected as in
+"limesoup parse" when the documents do not give one.
+
+The service only uses the standard library and needs Python 3.7.
+"""
+import asyncio
+import concurrent.futures
+import concurrent.futures.process
+import json
+import multiprocessing
+import os
+
+from LimeSoup.registry import SOUPS, detect_publisher, get_soup
+
+__author__ = 'Kevin Cruse'
+__maintainer__ = 'Kevin Cruse'
+__email__ = 'kevcruse96@gmail.com'
+
+_REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error',
+    503: 'Service Unavailable',
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super(HTTPError, self).__init__(message)
+        self.status = status
+
+
+def parse_document(publisher, html_str, budget=None, html_parser=None):
+    """
+    Parse one document in a worker process.
+
+    :param publisher: publisher name, or None/"auto" to detect it.
+    :param html_str: document.
+    :param budget: LimeSoup.budget.Budget of the document.
+    :param html_parser: tree builder of HTML documents, see
+        LimeSoup.registry.get_soup().
+    :return: dict with "publisher" and "data" or "error".
+    """
+    if publisher in (None, 'auto'):
+        publisher = detect_publisher(html_str)
+    output = {'publisher': publisher}
+    try:
+        if publisher is None:
+            raise ValueError('The publisher of the document is not given and cannot be detected')
+        output['data'] = get_soup(publisher, html_parser=html_parser).parse(html_str, budget=budget)
+    except Exception as e:
+        output['error'] = '%s: %s' % (type(e).__name__, e)
+    return output
+
+
+class ParseService(object):
+    """
+    Parse batches of documents on worker processes, without blocking the
+    event loop.
+    """
+
+    def __init__(self, workers=None, large_workers=None, large_size=1000000,
+                 max_pending=1000, max_body=256 * 1024 * 1024, budget=None, html_parser=None):
+        """
+        :param workers: processes parsing regular documents, defaults to the
+            number of CPUs.
+        :param large_workers: processes parsing documents larger than
+            large_size, defaults to a quarter of workers. 0 sends every
+            document to the regular pool.
+        :param large_size: size, in characters, from which a document is large.
+        :param max_pending: documents accepted at a time; a batch that would
+            go beyond is refused with 503.
+        :param max_body: largest request body, in bytes.
+        :param budget: LimeSoup.budget.Budget of every document.
+        :param html_parser: tree builder of HTML documents, such as "lxml" or
+            "fastest", see LimeSoup.registry.get_soup().
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if large_workers is None:
+            large_workers = max(1, workers // 4)
+        if workers < 1 or large_workers < 0:
+            raise ValueError('workers must be positive and large_workers not negative')
+
+        self.large_size = large_size
+        self.max_pending = max_pending
+        self.max_body = max_body
+        self.budget = budget
+        self.html_parser = html_parser
+        # Forked workers would inherit the sockets of the connections open
+        # at the time, and keep them open after the service closes them.
+        if 'forkserver' in multiprocessing.get_all_start_methods():
+            self._context = multiprocessing.get_context('forkserver')
+        else:
+            self._context = multiprocessing.get_context('spawn')
+        self.workers = {'regular': workers}
+        if large_workers:
+            self.workers['large'] = large_workers
+        self.pools = {name: self._new_pool(name) for name in self.workers}
+        self.pending = {name: 0 for name in self.pools}
+        self._versions = None
+
+    def _new_pool(self, pool_name):
+        return concurrent.futures.ProcessPoolExecutor(self.workers[pool_name], mp_context=self._context)
+
+    def close(self):
+        for pool in self.pools.values():
+            pool.shutdown()
+
+    def _pool_name(self, html_str):
+        if 'large' in self.pools and len(html_str) > self.large_size:
+            return 'large'
+        return 'regular'
+
+    async def _parse_one(self, pool_name, publisher, html_str):
+        loop = asyncio.get_running_loop()
+        pool = self.pools[pool_name]
+        self.pending[pool_name] += 1
+        try:
+            return await loop.run_in_executor(pool, parse_document,
+                                              publisher, html_str, self.budget, self.html_parser)
+        except concurrent.futures.process.BrokenProcessPool as e:
+            # A worker died, killed or out of memory: the documents in flight
+            # fail and the next ones go to a new pool.
+            if self.pools[pool_name] is pool:
+                self.pools[pool_name] = self._new_pool(pool_name)
+                pool.shutdown(wait=False)
+            return {'publisher': publisher, 'error': '%s: %s' % (type(e).__name__, e)}
+        finally:
+            self.pending[pool_name] -= 1
+
+    async def parse(self, documents, publisher=None):
+        """
+        Parse a batch of documents.
+
+        :param documents: list of dict with "html" and optionally "doi" and
+            "publisher".
+        :param publisher: publisher of documents that do not specify one.
+        :return: list of dict with "doi", "publisher" and "data" or "error",
+            in the order of documents.
+        """
+        for document in documents:
+            if not isinstance(document, dict) or not isinstance(document.get('html'), str):
+                raise HTTPError(400, 'Every document must be an object with an "html" string')
+        if sum(self.pending.values()) + len(documents) > self.max_pending:
+            raise HTTPError(503, 'Too many documents pending, try again later')
+
+        tasks = []
+        for document in documents:
+            html_str = document['html']
+            tasks.append(self._parse_one(self._pool_name(html_str),
+                                         document.get('publisher') or publisher, html_str))
+
+        results = await asyncio.gather(*tasks)
+        for document, result in zip(documents, results):
+            result['doi'] = document.get('doi')
+        return list(results)
+
+    def queue(self):
+        return {
+            'pending': sum(self.pending.values()),
+            'max_pending': self.max_pending,
+            'pools': {name: {'pending': self.pending[name], 'workers': self.workers[name]}
+                      for name in self.pools},
+        }
+
+    def versions(self):
+        if self._versions is None:
+            self._versions = {name: get_soup(name).version for name in sorted(SOUPS)}
+        return {'soups': self._versions}
+
+    async def handle(self, method, path, body):
+        """
+        Answer one request.
+
+        :return: (HTTP status, JSON-serializable payload).
+        """
+        routes = {
+            '/parse': 'POST',
+            '/health': 'GET',
+            '/version': 'GET',
+            '/queue': 'GET',
+        }
+        path = path.split('?', 1)[0]
+        if path not in routes:
+            raise HTTPError(404, 'Unknown endpoint %s' % path)
+        if method != routes[path]:
+            raise HTTPError(405, '%s expects %s' % (path, routes[path]))
+
+        if path == '/health':
+            return 200, {'status': 'ok'}
+        if path == '/version':
+            return 200, self.versions()
+        if path == '/queue':
+            return 200, self.queue()
+
+        try:
+            request = json.loads(body.decode('utf-8'))
+        except ValueError as e:
+            raise HTTPError(400, 'Invalid JSON: %s' % e)
+        if not isinstance(request, dict) or not isinstance(request.get('documents'), list):
+            raise HTTPError(400, 'Expecting {"documents": [...]}')
+        results = await self.parse(request['documents'], publisher=request.get('publisher'))
+        return 200, {'results': results}
+
+    async def _read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        try:
+            method, path, version = request_line.decode('latin-1').split()
+        except ValueError:
+            raise HTTPError(400, 'Malformed request line')
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if not line.strip():
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length') or 0)
+        except ValueError:
+            raise HTTPError(400, 'Invalid Content-Length')
+        if length > self.max_body:
+            raise HTTPError(413, 'Request body larger than %d bytes' % self.max_body)
+        body = await reader.readexactly(length) if length else b''
+        keep_alive = (headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1')
+        return method, path, body, keep_alive
+
+    async def _serve_connection(self, reader, writer):
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    method, path, body, keep_alive = request
+                    status, payload = await self.handle(method, path, body)
+                except HTTPError as e:
+                    status, payload = e.status, {'error': str(e)}
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception as e:
+                    status, payload = 500, {'error': '%s: %s' % (type(e).__name__, e)}
+
+                body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                writer.write(('HTTP/1.1 %d %s\r\n'
+                              'Content-Type: application/json; charset=utf-8\r\n'
+                              'Content-Length: %d\r\n'
+                              'Connection: %s\r\n\r\n' % (status, _REASONS[status], len(body),
+                                                          'keep-alive' if keep_alive else 'close')
+                              ).encode('latin-1') + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=8080, path=None):
+        """
+        Start listening on a TCP port, or on a Unix socket if path is given.
+
+        :return: asyncio server.
+        """
+        if path is not None:
+            return await asyncio.start_unix_server(self._serve_connection, path=path)
+        return await asyncio.start_server(self._serve_connection, host, port)
+
+
+def serve(host='127.0.0.1', port=8080, path=None, **kwargs):
+    """
+    Run the parsing service until interrupted.
+
+    :param kwargs: arguments of ParseService.
+    """
+    service = ParseService(**kwargs)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        server = loop.run_until_complete(service.start(host, port, path))
+        try:
+            loop.run_forever()
+        except KeyboardInterrupt:
+            pass
+        server.close()
+        loop.run_until_complete(server.wait_closed())
+    finally:
+        loop.close()
+        service.close()
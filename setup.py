@@ -9,12 +9,20 @@ if __name__ == "__main__":
         author="Ceder Group",
         license="MIT License",
         packages=find_packages(),
+        package_data={'LimeSoup.bench': ['fixtures/*']},
         zip_safe=False,
+        entry_points={
+            'console_scripts': ['limesoup = LimeSoup.cli:main'],
+        },
         install_requires=[
-            'beautifulsoup4>=4.6.1',
+            'beautifulsoup4>=4.8.0',
             # lxml 4.4.0 changed default namespace to '', which causes
             # unexpected behaviors. For compatibility reasons, keep using
             # old versions for now.
             'lxml>=4.2.6,<=4.3.5',
-        ]
+        ],
+        extras_require={
+            # .msgpack files of LimeSoup.columnar.
+            'msgpack': ['msgpack>=0.6'],
+        },
     )